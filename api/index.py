@@ -2,23 +2,55 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config.settings import settings
-from app.core.auth import get_auth0_user
+from app.config.database import close_supabase_client
+from app.config.http_client import close_http_client
+from app.core.auth import get_auth0_user, principal_cache
 from app.schemas.common import APIResponse
 from app.schemas.auth import LoginRequest, RegisterRequest
 from app.services.auth_service import AuthService
+from app.services.user_service import user_search_cache
+from app.services.location_ingest_service import location_ingest_service
+from app.services.live_position_store import live_position_store
+from app.services.live_feed_hub import live_feed_hub
+from app.services.stop_service import stop_index
+from app.services.eta_service import eta_engine
+from app.services.segment_stats_service import segment_stats_cache
+from app.services.schedule_service import timetable_index
+from app.services.trip_status_service import trip_status_tracker
+from app.services.route_service import route_details_cache
+from app.services.dashboard_service import dashboard_cache_stats
+from app.services.announcement_service import announcement_feed_cache
+from app.services.fleet_stats_service import fleet_stats
 from app.utils.handlers import validation_exception_handler, http_exception_handler
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 import app.api.v1.auth as auth_router
 import app.api.v1.users as users_router
+import app.api.v1.tracking as tracking_router
+import app.api.v1.stops as stops_router
+import app.api.v1.schedules as schedules_router
+import app.api.v1.trips as trips_router
+import app.api.v1.routes as routes_router
+import app.api.v1.announcements as announcements_router
+import app.api.v1.stats as stats_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("🚀 Starting Bus Tracking API...")
+    await location_ingest_service.start()
+    await live_position_store.start()
+    await trip_status_tracker.start()
+    await fleet_stats.start()
     yield
     # Shutdown
+    await location_ingest_service.stop()
+    await live_position_store.stop()
+    await trip_status_tracker.stop()
+    await fleet_stats.stop()
+    await close_http_client()
+    close_supabase_client()
     print("👋 Shutting down Bus Tracking API...")
 
 # Create FastAPI app
@@ -51,11 +83,37 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "1.0.0"}
+    return {
+        "status": "healthy",
+        "version": "1.0.0",
+        "caches": {
+            "principal": principal_cache.stats(),
+            "user_search": user_search_cache.stats()
+        },
+        "location_ingest": location_ingest_service.stats(),
+        "live_positions": live_position_store.stats(),
+        "live_feed": live_feed_hub.stats(),
+        "stop_index": stop_index.stats(),
+        "eta": eta_engine.stats(),
+        "segment_stats": segment_stats_cache.stats(),
+        "timetable": timetable_index.stats(),
+        "trip_status": trip_status_tracker.stats(),
+        "route_details": route_details_cache.stats(),
+        "dashboard": dashboard_cache_stats(),
+        "announcements": announcement_feed_cache.stats(),
+        "fleet_stats": fleet_stats.stats()
+    }
 
 # Include routers
 app.include_router(auth_router.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users_router.router, prefix="/api/v1/users", tags=["User Management"])
+app.include_router(tracking_router.router, prefix="/api/v1/tracking", tags=["Live Tracking"])
+app.include_router(stops_router.router, prefix="/api/v1/stops", tags=["Stops"])
+app.include_router(schedules_router.router, prefix="/api/v1/schedules", tags=["Schedules"])
+app.include_router(trips_router.router, prefix="/api/v1/trips", tags=["Trips"])
+app.include_router(routes_router.router, prefix="/api/v1/routes", tags=["Routes"])
+app.include_router(announcements_router.router, prefix="/api/v1/announcements", tags=["Announcements"])
+app.include_router(stats_router.router, prefix="/api/v1/stats", tags=["Stats"])
 
 @app.post("/register")
 async def register(request: RegisterRequest):
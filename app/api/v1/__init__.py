@@ -4,6 +4,11 @@ from .users import router as users_router
 from .buses import router as buses_router
 from .routes import router as routes_router
 from .schedules import router as schedules_router
+from .tracking import router as tracking_router
+from .stops import router as stops_router
+from .trips import router as trips_router
+from .announcements import router as announcements_router
+from .stats import router as stats_router
 
 # Create main API router
 api_router = APIRouter()
@@ -13,4 +18,9 @@ api_router.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(users_router, prefix="/users", tags=["Users"])
 api_router.include_router(buses_router, prefix="/buses", tags=["Buses"])
 api_router.include_router(routes_router, prefix="/routes", tags=["Routes"])
-api_router.include_router(schedules_router, prefix="/schedules", tags=["Schedules"]) 
\ No newline at end of file
+api_router.include_router(stops_router, prefix="/stops", tags=["Stops"])
+api_router.include_router(schedules_router, prefix="/schedules", tags=["Schedules"])
+api_router.include_router(trips_router, prefix="/trips", tags=["Trips"])
+api_router.include_router(tracking_router, prefix="/tracking", tags=["Live Tracking"])
+api_router.include_router(announcements_router, prefix="/announcements", tags=["Announcements"])
+api_router.include_router(stats_router, prefix="/stats", tags=["Stats"])
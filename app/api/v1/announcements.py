@@ -0,0 +1,91 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.config.settings import settings
+from app.core.auth import get_auth0_user, get_stream_user, require_admin, Auth0User
+from app.models.announcement import AnnouncementCreate, AnnouncementUpdate, AnnouncementPriority
+from app.schemas.common import APIResponse
+from app.services.announcement_service import AnnouncementService, announcement_feed_cache, encode_announcement
+from app.services.live_feed_hub import live_feed_hub
+from app.utils.helpers import etag_matches, http_date, not_modified_since
+
+router = APIRouter()
+
+@router.get("/", response_model=APIResponse)
+async def get_announcements(
+    request: Request,
+    response: Response,
+    priority: Optional[AnnouncementPriority] = Query(None, description="Only announcements of this priority"),
+    current_user: Auth0User = Depends(get_auth0_user)
+):
+    """Active announcements of the user's organization, newest first; answers 304 while the feed is unchanged"""
+    try:
+        entry = await announcement_feed_cache.get(current_user.organization_id, priority)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load announcements: {e}")
+    
+    headers = {"ETag": entry.etag, "Last-Modified": http_date(entry.last_modified), "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, entry.etag) or (
+        if_none_match is None and not_modified_since(request.headers.get("if-modified-since"), entry.last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return APIResponse(success=True, message=f"Found {len(entry.announcements)} announcements", data=entry.data)
+
+@router.get("/stream")
+async def announcement_events(
+    request: Request,
+    access_token: Optional[str] = Query(None, description="Token, for clients that cannot send headers")
+):
+    """Server-Sent Events feed of urgent announcements, starting with the ones currently active"""
+    current_user = await get_stream_user(request.headers.get("authorization"), access_token)
+    try:
+        entry = await announcement_feed_cache.get(current_user.organization_id, AnnouncementPriority.URGENT)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load announcements: {e}")
+    
+    subscription = live_feed_hub.subscribe(current_user.organization_id, [], [])
+    for announcement in reversed(entry.announcements):
+        subscription.offer(f"announcement:{announcement.id}", encode_announcement(announcement))
+    
+    return StreamingResponse(
+        live_feed_hub.events(subscription, settings.LIVE_FEED_HEARTBEAT_INTERVAL),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/", response_model=APIResponse)
+async def create_announcement(
+    announcement_data: AnnouncementCreate,
+    current_user: Auth0User = Depends(require_admin),
+    announcement_service: AnnouncementService = Depends()
+):
+    """Create an announcement for the admin's organization (Admin only); urgent ones are pushed to connected clients"""
+    result = await announcement_service.create_announcement(
+        announcement_data, current_user.user_id, current_user.organization_id
+    )
+    
+    if not result.success:
+        raise HTTPException(status_code=400, detail=result.message)
+    
+    return result
+
+@router.put("/{announcement_id}", response_model=APIResponse)
+async def update_announcement(
+    announcement_id: str,
+    announcement_data: AnnouncementUpdate,
+    current_user: Auth0User = Depends(require_admin),
+    announcement_service: AnnouncementService = Depends()
+):
+    """Update an announcement of the admin's organization (Admin only)"""
+    result = await announcement_service.update_announcement(
+        announcement_id, announcement_data, current_user.organization_id
+    )
+    
+    if not result.success:
+        status_code = 404 if result.message == "Announcement not found" else 400
+        raise HTTPException(status_code=status_code, detail=result.message)
+    
+    return result
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from app.core.auth import get_auth0_user, Auth0User
+from app.schemas.common import APIResponse
+from app.services.route_service import route_details_cache
+from app.utils.helpers import etag_matches
 
 router = APIRouter()
 
@@ -10,4 +14,26 @@ async def get_routes():
 @router.post("/")
 async def create_route():
     """Create a new route"""
-    return {"message": "Create route - Coming soon!"} 
\ No newline at end of file
+    return {"message": "Create route - Coming soon!"}
+
+@router.get("/{route_id}", response_model=APIResponse)
+async def get_route_details(
+    route_id: str,
+    request: Request,
+    response: Response,
+    current_user: Auth0User = Depends(get_auth0_user)
+):
+    """Route with its ordered stops, active schedules and running trips; answers 304 when If-None-Match still matches"""
+    try:
+        entry = await route_details_cache.get(route_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load route details: {e}")
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Route not found")
+    
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return APIResponse(success=True, message="Route details retrieved", data=entry.data)
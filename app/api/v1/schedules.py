@@ -1,13 +1,90 @@
-from fastapi import APIRouter
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.auth import get_auth0_user, require_admin, Auth0User
+from app.models.schedule import ScheduleCreate, ScheduleUpdate
+from app.schemas.common import APIResponse
+from app.services.schedule_service import ScheduleService
 
 router = APIRouter()
 
-@router.get("/")
-async def get_schedules():
-    """Get all schedules"""
-    return {"message": "Schedules endpoint - Coming soon!"}
+@router.get("/", response_model=APIResponse)
+async def get_schedules(
+    route_id: Optional[str] = Query(None, description="Only schedules of this route"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: Auth0User = Depends(get_auth0_user),
+    schedule_service: ScheduleService = Depends()
+):
+    """Get schedules ordered by departure time"""
+    result = await schedule_service.list_schedules(route_id, limit, offset)
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return result
 
-@router.post("/")
-async def create_schedule():
-    """Create a new schedule"""
-    return {"message": "Create schedule - Coming soon!"} 
\ No newline at end of file
+@router.get("/routes/{route_id}/departures", response_model=APIResponse)
+async def get_next_departures(
+    route_id: str,
+    after: Optional[datetime] = Query(None, description="Departures at or after this time (default: now)"),
+    limit: int = Query(5, ge=1, le=100),
+    current_user: Auth0User = Depends(get_auth0_user),
+    schedule_service: ScheduleService = Depends()
+):
+    """Next departures of a route, following days included"""
+    if after is None:
+        after = datetime.now(timezone.utc)
+    elif after.tzinfo is None:
+        after = after.replace(tzinfo=timezone.utc)
+    result = await schedule_service.get_next_departures(route_id, after, limit)
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return result
+
+@router.post("/", response_model=APIResponse)
+async def create_schedule(
+    schedule_data: ScheduleCreate,
+    current_user: Auth0User = Depends(require_admin),
+    schedule_service: ScheduleService = Depends()
+):
+    """Create a new schedule (Admin only)"""
+    result = await schedule_service.create_schedule(schedule_data)
+    
+    if not result.success:
+        raise HTTPException(status_code=400, detail=result.message)
+    
+    return result
+
+@router.put("/{schedule_id}", response_model=APIResponse)
+async def update_schedule(
+    schedule_id: str,
+    schedule_data: ScheduleUpdate,
+    current_user: Auth0User = Depends(require_admin),
+    schedule_service: ScheduleService = Depends()
+):
+    """Update a schedule (Admin only)"""
+    result = await schedule_service.update_schedule(schedule_id, schedule_data)
+    
+    if not result.success:
+        status_code = 404 if result.message == "Schedule not found" else 400
+        raise HTTPException(status_code=status_code, detail=result.message)
+    
+    return result
+
+@router.delete("/{schedule_id}", response_model=APIResponse)
+async def delete_schedule(
+    schedule_id: str,
+    current_user: Auth0User = Depends(require_admin),
+    schedule_service: ScheduleService = Depends()
+):
+    """Delete a schedule (Admin only)"""
+    result = await schedule_service.delete_schedule(schedule_id)
+    
+    if not result.success:
+        status_code = 404 if result.message == "Schedule not found" else 400
+        raise HTTPException(status_code=status_code, detail=result.message)
+    
+    return result
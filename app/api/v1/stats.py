@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.auth import require_admin, Auth0User
+from app.schemas.common import APIResponse
+from app.services.fleet_stats_service import fleet_stats
+
+router = APIRouter()
+
+@router.get("/fleet", response_model=APIResponse)
+async def get_fleet_stats(
+    current_user: Auth0User = Depends(require_admin)
+):
+    """Buses by status, trips by status, users by role and status, active trips per route (Admin only)
+
+    Served from in-memory counters; see reconciled_at for the last full recount.
+    """
+    return APIResponse(success=True, message="Fleet stats retrieved", data=fleet_stats.snapshot())
+
+@router.post("/fleet/reconcile", response_model=APIResponse)
+async def reconcile_fleet_stats(
+    current_user: Auth0User = Depends(require_admin)
+):
+    """Recount every group from the database now (Admin only)"""
+    try:
+        await fleet_stats.reconcile()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fleet stats reconcile failed: {e}")
+    
+    return APIResponse(success=True, message="Fleet stats reconciled", data=fleet_stats.snapshot())
@@ -0,0 +1,75 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.auth import get_auth0_user, require_admin, Auth0User
+from app.models.stop import StopCreate, StopUpdate
+from app.schemas.common import APIResponse
+from app.services.stop_service import StopService
+
+router = APIRouter()
+
+@router.get("/nearby", response_model=APIResponse)
+async def get_nearby_stops(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    limit: int = Query(10, ge=1, le=50, description="Number of stops to return"),
+    radius_km: Optional[float] = Query(None, gt=0, le=50, description="Only stops within this distance"),
+    current_user: Auth0User = Depends(get_auth0_user),
+    stop_service: StopService = Depends()
+):
+    """Stops nearest to a point, closest first"""
+    result = await stop_service.get_nearby_stops(latitude, longitude, limit, radius_km)
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return result
+
+@router.get("/within", response_model=APIResponse)
+async def get_stops_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(200, ge=1, le=1000),
+    current_user: Auth0User = Depends(get_auth0_user),
+    stop_service: StopService = Depends()
+):
+    """Stops inside a bounding box (map viewport)"""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="min_lat/min_lon must not exceed max_lat/max_lon")
+    
+    result = await stop_service.get_stops_in_bbox(min_lat, min_lon, max_lat, max_lon, limit)
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return result
+
+@router.post("/", response_model=APIResponse)
+async def create_stop(
+    stop_data: StopCreate,
+    current_user: Auth0User = Depends(require_admin),
+    stop_service: StopService = Depends()
+):
+    """Create a new stop (Admin only)"""
+    result = await stop_service.create_stop(stop_data)
+    
+    if not result.success:
+        raise HTTPException(status_code=400, detail=result.message)
+    
+    return result
+
+@router.put("/{stop_id}", response_model=APIResponse)
+async def update_stop(
+    stop_id: str,
+    stop_data: StopUpdate,
+    current_user: Auth0User = Depends(require_admin),
+    stop_service: StopService = Depends()
+):
+    """Update a stop (Admin only)"""
+    result = await stop_service.update_stop(stop_id, stop_data)
+    
+    if not result.success:
+        raise HTTPException(status_code=400, detail=result.message)
+    
+    return result
@@ -0,0 +1,247 @@
+from typing import Dict, List, Optional, Set, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from app.config.settings import settings
+from app.core.auth import get_auth0_user, get_stream_user, require_admin, require_driver_or_admin, Auth0User
+from app.models.user import UserRole
+from app.schemas.common import APIResponse
+from app.schemas.tracking import LocationPing, LocationIngestResult
+from app.services.location_ingest_service import location_ingest_service
+from app.services.live_position_store import live_position_store, TripRef
+from app.services.live_feed_hub import live_feed_hub, LiveFeedSubscription, HEARTBEAT_MESSAGE
+from app.services.eta_service import eta_engine
+from app.services.segment_stats_service import SegmentStatsAggregator
+from app.services.trajectory_service import TrajectoryService
+
+router = APIRouter()
+
+def _foreign_trips(pings: List[LocationPing], trips: Dict[str, Optional[TripRef]], user: Auth0User) -> Set[str]:
+    """Trips of the pings the user may not report: unknown trips, trips run by another bus,
+    and trips of another driver (for drivers) or of another organization (for admins)"""
+    foreign = set()
+    for ping in pings:
+        trip = trips.get(ping.trip_id)
+        if (
+            trip is None
+            or trip.bus_id != ping.bus_id
+            or (user.role == UserRole.DRIVER and trip.driver_id != user.user_id)
+            or (user.role == UserRole.ADMIN and trip.organization_id != user.organization_id)
+        ):
+            foreign.add(ping.trip_id)
+    return foreign
+
+def _can_view_trip(trip: Optional[TripRef], user: Auth0User) -> bool:
+    """Trips of the user's organization, and only their own trips for drivers"""
+    return (
+        trip is not None
+        and trip.organization_id is not None
+        and trip.organization_id == user.organization_id
+        and (user.role != UserRole.DRIVER or trip.driver_id == user.user_id)
+    )
+
+@router.post("/locations", response_model=APIResponse, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_locations(
+    payload: Union[LocationPing, List[LocationPing]],
+    current_user: Auth0User = Depends(require_driver_or_admin)
+):
+    """Accept a single GPS ping or a batch of pings (Driver or Admin)
+
+    Every ping's trip must run on the ping's bus and be the caller's own trip
+    (drivers) or a trip of the caller's organization (admins), otherwise the
+    whole batch is refused with a 403. Pings are queued and written to
+    bus_locations in batches; a 429 with Retry-After means the queue is full
+    and the device should retry later.
+    """
+    pings = payload if isinstance(payload, list) else [payload]
+    if not pings:
+        raise HTTPException(status_code=400, detail="No locations provided")
+    if len(pings) > settings.LOCATION_MAX_BATCH_PINGS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LOCATION_MAX_BATCH_PINGS} locations per request"
+        )
+
+    try:
+        trips = await live_position_store.resolve_trips(ping.trip_id for ping in pings)
+        foreign = _foreign_trips(pings, trips, current_user)
+        if foreign:
+            # Cached trips may predate a reassignment, recheck before refusing
+            trips.update(await live_position_store.resolve_trips(foreign, refresh=True))
+            foreign = _foreign_trips(pings, trips, current_user)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Could not verify trips: {e}")
+    if foreign:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not allowed to report locations for trips: {', '.join(sorted(foreign))}"
+        )
+
+    rows = location_ingest_service.offer(pings)
+    if rows is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Location queue is full, retry shortly",
+            headers={"Retry-After": str(max(1, round(settings.LOCATION_FLUSH_INTERVAL)))}
+        )
+    
+    live_position_store.record(rows, {trip_id: trip.route_id for trip_id, trip in trips.items()}, current_user.organization_id)
+
+    return APIResponse(
+        success=True,
+        message=f"Accepted {len(pings)} locations",
+        data=LocationIngestResult(accepted=len(pings), queue_depth=location_ingest_service.queue_depth)
+    )
+
+@router.get("/buses", response_model=APIResponse)
+async def get_active_buses(current_user: Auth0User = Depends(get_auth0_user)):
+    """Latest positions of all active buses in the current user's organization"""
+    positions = live_position_store.for_organization(current_user.organization_id) if current_user.organization_id else []
+    return APIResponse(
+        success=True,
+        message=f"{len(positions)} active buses",
+        data=[position.to_dict() for position in positions]
+    )
+
+@router.get("/buses/{bus_id}", response_model=APIResponse)
+async def get_bus_location(bus_id: str, current_user: Auth0User = Depends(get_auth0_user)):
+    """Latest position of one bus"""
+    position = live_position_store.get_bus(bus_id)
+    if position is None or position.organization_id != current_user.organization_id:
+        raise HTTPException(status_code=404, detail="No recent location for this bus")
+    
+    return APIResponse(success=True, message="Bus location retrieved", data=position.to_dict())
+
+@router.get("/routes/{route_id}/buses", response_model=APIResponse)
+async def get_route_buses(route_id: str, current_user: Auth0User = Depends(get_auth0_user)):
+    """Latest positions of the active buses on a route"""
+    positions = [
+        position for position in live_position_store.for_route(route_id)
+        if position.organization_id == current_user.organization_id
+    ]
+    return APIResponse(
+        success=True,
+        message=f"{len(positions)} active buses on route",
+        data=[position.to_dict() for position in positions]
+    )
+
+@router.get("/trips/{trip_id}/eta", response_model=APIResponse)
+async def get_trip_etas(trip_id: str, current_user: Auth0User = Depends(get_auth0_user)):
+    """Predicted arrival times at every upcoming stop of a trip"""
+    position = live_position_store.get_trip(trip_id)
+    if position is None or position.organization_id != current_user.organization_id:
+        raise HTTPException(status_code=404, detail="No recent location for this trip")
+    
+    etas = await eta_engine.get_trip_etas(trip_id)
+    if etas is None:
+        raise HTTPException(status_code=404, detail="Route stops are not configured for this trip")
+    
+    return APIResponse(success=True, message=f"ETAs for {len(etas)} upcoming stops", data=etas)
+
+@router.post("/segment-stats/aggregate", response_model=APIResponse)
+async def aggregate_segment_stats(
+    max_batches: Optional[int] = Query(None, ge=1, description="Stop after this many batches of completed trips"),
+    current_user: Auth0User = Depends(require_admin),
+    aggregator: SegmentStatsAggregator = Depends()
+):
+    """Fold newly completed trips into the segment travel-time statistics (Admin only, e.g. from a cron job)"""
+    try:
+        summary = await aggregator.run(max_batches)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Segment stats aggregation failed: {e}")
+    
+    return APIResponse(
+        success=True,
+        message=f"Aggregated {summary['segments']} segment times from {summary['trips']} trips",
+        data=summary
+    )
+
+@router.get("/trips/{trip_id}/path", response_model=APIResponse)
+async def get_trip_path(
+    trip_id: str,
+    current_user: Auth0User = Depends(get_auth0_user),
+    trajectory_service: TrajectoryService = Depends()
+):
+    """Simplified path of a trip as encoded polylines (positions and their times)
+
+    Only trips of the caller's organization are visible, and drivers only see
+    their own trips; any other trip is reported as not found.
+    """
+    try:
+        trips = await live_position_store.resolve_trips([trip_id])
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Could not verify trip: {e}")
+    if not _can_view_trip(trips.get(trip_id), current_user):
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    result = await trajectory_service.get_trip_path(trip_id)
+    
+    if not result.success:
+        status_code = 404 if result.message == "Trip not found" else 500
+        raise HTTPException(status_code=status_code, detail=result.message)
+    
+    return result
+
+@router.post("/trajectories/compact", response_model=APIResponse)
+async def compact_trajectories(
+    limit: int = Query(100, ge=1, le=1000, description="Completed trips to compress in this run"),
+    prune_batches: int = Query(10, ge=0, le=1000, description="Batches of expired trips whose raw locations to delete"),
+    current_user: Auth0User = Depends(require_admin),
+    trajectory_service: TrajectoryService = Depends()
+):
+    """Store compressed paths for completed trips and prune raw locations past retention (Admin only, e.g. from a cron job)"""
+    result = await trajectory_service.run_retention(limit, prune_batches)
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return result
+
+def _subscribe(current_user: Auth0User, route_ids: List[str], bus_ids: List[str]) -> LiveFeedSubscription:
+    if not route_ids and not bus_ids:
+        raise HTTPException(status_code=400, detail="Subscribe to at least one route_id or bus_id")
+    if len(route_ids) + len(bus_ids) > settings.LIVE_FEED_MAX_TOPICS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.LIVE_FEED_MAX_TOPICS} routes and buses per feed")
+    return live_feed_hub.subscribe(current_user.organization_id, route_ids, bus_ids)
+
+@router.get("/stream")
+async def live_feed_events(
+    request: Request,
+    route_id: List[str] = Query([], description="Routes to follow"),
+    bus_id: List[str] = Query([], description="Buses to follow"),
+    access_token: Optional[str] = Query(None, description="Token, for clients that cannot send headers")
+):
+    """Server-Sent Events feed of position updates for the given routes and buses, plus urgent announcements"""
+    current_user = await get_stream_user(request.headers.get("authorization"), access_token)
+    subscription = _subscribe(current_user, route_id, bus_id)
+
+    return StreamingResponse(
+        live_feed_hub.events(subscription, settings.LIVE_FEED_HEARTBEAT_INTERVAL),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def live_feed_socket(
+    websocket: WebSocket,
+    route_id: List[str] = Query([]),
+    bus_id: List[str] = Query([]),
+    access_token: Optional[str] = Query(None)
+):
+    """WebSocket feed of position updates for the given routes and buses, plus urgent announcements"""
+    try:
+        current_user = await get_stream_user(websocket.headers.get("authorization"), access_token)
+        subscription = _subscribe(current_user, route_id, bus_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            messages = await subscription.next_messages(settings.LIVE_FEED_HEARTBEAT_INTERVAL)
+            for message in messages or [HEARTBEAT_MESSAGE]:
+                await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_feed_hub.unsubscribe(subscription)
@@ -0,0 +1,43 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.config.settings import settings
+from app.core.auth import require_admin, require_driver_or_admin, Auth0User
+from app.schemas.common import APIResponse
+from app.services.trip_service import TripMaterializer, TripService
+
+router = APIRouter()
+
+@router.get("/mine", response_model=APIResponse)
+async def get_my_trips(
+    days: int = Query(2, ge=1, le=14, description="Days from today to include"),
+    current_user: Auth0User = Depends(require_driver_or_admin),
+    trip_service: TripService = Depends()
+):
+    """The current driver's upcoming trips (Driver/Admin)"""
+    result = await trip_service.get_driver_trips(current_user.user_id, days)
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return result
+
+@router.post("/materialize", response_model=APIResponse)
+async def materialize_trips(
+    days: int = Query(settings.TRIP_MATERIALIZE_DAYS, ge=1, le=60, description="Days ahead to build trips for"),
+    start_date: Optional[date] = Query(None, description="First service date (default: today)"),
+    dry_run: bool = Query(False, description="Only report the changes"),
+    current_user: Auth0User = Depends(require_admin),
+    materializer: TripMaterializer = Depends()
+):
+    """Create, update and cancel scheduled trips to match the active schedules (Admin only, e.g. from a cron job)"""
+    try:
+        summary = await materializer.run(days, dry_run, start_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Trip materialization failed: {e}")
+    
+    if dry_run:
+        message = f"Would create {summary['create']} trips, update {summary['update']}, restore {summary['restore']}, cancel {summary['cancel']}"
+    else:
+        message = f"Created {summary['create']} trips, updated {summary['update']}, restored {summary['restore']}, cancelled {summary['cancel']}"
+    return APIResponse(success=True, message=message, data=summary)
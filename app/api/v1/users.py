@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional
-from app.models.user import UserCreate, UserUpdate, UserFilter, UserRole, UserStatus
+from app.models.user import UserCreate, UserUpdate, UserFilter, UserRole, UserStatus, CountMode
 from app.services.user_service import UserService
+from app.services.user_import_service import UserImportService
+from app.services.dashboard_service import DashboardService
 from app.core.auth import get_auth0_user, require_admin, Auth0User
 from app.schemas.common import APIResponse
 from app.schemas.auth import UserResponse
+from app.schemas.admin import ImportFormat
 
 router = APIRouter()
 
@@ -49,6 +53,25 @@ async def delete_my_account(
     
     return result
 
+@router.get("/me/dashboard", response_model=APIResponse)
+async def get_my_dashboard(
+    response: Response,
+    current_user: Auth0User = Depends(get_auth0_user),
+    dashboard_service: DashboardService = Depends()
+):
+    """Get the current user's home screen: profile, favorite routes, today's upcoming departures and announcements"""
+    result = await dashboard_service.get_dashboard(current_user.user_id, current_user.organization_id)
+    response.headers["Server-Timing"] = dashboard_service.server_timing()
+    
+    if not result.success:
+        raise HTTPException(
+            status_code=404 if result.message == "User not found" else 500,
+            detail=result.message,
+            headers={"Server-Timing": dashboard_service.server_timing()}
+        )
+    
+    return result
+
 # Admin-side CRUD operations (admin only)
 @router.post("/", response_model=APIResponse)
 async def create_user(
@@ -64,13 +87,64 @@ async def create_user(
     
     return result
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.JSONL,
+    "application/jsonl": ImportFormat.JSONL,
+    "application/x-jsonlines": ImportFormat.JSONL,
+}
+
+class UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse whose content reads the request body while it is sent.
+
+    StreamingResponse listens for the client disconnecting by reading the
+    ASGI receive channel, which would swallow the upload; this one only
+    streams. A client that goes away mid-upload ends the read with
+    ClientDisconnect, one that goes away later just stops receiving.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@router.post("/import", response_class=UploadStreamingResponse)
+async def import_users(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="csv or jsonl (default: from Content-Type)"),
+    current_user: Auth0User = Depends(require_admin),
+    import_service: UserImportService = Depends()
+):
+    """Bulk import users from a CSV or JSONL request body (Admin only)
+
+    The body is parsed as it streams in and imported chunk by chunk. The
+    response is NDJSON, streamed while the import runs: an "error" event per
+    rejected row, a "progress" event after every chunk and a final "summary"
+    event with the counts (and, if the import stopped early, why).
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    import_format = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if not import_format:
+        raise HTTPException(
+            status_code=400,
+            detail="Unknown import format. Send text/csv or application/x-ndjson, or pass ?format="
+        )
+
+    async def events():
+        async for event in import_service.import_users(request.stream(), import_format, current_user.user_id):
+            yield event.model_dump_json() + "\n"
+
+    return UploadStreamingResponse(events(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
 @router.get("/", response_model=APIResponse)
 async def get_users(
     role: Optional[UserRole] = Query(None, description="Filter by role"),
     status: Optional[UserStatus] = Query(None, description="Filter by status"),
-    search: Optional[str] = Query(None, description="Search by name or email"),
+    search: Optional[str] = Query(None, description="Search by name (fuzzy, ranked) or email substring; terms with @ only match email"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (overrides page; not with a name search)"),
+    count: CountMode = Query(CountMode.EXACT, description="Total count mode: exact, estimated or none"),
     current_user: Auth0User = Depends(require_admin),
     user_service: UserService = Depends()
 ):
@@ -80,7 +154,9 @@ async def get_users(
         status=status,
         search=search,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        cursor=cursor,
+        count=count
     )
     
     result = await user_service.get_users(filters)
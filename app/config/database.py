@@ -1,9 +1,86 @@
+import threading
+from typing import Any, Optional
+import httpx
+from postgrest.exceptions import APIError, generate_default_error_message
+from postgrest.utils import SyncClient
+from starlette.concurrency import run_in_threadpool
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from app.config.settings import settings
 
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One client per worker process, created lazily on first use so that Vercel
+# cold starts (where the lifespan hook may never run) still work.
+_supabase_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+def _build_pooled_session(session: SyncClient) -> SyncClient:
+    """Rebuild the PostgREST session with a bounded keep-alive pool"""
+    return SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=settings.SUPABASE_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+        http2=settings.SUPABASE_HTTP2 and HTTP2_AVAILABLE,
+    )
+
+def _create_supabase_client() -> Client:
+    """Create a Supabase client whose PostgREST session uses a shared connection pool"""
+    options = ClientOptions(
+        postgrest_client_timeout=settings.SUPABASE_TIMEOUT,
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY, options)
+    postgrest = client.postgrest
+    default_session = postgrest.session
+    postgrest.session = _build_pooled_session(default_session)
+    default_session.close()
+    return client
+
 def get_supabase_client() -> Client:
-    """Get Supabase client instance"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    """Get the shared Supabase client instance"""
+    global _supabase_client
+    if _supabase_client is None:
+        with _client_lock:
+            if _supabase_client is None:
+                _supabase_client = _create_supabase_client()
+    return _supabase_client
+
+def close_supabase_client() -> None:
+    """Close the shared Supabase client and release its pooled connections"""
+    global _supabase_client
+    with _client_lock:
+        client, _supabase_client = _supabase_client, None
+    if client is not None and client._postgrest is not None:
+        client._postgrest.aclose()
+
+async def run_query(query: Any) -> Any:
+    """Execute a Supabase query builder in the threadpool so it does not block the event loop"""
+    return await run_in_threadpool(query.execute)
+
+def _execute_count(query: Any) -> int:
+    response = query.session.request(
+        query.http_method, query.path, json=query.json, params=query.params, headers=query.headers
+    )
+    if not 200 <= response.status_code <= 299:
+        try:
+            raise APIError(response.json())
+        except ValueError:
+            raise APIError(generate_default_error_message(response))
+    total = response.headers.get("content-range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else 0
 
-# Remove global client initialization to avoid Vercel compatibility issues
-# supabase_client = get_supabase_client() 
\ No newline at end of file
+async def run_count(query: Any) -> int:
+    """Execute a write built with count=CountMethod.exact and returning=ReturnMethod.minimal and
+    return the number of rows it affected (postgrest-py drops the Content-Range count of an empty body)"""
+    return await run_in_threadpool(_execute_count, query)
@@ -0,0 +1,36 @@
+import asyncio
+from typing import Optional
+import httpx
+from app.config.settings import settings
+
+# Shared async HTTP client for outbound calls (Auth0). Like the Supabase client
+# it is created lazily; it is rebuilt if the running event loop changes, since
+# pooled connections cannot be reused across loops.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Create an async HTTP client with a bounded keep-alive pool"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for the current event loop"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = _create_http_client()
+        _http_client_loop = loop
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared async HTTP client"""
+    global _http_client, _http_client_loop
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
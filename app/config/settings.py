@@ -16,12 +16,104 @@ class Settings(BaseSettings):
     # Database Configuration
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+    SUPABASE_TIMEOUT: float = 10.0  # seconds
+    SUPABASE_MAX_CONNECTIONS: int = 20
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    SUPABASE_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    SUPABASE_HTTP2: bool = True  # only used when the h2 package is installed
     
     # Auth0 Configuration
     AUTH0_DOMAIN: str = os.getenv("AUTH0_DOMAIN", "")
     AUTH0_CLIENT_ID: str = os.getenv("AUTH0_CLIENT_ID", "")
     AUTH0_CLIENT_SECRET: str = os.getenv("AUTH0_CLIENT_SECRET", "")
     API_AUDIENCE: str = os.getenv("API_AUDIENCE", "")
+    AUTH0_TOKEN_REFRESH_MARGIN: int = 300  # refresh management tokens this many seconds before expiry
+    AUTH0_TOKEN_PERSIST: bool = False  # share management tokens across instances via Supabase
+    PRINCIPAL_CACHE_TTL: float = 60.0  # seconds an authenticated user lookup is reused
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    JWKS_CACHE_TTL: float = 3600.0  # seconds before signing keys are re-fetched
+    JWKS_MIN_REFRESH_INTERVAL: float = 30.0  # rate limit for refreshes on unknown kid
+    USER_SEARCH_CACHE_TTL: float = 30.0  # seconds admin search results are reused
+    USER_SEARCH_CACHE_SIZE: int = 1000
+    
+    # Bulk User Import
+    BULK_IMPORT_CHUNK_SIZE: int = 200  # rows per Supabase insert
+    BULK_IMPORT_AUTH0_CONCURRENCY: int = 8  # concurrent Auth0 user creations
+    
+    # Live Tracking Ingestion
+    LOCATION_QUEUE_SIZE: int = 20000  # buffered pings before ingestion answers 429
+    LOCATION_BATCH_SIZE: int = 500  # rows per bus_locations insert
+    LOCATION_FLUSH_INTERVAL: float = 1.0  # seconds a partial batch may wait
+    LOCATION_MAX_BATCH_PINGS: int = 200  # pings accepted in one request
+    LOCATION_MAX_CLOCK_SKEW: float = 30.0  # device timestamps further ahead of the server are clamped
+    LIVE_POSITION_MAX_AGE: float = 300.0  # seconds a bus counts as active after its last ping
+    LIVE_STATE_SYNC_INTERVAL: float = 1.0  # seconds between shared-backend syncs
+    TRIP_ROUTE_CACHE_TTL: float = 3600.0  # seconds a trip lookup (route, bus, driver) is reused
+    REDIS_URL: str = os.getenv("REDIS_URL", "")  # shared live state across workers (needs the redis package)
+    LIVE_FEED_HEARTBEAT_INTERVAL: float = 15.0  # seconds between keep-alives on idle feeds
+    LIVE_FEED_MAX_TOPICS: int = 20  # routes + buses per feed connection
+    
+    # ETA Prediction
+    ETA_ROUTE_CACHE_TTL: float = 600.0  # seconds a compiled route (ordered stops) is reused
+    ETA_LIVE_SPEED_HORIZON_KM: float = 2.0  # live speed dominates for roughly this far ahead of the bus
+    ETA_MIN_LIVE_SPEED_KMH: float = 5.0  # below this (e.g. at a stop) only historical times are used
+    ETA_SPEED_SMOOTHING: float = 0.3  # weight of the newest speed sample
+    ETA_OFF_ROUTE_KM: float = 0.5  # projection distance that triggers a full-route search
+    
+    # Automatic Trip Status
+    TRIP_GEOFENCE_RADIUS_M: float = 150.0  # fence around a route's first and last stop
+    TRIP_EARLY_DEPARTURE_MINUTES: float = 15.0  # departures detected at most this long before the scheduled time
+    TRIP_DELAY_THRESHOLD_MINUTES: float = 5.0  # a trip still at its first stop this long after departure time is delayed
+    TRIP_STATUS_FLUSH_INTERVAL: float = 2.0  # seconds between coalesced trip status writes
+    
+    # Segment Travel-Time Statistics
+    SERVICE_TIMEZONE: str = "UTC"  # timezone of schedules, weekdays and time-of-day buckets
+    SEGMENT_STATS_BUCKET_MINUTES: int = 60  # time-of-day bucket width
+    SEGMENT_STATS_MIN_SAMPLES: int = 3  # buckets with fewer trips are not used for ETAs
+    SEGMENT_STATS_DECAY: float = 0.05  # weight of a new trip once a bucket has 1/decay samples
+    SEGMENT_STATS_TRIP_BATCH: int = 50  # completed trips per aggregation batch
+    SEGMENT_STATS_CACHE_TTL: float = 3600.0  # seconds before the in-process statistics reload
+    
+    # Trajectory Compaction and Retention
+    TRAJECTORY_TOLERANCE_M: float = 10.0  # Douglas-Peucker tolerance for stored trip paths
+    LOCATION_RETENTION_DAYS: int = 30  # raw bus_locations of trips that ended longer ago are pruned
+    LOCATION_PRUNE_TRIPS: int = 10  # trips whose raw locations one prune delete removes
+    
+    # Stop Spatial Index
+    STOP_INDEX_CELL_DEGREES: float = 0.01  # grid cell size (~1.1 km of latitude)
+    STOP_INDEX_REFRESH_INTERVAL: float = 600.0  # seconds before the index reloads to pick up other workers' edits
+    
+    # Timetable
+    TIMETABLE_REFRESH_INTERVAL: float = 300.0  # seconds before the compiled timetable reloads to pick up other workers' edits
+    TRIP_MATERIALIZE_DAYS: int = 7  # days of trips built ahead by the materialization job
+    TRIP_MATERIALIZE_CHUNK: int = 500  # trip rows per upsert
+    
+    # Route Details Read Model
+    ROUTE_DETAILS_CACHE_SIZE: int = 1000  # routes kept
+    ROUTE_DETAILS_CACHE_TTL: float = 60.0  # seconds; bounds staleness from other workers' writes
+    
+    # User Dashboard
+    DASHBOARD_CACHE_SIZE: int = 10000  # entries per section cache
+    DASHBOARD_USER_TTL: float = 60.0  # seconds; per user, dropped on profile changes
+    DASHBOARD_FAVORITES_TTL: float = 300.0  # seconds; per user
+    DASHBOARD_SCHEDULES_TTL: float = 300.0  # seconds; per route, dropped on schedule changes
+    DASHBOARD_SCHEDULE_LIMIT: int = 20
+    DASHBOARD_ANNOUNCEMENT_LIMIT: int = 5
+    
+    # Announcements
+    ANNOUNCEMENT_CACHE_SIZE: int = 1000  # (organization, priority) feeds kept
+    ANNOUNCEMENT_CACHE_TTL: float = 300.0  # seconds; bounds staleness from other workers' writes
+    ANNOUNCEMENT_FEED_LIMIT: int = 50
+    
+    # Fleet Stats
+    FLEET_STATS_RECONCILE_INTERVAL: float = 900.0  # seconds between full recounts (and snapshots)
+    FLEET_STATS_RECOUNT_DELAY: float = 5.0  # seconds; stale groups are recounted together after this
+    
+    # Outbound HTTP Configuration (Auth0)
+    HTTP_TIMEOUT: float = 10.0  # seconds
+    HTTP_CONNECT_TIMEOUT: float = 5.0  # seconds
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
     
     # JWT Configuration
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
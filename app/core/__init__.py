@@ -1,7 +1,10 @@
-from .auth import get_current_user, get_auth0_user, require_role, require_admin, require_driver_or_admin
+from .auth import get_current_user, get_auth0_user, require_role, require_admin, require_driver_or_admin, invalidate_principal
+from .cache import TTLCache
+from .loader import DataLoader, Loaders, get_loaders
 from .database import get_supabase_client
 
 __all__ = [
-    "get_current_user", "get_auth0_user", "require_role", "require_admin", "require_driver_or_admin",
+    "get_current_user", "get_auth0_user", "require_role", "require_admin", "require_driver_or_admin", "invalidate_principal",
+    "TTLCache", "DataLoader", "Loaders", "get_loaders",
     "get_supabase_client"
 ] 
\ No newline at end of file
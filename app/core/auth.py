@@ -1,3 +1,4 @@
+import inspect
 import os
 from datetime import datetime, timedelta
 from typing import Optional
@@ -6,8 +7,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config.settings import settings
-from app.config.database import get_supabase_client
-from app.models.user import UserRole, UserResponse, TokenData
+from app.config.database import get_supabase_client, run_query
+from app.core.cache import TTLCache
+from app.core.security import verify_auth0_token
+from app.models.user import UserRole, UserResponse, TokenData, USER_RESPONSE_COLUMNS
 
 # Security configuration
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -24,6 +27,27 @@ class Auth0User:
         self.role = role
         self.organization_id = organization_id
 
+# Columns of the users table read into Auth0User, derived from its constructor
+# (user_id is stored as id) so the projection follows the class
+AUTH0_USER_COLUMNS = ",".join(
+    "id" if name == "user_id" else name
+    for name in inspect.signature(Auth0User.__init__).parameters if name != "self"
+)
+
+# Authenticated-principal cache: Auth0 sub -> Auth0User, so protected requests
+# skip the users lookup while an entry is fresh. _principal_subs maps users.id
+# back to the sub so services can invalidate after changing a user row; it is
+# re-set on every hit so it is never evicted before the principal it points to.
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+_principal_subs = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+def invalidate_principal(user_id: str) -> None:
+    """Drop the cached principal for a user so changes take effect immediately"""
+    auth0_id = _principal_subs.get(user_id)
+    if auth0_id:
+        principal_cache.invalidate(auth0_id)
+        _principal_subs.invalidate(user_id)
+
 # Password utilities
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -73,20 +97,22 @@ def verify_token(token: str) -> TokenData:
 async def get_auth0_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Auth0User:
     """Get current user for Auth0 compatibility"""
     try:
-        # Decode Auth0 token without verification (since we trust Auth0)
+        # Verify the Auth0 token offline (JWKS signature, expiry, issuer, audience)
+        # so invalid tokens are rejected before any database query
         token = credentials.credentials
-        decoded_token = jwt.decode(
-            token,
-            key=None,
-            options={"verify_signature": False, "verify_aud": False}
-        )
+        decoded_token = await verify_auth0_token(token)
         
         # Extract Auth0 user ID from token
         auth0_id = decoded_token["sub"]
         
+        cached_user = principal_cache.get(auth0_id)
+        if cached_user is not None:
+            _principal_subs.set(cached_user.user_id, auth0_id)
+            return cached_user
+        
         # Get user from Supabase using auth0_id
         supabase_client = get_supabase_client()
-        result = supabase_client.table("users").select("*").eq("auth0_id", auth0_id).execute()
+        result = await run_query(supabase_client.table("users").select(AUTH0_USER_COLUMNS).eq("auth0_id", auth0_id))
         
         if not result.data:
             raise HTTPException(
@@ -96,7 +122,7 @@ async def get_auth0_user(credentials: HTTPAuthorizationCredentials = Depends(sec
             )
         
         user_data = result.data[0]
-        return Auth0User(
+        user = Auth0User(
             user_id=user_data["id"],
             email=user_data["email"],
             name=user_data["name"],
@@ -105,6 +131,9 @@ async def get_auth0_user(credentials: HTTPAuthorizationCredentials = Depends(sec
             role=user_data["role"],
             organization_id=user_data.get("organization_id")
         )
+        principal_cache.set(auth0_id, user)
+        _principal_subs.set(user.user_id, auth0_id)
+        return user
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -113,12 +142,24 @@ async def get_auth0_user(credentials: HTTPAuthorizationCredentials = Depends(sec
         )
 
 # Authentication dependencies
+async def get_stream_user(authorization: Optional[str], access_token: Optional[str]) -> Auth0User:
+    """Authenticate a streaming connection through get_auth0_user.
+
+    Browsers cannot set headers on EventSource or WebSocket connections, so the
+    token may also be passed as the access_token query parameter.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    token = token if scheme.lower() == "bearer" and token else access_token
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return await get_auth0_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserResponse:
     token_data = verify_token(credentials.credentials)
     
     # Get user from Supabase
     supabase_client = get_supabase_client()
-    result = supabase_client.table("users").select("*").eq("id", token_data.user_id).execute()
+    result = await run_query(supabase_client.table("users").select(USER_RESPONSE_COLUMNS).eq("id", token_data.user_id))
     
     if not result.data:
         raise HTTPException(
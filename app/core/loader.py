@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from app.config.database import get_supabase_client, run_query
+
+ID_CHUNK_SIZE = 100  # keys per in.(...) filter, keeps the URL short
+
+Row = Dict[str, Any]
+
+class DataLoader:
+    """Batches and de-duplicates row lookups by key for one request.
+
+    load() only queues the key; all keys queued while the event loop runs the
+    current batch of ready callbacks (e.g. the coroutines of one gather) are
+    fetched together with a single in_() query. Every key is fetched at most
+    once per loader; missing rows resolve to None.
+    """
+
+    def __init__(self, table: str, columns: str, key_column: str = "id"):
+        self.table = table
+        self.key_column = key_column
+        self.columns = columns if key_column in columns.split(",") else f"{columns},{key_column}"
+        self._rows: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self.batches = 0
+
+    def prime(self, key: Hashable, row: Optional[Row]) -> None:
+        """Seed a row the caller already has so it is never fetched"""
+        if key not in self._rows:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(row)
+            self._rows[key] = future
+
+    def load(self, key: Optional[Hashable]) -> "asyncio.Future[Optional[Row]]":
+        """Future of the row with this key, fetched with the other keys queued in the same tick"""
+        loop = asyncio.get_running_loop()
+        if key is None:
+            future = loop.create_future()
+            future.set_result(None)
+            return future
+        future = self._rows.get(key)
+        if future is None:
+            future = self._rows[key] = loop.create_future()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[Optional[Hashable]]) -> List[Optional[Row]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        asyncio.get_running_loop().create_task(self._fetch(keys))
+
+    async def _fetch(self, keys: List[Hashable]) -> None:
+        try:
+            rows: Dict[Hashable, Row] = {}
+            for i in range(0, len(keys), ID_CHUNK_SIZE):
+                result = await run_query(
+                    get_supabase_client().table(self.table)
+                    .select(self.columns)
+                    .in_(self.key_column, keys[i:i + ID_CHUNK_SIZE])
+                )
+                self.batches += 1
+                rows.update((row[self.key_column], row) for row in result.data)
+            for key in keys:
+                self._rows[key].set_result(rows.get(key))
+        except Exception as e:
+            for key in keys:
+                future = self._rows.pop(key)  # not remembered, a later load retries
+                if not future.done():
+                    future.set_exception(e)
+
+class Loaders:
+    """Request-scoped DataLoaders, one per (table, columns, key column).
+
+    Obtain it through Depends(get_loaders): FastAPI resolves a dependency once
+    per request, so every service of the request shares the same loaders and
+    their batches.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[Tuple[str, str, str], DataLoader] = {}
+
+    def get(self, table: str, columns: str, key_column: str = "id") -> DataLoader:
+        key = (table, columns, key_column)
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = self._loaders[key] = DataLoader(table, columns, key_column)
+        return loader
+
+    @property
+    def batches(self) -> int:
+        return sum(loader.batches for loader in self._loaders.values())
+
+def get_loaders() -> Loaders:
+    """Dependency providing the request's loaders"""
+    return Loaders()
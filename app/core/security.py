@@ -1 +1,86 @@
 # Security and authentication logic
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from jose import JWTError, jwt
+from app.config.settings import settings
+from app.config.http_client import get_http_client
+
+class JWKSCache:
+    """In-memory cache of the Auth0 tenant's JSON Web Key Set, keyed by kid"""
+
+    def __init__(self, jwks_url: Optional[str] = None):
+        self.jwks_url = jwks_url
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0  # monotonic time of the last refresh attempt
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def load(self, jwks: Dict[str, Any]) -> None:
+        """Replace the cached keys with a JWKS document ({"keys": [...]})"""
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._fetched_at = time.monotonic()
+
+    async def fetch_jwks(self) -> Dict[str, Any]:
+        """Download the tenant's JWKS document"""
+        url = self.jwks_url or f"https://{settings.AUTH0_DOMAIN}/.well-known/jwks.json"
+        response = await get_http_client().get(url)
+        response.raise_for_status()
+        return response.json()
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def get_signing_key(self, kid: str) -> Dict[str, Any]:
+        """Get the JWK for a kid, refreshing the set (rate limited) when it is unknown or stale"""
+        stale = time.monotonic() - self._fetched_at > settings.JWKS_CACHE_TTL
+        if kid in self._keys and not stale:
+            return self._keys[kid]
+
+        async with self._get_lock():
+            stale = time.monotonic() - self._fetched_at > settings.JWKS_CACHE_TTL
+            can_refresh = time.monotonic() - self._fetched_at >= settings.JWKS_MIN_REFRESH_INTERVAL
+            if (kid not in self._keys or stale) and can_refresh:
+                # Record the attempt first so failures are rate limited too
+                self._fetched_at = time.monotonic()
+                try:
+                    self.load(await self.fetch_jwks())
+                except Exception as e:
+                    print(f"Warning: Failed to refresh JWKS: {e}")
+
+        if kid not in self._keys:
+            raise JWTError("Unknown signing key")
+        return self._keys[kid]
+
+# Process-wide JWKS cache for the configured Auth0 tenant
+jwks_cache = JWKSCache()
+
+async def verify_auth0_token(
+    token: str,
+    audience: Optional[str] = None,
+    access_token: Optional[str] = None
+) -> Dict[str, Any]:
+    """Verify an Auth0-issued RS256 JWT offline and return its claims.
+
+    Checks signature, expiry, issuer and (when configured) audience. Raises
+    JWTError for any invalid token.
+    """
+    header = jwt.get_unverified_header(token)
+    if header.get("alg") != "RS256" or not header.get("kid"):
+        raise JWTError("Unsupported token header")
+
+    key = await jwks_cache.get_signing_key(header["kid"])
+    audience = audience if audience is not None else settings.API_AUDIENCE
+    return jwt.decode(
+        token,
+        key,
+        algorithms=["RS256"],
+        audience=audience or None,
+        issuer=f"https://{settings.AUTH0_DOMAIN}/",
+        access_token=access_token,
+        options={"verify_aud": bool(audience)}
+    )
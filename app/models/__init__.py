@@ -1,15 +1,15 @@
 from .user import UserRole, UserBase, UserCreate, UserResponse, TokenData
 from .bus import BusStatus, BusBase, BusCreate, BusResponse
-from .route import RouteBase, RouteCreate, RouteResponse
-from .stop import StopBase, StopCreate, StopResponse
-from .schedule import ScheduleBase, ScheduleCreate, ScheduleResponse
+from .route import RouteBase, RouteCreate, RouteResponse, RouteStopBase, RouteStopCreate, RouteStopResponse
+from .stop import StopBase, StopCreate, StopUpdate, StopResponse, NearbyStop
+from .schedule import ScheduleBase, ScheduleCreate, ScheduleUpdate, ScheduleResponse, ScheduleDeparture
 from .trip import TripStatus, TripBase, TripCreate, TripResponse
 
 __all__ = [
     "UserRole", "UserBase", "UserCreate", "UserResponse", "TokenData",
     "BusStatus", "BusBase", "BusCreate", "BusResponse",
-    "RouteBase", "RouteCreate", "RouteResponse",
-    "StopBase", "StopCreate", "StopResponse",
-    "ScheduleBase", "ScheduleCreate", "ScheduleResponse",
+    "RouteBase", "RouteCreate", "RouteResponse", "RouteStopBase", "RouteStopCreate", "RouteStopResponse",
+    "StopBase", "StopCreate", "StopUpdate", "StopResponse", "NearbyStop",
+    "ScheduleBase", "ScheduleCreate", "ScheduleUpdate", "ScheduleResponse", "ScheduleDeparture",
     "TripStatus", "TripBase", "TripCreate", "TripResponse"
 ] 
\ No newline at end of file
@@ -1,12 +1,21 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from enum import Enum
+from app.utils.helpers import model_columns
+
+class AnnouncementPriority(str, Enum):
+    """Announcement priority enumeration"""
+    LOW = "low"
+    NORMAL = "normal"
+    HIGH = "high"
+    URGENT = "urgent"  # also pushed to connected clients
 
 class AnnouncementBase(BaseModel):
     title: str
     message: str
     type: str  # delay, holiday, policy, general
-    priority: str = "normal"  # low, normal, high, urgent
+    priority: AnnouncementPriority = AnnouncementPriority.NORMAL
     is_active: bool = True
 
 class AnnouncementCreate(AnnouncementBase):
@@ -16,14 +25,17 @@ class AnnouncementUpdate(BaseModel):
     title: Optional[str] = None
     message: Optional[str] = None
     type: Optional[str] = None
-    priority: Optional[str] = None
+    priority: Optional[AnnouncementPriority] = None
     is_active: Optional[bool] = None
 
 class AnnouncementResponse(AnnouncementBase):
     id: str
+    organization_id: Optional[str] = None  # None: shown to every organization
     created_by: str
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+ANNOUNCEMENT_COLUMNS = model_columns(AnnouncementResponse)
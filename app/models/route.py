@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
+from app.models.stop import StopResponse
+from app.utils.helpers import model_columns
 
 class RouteBase(BaseModel):
     """Base route model"""
@@ -28,3 +30,24 @@ class RouteResponse(RouteBase):
 
     class Config:
         from_attributes = True
+
+class RouteStopBase(BaseModel):
+    """A stop's position in a route's ordered stop sequence"""
+    route_id: str
+    stop_id: str
+    stop_order: int = Field(..., ge=1)
+
+class RouteStopCreate(RouteStopBase):
+    """Route stop creation model"""
+    pass
+
+class RouteStopResponse(RouteStopBase):
+    """Route stop response model"""
+    id: str
+    stop: Optional[StopResponse] = None
+
+    class Config:
+        from_attributes = True
+
+ROUTE_COLUMNS = model_columns(RouteResponse)
+ROUTE_STOP_COLUMNS = model_columns(RouteStopResponse, exclude={"stop"})
@@ -1,6 +1,7 @@
 from datetime import datetime, time
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from app.utils.helpers import model_columns
 
 class ScheduleBase(BaseModel):
     """Base schedule model"""
@@ -8,13 +9,34 @@ class ScheduleBase(BaseModel):
     bus_id: str
     departure_time: time
     arrival_time: time
-    days_of_week: list = Field(..., min_items=1, max_items=7)  # 1=Monday, 7=Sunday
+    days_of_week: List[int] = Field(..., min_length=1, max_length=7)  # 1=Monday, 7=Sunday
     is_active: bool = True
 
+    @field_validator("days_of_week")
+    @classmethod
+    def validate_days_of_week(cls, days: List[int]) -> List[int]:
+        if any(day < 1 or day > 7 for day in days):
+            raise ValueError("days_of_week values must be 1 (Monday) to 7 (Sunday)")
+        return sorted(set(days))
+
 class ScheduleCreate(ScheduleBase):
     """Schedule creation model"""
     pass
 
+class ScheduleUpdate(BaseModel):
+    """Schedule update model"""
+    route_id: Optional[str] = None
+    bus_id: Optional[str] = None
+    departure_time: Optional[time] = None
+    arrival_time: Optional[time] = None
+    days_of_week: Optional[List[int]] = Field(None, min_length=1, max_length=7)
+    is_active: Optional[bool] = None
+
+    @field_validator("days_of_week")
+    @classmethod
+    def validate_days_of_week(cls, days: Optional[List[int]]) -> Optional[List[int]]:
+        return None if days is None else ScheduleBase.validate_days_of_week(days)
+
 class ScheduleResponse(ScheduleBase):
     """Schedule response model"""
     id: str
@@ -23,3 +45,13 @@ class ScheduleResponse(ScheduleBase):
 
     class Config:
         from_attributes = True
+
+class ScheduleDeparture(BaseModel):
+    """One upcoming departure of a schedule"""
+    schedule_id: str
+    route_id: str
+    bus_id: str
+    departure: datetime
+    arrival: datetime
+
+SCHEDULE_COLUMNS = model_columns(ScheduleResponse)
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
+from app.utils.helpers import model_columns
 
 class StopBase(BaseModel):
     """Base stop model"""
@@ -14,6 +15,14 @@ class StopCreate(StopBase):
     """Stop creation model"""
     pass
 
+class StopUpdate(BaseModel):
+    """Stop update model"""
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    location: Optional[str] = Field(None, min_length=1, max_length=200)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    description: Optional[str] = Field(None, max_length=500)
+
 class StopResponse(StopBase):
     """Stop response model"""
     id: str
@@ -21,4 +30,10 @@ class StopResponse(StopBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class NearbyStop(StopResponse):
+    """Stop with its distance from the query point"""
+    distance_km: float
+
+STOP_COLUMNS = model_columns(StopResponse)
@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from enum import Enum
 from pydantic import BaseModel, Field
+from app.utils.helpers import model_columns
 
 class TripStatus(str, Enum):
     """Trip status enumeration"""
@@ -17,6 +18,9 @@ class TripBase(BaseModel):
     driver_id: str
     bus_id: str
     status: TripStatus = TripStatus.SCHEDULED
+    service_date: Optional[date] = None  # day of the schedule this trip runs
+    scheduled_departure: Optional[datetime] = None
+    scheduled_arrival: Optional[datetime] = None
     actual_departure_time: Optional[datetime] = None
     actual_arrival_time: Optional[datetime] = None
     current_location: Optional[str] = None
@@ -34,3 +38,5 @@ class TripResponse(TripBase):
 
     class Config:
         from_attributes = True
+
+TRIP_COLUMNS = model_columns(TripResponse)
@@ -2,6 +2,11 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum
 from pydantic import BaseModel, EmailStr, Field
+from app.models.announcement import AnnouncementResponse
+from app.models.route import RouteResponse, RouteStopResponse
+from app.models.schedule import ScheduleResponse
+from app.models.trip import TripResponse
+from app.utils.helpers import model_columns
 
 class UserRole(str, Enum):
     """User role enumeration"""
@@ -15,6 +20,12 @@ class UserStatus(str, Enum):
     INACTIVE = "inactive"
     SUSPENDED = "suspended"
 
+class CountMode(str, Enum):
+    """How the total row count of a listing is computed"""
+    EXACT = "exact"
+    ESTIMATED = "estimated"  # planner estimate for large tables, exact for small ones
+    NONE = "none"
+
 class UserBase(BaseModel):
     """Base user model"""
     email: EmailStr
@@ -65,17 +76,20 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+# Columns of the users table read into UserResponse (is_active is not a column)
+USER_RESPONSE_COLUMNS = model_columns(UserResponse, exclude={"is_active"})
+
 class UserDashboard(BaseModel):
     user: UserResponse
-    favorite_routes: list  # List[RouteResponse]
-    upcoming_schedules: list  # List[ScheduleResponse]
-    recent_announcements: list  # List[AnnouncementResponse]
+    favorite_routes: List[RouteResponse]
+    upcoming_schedules: List[ScheduleResponse]  # favorite routes' remaining departures today
+    recent_announcements: List[AnnouncementResponse]
 
 class RouteDetails(BaseModel):
-    route: object  # RouteResponse
-    stops: list  # List[RouteStopResponse]
-    schedules: list  # List[ScheduleResponse]
-    current_trips: list  # List[TripResponse]
+    route: RouteResponse
+    stops: List[RouteStopResponse]  # in stop order
+    schedules: List[ScheduleResponse]  # active ones, by departure time
+    current_trips: List[TripResponse]  # in progress or delayed
 
 class TokenData(BaseModel):
     """Token data model"""
@@ -83,11 +97,16 @@ class TokenData(BaseModel):
     email: str
     role: str
 
+class UserListItem(UserResponse):
+    """User in the admin list, with the creating admin's name resolved"""
+    created_by_name: Optional[str] = None
+
 class UserListResponse(BaseModel):
-    users: List[UserResponse]
-    total: int
+    users: List[UserListItem]
+    total: Optional[int] = None  # not computed for cursor pages or count=none
     page: int
     per_page: int
+    next_cursor: Optional[str] = None  # pass as `cursor` to fetch the next page
 
 class UserFilter(BaseModel):
     role: Optional[UserRole] = None
@@ -95,3 +114,5 @@ class UserFilter(BaseModel):
     search: Optional[str] = None
     page: int = 1
     per_page: int = 20
+    cursor: Optional[str] = None  # keyset pagination on (created_at, id); overrides page
+    count: CountMode = CountMode.EXACT
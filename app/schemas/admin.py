@@ -1 +1,37 @@
 # Admin schema
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+class ImportFormat(str, Enum):
+    """Bulk import upload format"""
+    CSV = "csv"
+    JSONL = "jsonl"
+
+class UserImportRowError(BaseModel):
+    """Problem with a single row of a bulk import"""
+    type: str = "error"
+    row: int
+    email: Optional[str] = None
+    stage: str  # validation, auth0, database
+    errors: List[str]
+
+class UserImportProgress(BaseModel):
+    """Running totals of a bulk import, emitted after every chunk and at the end"""
+    type: str = "progress"  # "summary" for the final event
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    auth0_failed: int = 0
+    error: Optional[str] = None  # why the import stopped before the end of the upload
+
+class FleetStatsSnapshot(BaseModel):
+    """Fleet dashboard counts; groups only list non-zero values"""
+    buses_by_status: Dict[str, int]
+    trips_by_status: Dict[str, int]
+    users_by_role: Dict[str, int]
+    users_by_status: Dict[str, int]
+    active_trips_by_route: Dict[str, int]  # in-progress and delayed trips
+    reconciled_at: Optional[datetime] = None  # last full recount, possibly by another worker
+    stale: List[str] = []  # groups waiting for a recount
@@ -1 +1,12 @@
 # Announcement schema
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from app.models.announcement import AnnouncementPriority, AnnouncementResponse
+
+class AnnouncementFeed(BaseModel):
+    """Active announcements an organization's riders see, newest first"""
+    organization_id: Optional[str] = None
+    priority: Optional[AnnouncementPriority] = None  # None: all priorities
+    announcements: List[AnnouncementResponse]
+    last_modified: datetime
@@ -1,6 +1,7 @@
 from typing import Optional
 from pydantic import BaseModel, EmailStr, Field
 from app.models.user import UserRole
+from app.utils.helpers import model_columns
 
 class LoginRequest(BaseModel):
     """Login request schema"""
@@ -41,6 +42,9 @@ class UserResponse(BaseModel):
     role: str
     organization_id: Optional[str] = None
 
+# Columns of the users table returned in the login payload
+LOGIN_USER_COLUMNS = model_columns(UserResponse)
+
 class AuthResponse(BaseModel):
     """Authentication response schema"""
     access_token: str
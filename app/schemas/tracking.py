@@ -1 +1,36 @@
 # Tracking schema
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+from app.models.tracking import BusLocationCreate
+
+class LocationPing(BusLocationCreate):
+    """A single GPS ping from a driver device"""
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    speed: Optional[float] = Field(None, ge=0)  # km/h
+    heading: Optional[float] = Field(None, ge=0, lt=360)  # degrees
+    timestamp: Optional[datetime] = None  # device time; server receive time when omitted
+
+class LocationIngestResult(BaseModel):
+    """Outcome of an ingestion request"""
+    accepted: int
+    queue_depth: int
+
+class StopEta(BaseModel):
+    """Predicted arrival of a trip at one of its upcoming stops"""
+    stop_id: str
+    name: str
+    stop_index: int  # position in the route's stop sequence, 0-based
+    distance_km: float  # along the route from the bus
+    eta: datetime
+    seconds: int  # from now
+
+class TripPath(BaseModel):
+    """A trip's simplified trajectory as encoded polylines"""
+    trip_id: str
+    polyline: str  # encoded latitude/longitude, precision 5
+    times: str  # encoded seconds since started_at, precision 0
+    started_at: Optional[datetime] = None
+    points: int
+    raw_points: int  # pings recorded before simplification
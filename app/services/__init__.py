@@ -1,4 +1,21 @@
 from .auth_service import AuthService
 from .user_service import UserService
+from .auth0_token_service import Auth0TokenService, auth0_token_service
+from .user_import_service import UserImportService
+from .location_ingest_service import LocationIngestService
+from .live_position_store import LivePosition, LivePositionStore
+from .stop_service import StopService, StopIndex
+from .schedule_service import ScheduleService, TimetableIndex
+from .trip_service import TripService, TripMaterializer
+from .route_service import RouteDetailsCache
+from .dashboard_service import DashboardService
+from .announcement_service import AnnouncementService, AnnouncementFeedCache
+from .fleet_stats_service import FleetStats
 
-__all__ = ["AuthService", "UserService"] 
\ No newline at end of file
+__all__ = [
+    "AuthService", "UserService", "Auth0TokenService", "auth0_token_service", "UserImportService",
+    "LocationIngestService", "LivePosition", "LivePositionStore", "StopService", "StopIndex",
+    "ScheduleService", "TimetableIndex", "TripService", "TripMaterializer",
+    "RouteDetailsCache", "DashboardService", "AnnouncementService", "AnnouncementFeedCache",
+    "FleetStats"
+]
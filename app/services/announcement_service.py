@@ -0,0 +1,203 @@
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.models.announcement import (
+    AnnouncementCreate, AnnouncementUpdate, AnnouncementPriority, AnnouncementResponse, ANNOUNCEMENT_COLUMNS
+)
+from app.schemas.announcement import AnnouncementFeed
+from app.schemas.common import APIResponse
+from app.services.live_feed_hub import live_feed_hub
+from app.utils.helpers import make_etag, or_filter, order_by, quote_value, returning
+
+FeedKey = Tuple[Optional[str], Optional[str]]  # (organization_id, priority or None for all)
+
+class AnnouncementFeedEntry:
+    """A built feed, already JSON-shaped, with its validators"""
+    __slots__ = ("version", "announcements", "data", "etag", "last_modified")
+
+    def __init__(self, version: Tuple[int, int], feed: AnnouncementFeed):
+        self.version = version
+        self.announcements = feed.announcements
+        self.data = feed.model_dump(mode="json")
+        self.etag = make_etag(self.data)
+        self.last_modified = feed.last_modified
+
+class AnnouncementFeedCache:
+    """Read model for announcements: the active announcements of an organization
+    (its own plus global ones), optionally of one priority, cached per
+    (organization, priority).
+
+    Every organization has a version, bumped by announcement writes on this
+    worker (a global announcement bumps the global version, which every entry
+    also carries); entries only serve while their versions are current and
+    expire after ANNOUNCEMENT_CACHE_TTL to pick up other workers' writes.
+    Last-Modified is the newest updated_at in the feed or the last local
+    write that affected it, so deactivations also move it forward.
+    Concurrent misses for a key share one fetch.
+    """
+
+    def __init__(self):
+        self._entries = TTLCache(maxsize=settings.ANNOUNCEMENT_CACHE_SIZE, ttl=settings.ANNOUNCEMENT_CACHE_TTL)
+        self._versions: Dict[Optional[str], int] = defaultdict(int)
+        self._changed_at: Dict[Optional[str], datetime] = {}
+        self._building: Dict[FeedKey, asyncio.Future] = {}
+        self._started_at = datetime.now(timezone.utc).replace(microsecond=0)
+        self.builds = 0
+
+    def _version(self, organization_id: Optional[str]) -> Tuple[int, int]:
+        return self._versions[organization_id], self._versions[None]
+
+    def bump(self, organization_id: Optional[str]) -> None:
+        """Mark an organization's announcements (every organization's when None) as changed"""
+        self._versions[organization_id] += 1
+        self._changed_at[organization_id] = datetime.now(timezone.utc)
+
+    async def get(self, organization_id: Optional[str], priority: Optional[AnnouncementPriority] = None) -> AnnouncementFeedEntry:
+        key = (organization_id, priority.value if priority else None)
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == self._version(organization_id):
+            return entry
+
+        building = self._building.get(key)
+        if building is not None and building.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(building)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            entry = await self._build(organization_id, priority)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, waiters get it re-raised
+            raise
+        finally:
+            self._building.pop(key, None)
+
+    async def _build(self, organization_id: Optional[str], priority: Optional[AnnouncementPriority]) -> AnnouncementFeedEntry:
+        version = self._version(organization_id)
+        query = (
+            get_supabase_client().table("announcements")
+            .select(ANNOUNCEMENT_COLUMNS)
+            .eq("is_active", True)
+            .limit(settings.ANNOUNCEMENT_FEED_LIMIT)
+        )
+        if organization_id:
+            query = or_filter(query, f"organization_id.eq.{quote_value(organization_id)}", "organization_id.is.null")
+        else:
+            query = query.is_("organization_id", "null")
+        if priority:
+            query = query.eq("priority", priority.value)
+        result = await run_query(order_by(query, "created_at.desc", "id.desc"))
+
+        announcements = [AnnouncementResponse(**row) for row in result.data]
+        changes = [announcement.updated_at for announcement in announcements]
+        changes += [self._changed_at[org] for org in (organization_id, None) if org in self._changed_at]
+        last_modified = max(
+            (changed if changed.tzinfo else changed.replace(tzinfo=timezone.utc) for changed in changes),
+            default=self._started_at
+        )
+        entry = AnnouncementFeedEntry(version, AnnouncementFeed(
+            organization_id=organization_id,
+            priority=priority,
+            announcements=announcements,
+            last_modified=last_modified,
+        ))
+        self._entries.set((organization_id, priority.value if priority else None), entry)
+        self.builds += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._entries.stats(), "builds": self.builds}
+
+# Process-wide announcement read model
+announcement_feed_cache = AnnouncementFeedCache()
+
+def encode_announcement(announcement: AnnouncementResponse, message_type: str = "announcement") -> str:
+    """Live feed message for an urgent announcement ("announcement") or one that no longer is ("announcement_withdrawn")"""
+    return json.dumps({"type": message_type, "announcement": announcement.model_dump(mode="json")}, separators=(",", ":"))
+
+class AnnouncementService:
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def create_announcement(self, announcement_data: AnnouncementCreate, created_by: str,
+                                  organization_id: Optional[str]) -> APIResponse:
+        """Create an announcement for an organization (admin only)"""
+        try:
+            row = {
+                **announcement_data.model_dump(mode="json"),
+                "organization_id": organization_id,
+                "created_by": created_by,
+            }
+            result = await run_query(returning(self.supabase.table("announcements").insert(row), ANNOUNCEMENT_COLUMNS))
+            announcement = AnnouncementResponse(**result.data[0])
+            self._changed(announcement)
+            return APIResponse(
+                success=True,
+                message="Announcement created successfully",
+                data=announcement
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to create announcement",
+                errors=[str(e)]
+            )
+
+    async def update_announcement(self, announcement_id: str, announcement_data: AnnouncementUpdate,
+                                  organization_id: Optional[str]) -> APIResponse:
+        """Update an announcement of the admin's organization (admin only); other organizations' are not found"""
+        try:
+            update_data = announcement_data.model_dump(mode="json", exclude_unset=True)
+            update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+            query = self.supabase.table("announcements").update(update_data).eq("id", announcement_id)
+            if organization_id:
+                query = query.eq("organization_id", organization_id)
+            else:
+                query = query.is_("organization_id", "null")  # admins without an organization manage global ones
+            result = await run_query(returning(query, ANNOUNCEMENT_COLUMNS))
+
+            if not result.data:
+                return APIResponse(
+                    success=False,
+                    message="Announcement not found",
+                    errors=["Announcement with this ID does not exist"]
+                )
+
+            announcement = AnnouncementResponse(**result.data[0])
+            self._changed(announcement, withdraw="is_active" in update_data or "priority" in update_data)
+            return APIResponse(
+                success=True,
+                message="Announcement updated successfully",
+                data=announcement
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to update announcement",
+                errors=[str(e)]
+            )
+
+    @staticmethod
+    def _changed(announcement: AnnouncementResponse, withdraw: bool = False) -> None:
+        """Invalidate the organization's feeds and push the announcement if it is urgent.
+
+        withdraw: the write may have deactivated or downgraded an urgent
+        announcement, so one that is no longer urgent is pushed as withdrawn
+        (clients drop it if they showed it, and ignore it otherwise).
+        """
+        announcement_feed_cache.bump(announcement.organization_id)
+        key = f"announcement:{announcement.id}"
+        if announcement.is_active and announcement.priority == AnnouncementPriority.URGENT:
+            live_feed_hub.broadcast(announcement.organization_id, key, encode_announcement(announcement))
+        elif withdraw:
+            live_feed_hub.broadcast(
+                announcement.organization_id, key, encode_announcement(announcement, "announcement_withdrawn")
+            )
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from app.config.settings import settings
+from app.config.database import get_supabase_client, run_query
+from app.config.http_client import get_http_client
+
+class CachedToken(NamedTuple):
+    access_token: str
+    expires_at: float  # epoch seconds
+
+class Auth0TokenService:
+    """Caches Auth0 Management API tokens until shortly before they expire"""
+
+    def __init__(self):
+        self._tokens: Dict[Tuple[str, str], CachedToken] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self, key: Tuple[str, str]) -> asyncio.Lock:
+        """Get the refresh lock for a tenant/client pair on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._locks = {}
+            self._loop = loop
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    @staticmethod
+    def _is_fresh(token: Optional[CachedToken]) -> bool:
+        return token is not None and token.expires_at - settings.AUTH0_TOKEN_REFRESH_MARGIN > time.time()
+
+    async def get_management_token(
+        self,
+        domain: Optional[str] = None,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None
+    ) -> str:
+        """Get a Management API token, fetching a new one only when the cached one is about to expire"""
+        domain = domain or settings.AUTH0_DOMAIN
+        client_id = client_id or settings.AUTH0_CLIENT_ID
+        client_secret = client_secret or settings.AUTH0_CLIENT_SECRET
+        key = (domain, client_id)
+
+        token = self._tokens.get(key)
+        if self._is_fresh(token):
+            return token.access_token
+
+        # Single-flight: concurrent callers wait for the one refresh in progress
+        async with self._get_lock(key):
+            token = self._tokens.get(key)
+            if self._is_fresh(token):
+                return token.access_token
+
+            if settings.AUTH0_TOKEN_PERSIST:
+                token = await self._load_persisted_token(key)
+            if not self._is_fresh(token):
+                token = await self._fetch_token(domain, client_id, client_secret)
+                if settings.AUTH0_TOKEN_PERSIST:
+                    await self._persist_token(key, token)
+
+            self._tokens[key] = token
+            return token.access_token
+
+    def invalidate(self, domain: Optional[str] = None, client_id: Optional[str] = None) -> None:
+        """Drop a cached token, e.g. after the Management API rejected it"""
+        self._tokens.pop((domain or settings.AUTH0_DOMAIN, client_id or settings.AUTH0_CLIENT_ID), None)
+
+    async def _fetch_token(self, domain: str, client_id: str, client_secret: str) -> CachedToken:
+        """Run the client-credentials exchange against Auth0"""
+        payload = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "audience": f"https://{domain}/api/v2/",
+            "grant_type": "client_credentials"
+        }
+
+        response = await get_http_client().post(f"https://{domain}/oauth/token", json=payload)
+        if response.status_code != 200:
+            error_data = response.json() if response.content else {}
+            raise Exception(f"Failed to get management token: {response.status_code} - {error_data}")
+
+        token_data = response.json()
+        access_token = token_data.get("access_token")
+        if not access_token:
+            raise Exception("No access token in response")
+
+        return CachedToken(access_token, time.time() + int(token_data.get("expires_in", 86400)))
+
+    async def _load_persisted_token(self, key: Tuple[str, str]) -> Optional[CachedToken]:
+        """Load a token persisted by another instance (survives serverless cold starts)"""
+        try:
+            result = await run_query(
+                get_supabase_client().table("auth0_token_cache")
+                .select("access_token,expires_at")
+                .eq("cache_key", ":".join(key))
+            )
+            if result.data:
+                row = result.data[0]
+                return CachedToken(row["access_token"], float(row["expires_at"]))
+        except Exception as e:
+            print(f"Warning: Failed to load persisted Auth0 token: {e}")
+        return None
+
+    async def _persist_token(self, key: Tuple[str, str], token: CachedToken) -> None:
+        """Persist a freshly fetched token for other instances"""
+        try:
+            await run_query(
+                get_supabase_client().table("auth0_token_cache").upsert({
+                    "cache_key": ":".join(key),
+                    "access_token": token.access_token,
+                    "expires_at": int(token.expires_at)
+                })
+            )
+        except Exception as e:
+            print(f"Warning: Failed to persist Auth0 token: {e}")
+
+# Process-wide token cache shared by all services
+auth0_token_service = Auth0TokenService()
@@ -1,32 +1,25 @@
 import os
-import requests
 from typing import Optional, Dict, Any
-from jose import jwt
 from app.config.settings import settings
-from app.config.database import get_supabase_client
-from app.schemas.auth import LoginRequest, RegisterRequest, AuthResponse, UserResponse
+from app.config.database import get_supabase_client, run_query
+from app.config.http_client import get_http_client
+from app.core.security import verify_auth0_token
+from app.services.auth0_token_service import auth0_token_service
+from app.services.fleet_stats_service import fleet_stats
+from app.schemas.auth import LoginRequest, RegisterRequest, AuthResponse, UserResponse, LOGIN_USER_COLUMNS
+from app.utils.helpers import returning
 from app.schemas.common import APIResponse
 
 class AuthService:
     """Authentication service for handling Auth0 and Supabase integration"""
     
     @staticmethod
-    def get_management_token() -> str:
-        """Get Auth0 management API token"""
-        url = f"https://{settings.AUTH0_DOMAIN}/oauth/token"
-        payload = {
-            "client_id": settings.AUTH0_CLIENT_ID,
-            "client_secret": settings.AUTH0_CLIENT_SECRET,
-            "audience": f"https://{settings.AUTH0_DOMAIN}/api/v2/",
-            "grant_type": "client_credentials"
-        }
-        
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()["access_token"]
+    async def get_management_token() -> str:
+        """Get Auth0 management API token (cached until shortly before expiry)"""
+        return await auth0_token_service.get_management_token()
     
     @staticmethod
-    def add_user_to_organization(org_id: str, user_id: str, mgmt_token: str) -> bool:
+    async def add_user_to_organization(org_id: str, user_id: str, mgmt_token: str) -> bool:
         """Add user to Auth0 organization"""
         url = f"https://{settings.AUTH0_DOMAIN}/api/v2/organizations/{org_id}/members"
         headers = {
@@ -35,11 +28,11 @@ class AuthService:
         }
         payload = {"members": [user_id]}
         
-        response = requests.post(url, json=payload, headers=headers)
+        response = await get_http_client().post(url, json=payload, headers=headers)
         return response.status_code == 204
     
     @staticmethod
-    def save_user_to_supabase(auth0_user_id: str, email: str, name: str, phone: str, location: str, org_id: Optional[str] = None) -> Dict[str, Any]:
+    async def save_user_to_supabase(auth0_user_id: str, email: str, name: str, phone: str, location: str, org_id: Optional[str] = None) -> Dict[str, Any]:
         """Save user to Supabase database"""
         supabase_client = get_supabase_client()
         user_data = {
@@ -52,7 +45,9 @@ class AuthService:
             "organization_id": org_id
         }
         
-        result = supabase_client.table("users").insert(user_data).execute()
+        result = await run_query(returning(supabase_client.table("users").insert(user_data), "id", "role", "status"))
+        if result.data:
+            fleet_stats.user_added(result.data[0]["role"], result.data[0]["status"])
         return result.data[0] if result.data else {}
     
     @classmethod
@@ -68,7 +63,7 @@ class AuthService:
                 )
             
             # Get Auth0 management token
-            token = cls.get_management_token()
+            token = await cls.get_management_token()
             headers = {
                 "Authorization": f"Bearer {token}",
                 "Content-Type": "application/json"
@@ -81,7 +76,7 @@ class AuthService:
                 "connection": "Username-Password-Authentication"
             }
             
-            response = requests.post(f"https://{settings.AUTH0_DOMAIN}/api/v2/users", json=auth0_data, headers=headers)
+            response = await get_http_client().post(f"https://{settings.AUTH0_DOMAIN}/api/v2/users", json=auth0_data, headers=headers)
             if response.status_code != 201:
                 error_detail = response.json()
                 return APIResponse(
@@ -98,13 +93,13 @@ class AuthService:
             auth0_org_id = None
             if payload.organization_id:
                 try:
-                    cls.add_user_to_organization(payload.organization_id, auth0_id, token)
+                    await cls.add_user_to_organization(payload.organization_id, auth0_id, token)
                     auth0_org_id = payload.organization_id
                 except Exception as e:
                     print(f"Warning: Failed to add user to organization: {e}")
             
             # Save user to Supabase
-            supabase_user = cls.save_user_to_supabase(
+            supabase_user = await cls.save_user_to_supabase(
                 auth0_user_id=auth0_id,
                 email=email,
                 name=payload.name,
@@ -150,7 +145,7 @@ class AuthService:
             }
             
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url, json=data, headers=headers)
+            response = await get_http_client().post(url, json=data, headers=headers)
             
             if response.status_code != 200:
                 error_detail = response.json()
@@ -162,19 +157,19 @@ class AuthService:
             
             tokens = response.json()
             
-            # Decode ID token to get Auth0 user ID
+            # Verify ID token to get Auth0 user ID
             id_token = tokens["id_token"]
-            decoded_token = jwt.decode(
+            decoded_token = await verify_auth0_token(
                 id_token,
-                key=None,
-                options={"verify_signature": False, "verify_aud": False}
+                audience=settings.AUTH0_CLIENT_ID,
+                access_token=tokens["access_token"]
             )
             
             auth0_id = decoded_token["sub"]
             
             # Check Supabase
             supabase_client = get_supabase_client()
-            supabase_result = supabase_client.table("users").select("*").eq("auth0_id", auth0_id).execute()
+            supabase_result = await run_query(supabase_client.table("users").select(LOGIN_USER_COLUMNS).eq("auth0_id", auth0_id))
             if not supabase_result.data:
                 return APIResponse(
                     success=False,
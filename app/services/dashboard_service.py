@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.models.announcement import AnnouncementResponse
+from app.models.route import RouteResponse, ROUTE_COLUMNS
+from app.models.schedule import ScheduleResponse, SCHEDULE_COLUMNS
+from app.models.user import UserDashboard, UserResponse, USER_RESPONSE_COLUMNS
+from app.schemas.common import APIResponse
+from app.services.announcement_service import announcement_feed_cache
+
+# Section caches. Users and favorites are per user, schedules per route (shared
+# by everyone who favorites it); announcements come from the organization's feed.
+dashboard_user_cache = TTLCache(maxsize=settings.DASHBOARD_CACHE_SIZE, ttl=settings.DASHBOARD_USER_TTL)
+dashboard_favorites_cache = TTLCache(maxsize=settings.DASHBOARD_CACHE_SIZE, ttl=settings.DASHBOARD_FAVORITES_TTL)
+dashboard_schedules_cache = TTLCache(maxsize=settings.DASHBOARD_CACHE_SIZE, ttl=settings.DASHBOARD_SCHEDULES_TTL)
+
+def dashboard_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        "user": dashboard_user_cache.stats(),
+        "favorites": dashboard_favorites_cache.stats(),
+        "schedules": dashboard_schedules_cache.stats(),
+    }
+
+class DashboardService:
+    """Builds the home screen: the user, their favorite routes, those routes'
+    remaining departures today and their organization's latest announcements.
+
+    The sections are fetched concurrently (schedules follow favorites) and
+    each is served from its own cache. One instance serves one request;
+    timings holds (section, milliseconds, cache hit) for the Server-Timing header.
+    """
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+        self.timings: List[Tuple[str, float, bool]] = []
+
+    async def get_dashboard(self, user_id: str, organization_id: Optional[str]) -> APIResponse:
+        started = time.perf_counter()
+        user, favorites, announcements = await asyncio.gather(
+            self._timed("user", lambda: self._user(user_id)),
+            self._timed("favorites", lambda: self._favorites(user_id)),
+            self._timed("announcements", lambda: self._announcements(organization_id)),
+            return_exceptions=True,
+        )
+        if isinstance(user, Exception) or user is None:
+            self.timings.append(("total", (time.perf_counter() - started) * 1000, False))
+            return APIResponse(
+                success=False,
+                message="User not found" if user is None else "Failed to load dashboard",
+                errors=["User with this ID does not exist" if user is None else str(user)]
+            )
+
+        errors: List[str] = []
+        schedules: Any = []
+        if isinstance(favorites, Exception):
+            errors.append(f"favorite_routes: {favorites}")
+            favorites = []
+        elif favorites:
+            schedules = await self._timed("schedules", lambda: self._upcoming_schedules(favorites), return_exceptions=True)
+            if isinstance(schedules, Exception):
+                errors.append(f"upcoming_schedules: {schedules}")
+                schedules = []
+        if isinstance(announcements, Exception):
+            errors.append(f"recent_announcements: {announcements}")
+            announcements = []
+
+        self.timings.append(("total", (time.perf_counter() - started) * 1000, False))
+        return APIResponse(
+            success=True,
+            message="Dashboard retrieved successfully" if not errors else "Dashboard partially retrieved",
+            data=UserDashboard(
+                user=user,
+                favorite_routes=favorites,
+                upcoming_schedules=schedules,
+                recent_announcements=announcements,
+            ),
+            errors=errors or None
+        )
+
+    def server_timing(self) -> str:
+        """Server-Timing header value for the sections fetched so far"""
+        return ", ".join(
+            f'{name};dur={duration:.1f}' + ('' if name == "total" else f';desc="{"hit" if hit else "miss"}"')
+            for name, duration, hit in self.timings
+        )
+
+    async def _timed(self, name: str, fetch: Callable[[], Awaitable[Tuple[Any, bool]]], return_exceptions: bool = False) -> Any:
+        """Run a section fetch, which returns (value, cache hit), and record how long it took"""
+        started = time.perf_counter()
+        try:
+            value, hit = await fetch()
+        except Exception as e:
+            self.timings.append((name, (time.perf_counter() - started) * 1000, False))
+            if return_exceptions:
+                return e
+            raise
+        self.timings.append((name, (time.perf_counter() - started) * 1000, hit))
+        return value
+
+    async def _user(self, user_id: str) -> Tuple[Optional[UserResponse], bool]:
+        cached = dashboard_user_cache.get(user_id)
+        if cached is not None:
+            return cached, True
+        result = await run_query(self.supabase.table("users").select(USER_RESPONSE_COLUMNS).eq("id", user_id))
+        if not result.data:
+            return None, False
+        user = UserResponse(**result.data[0])
+        dashboard_user_cache.set(user_id, user)
+        return user, False
+
+    async def _favorites(self, user_id: str) -> Tuple[List[RouteResponse], bool]:
+        cached = dashboard_favorites_cache.get(user_id)
+        if cached is not None:
+            return cached, True
+        query = (
+            self.supabase.table("user_favorite_routes")
+            .select(f"route_id,routes({ROUTE_COLUMNS})")
+            .eq("user_id", user_id)
+            .order("route_id")
+        )
+        result = await run_query(query)
+        routes = [RouteResponse(**row["routes"]) for row in result.data if row.get("routes")]
+        dashboard_favorites_cache.set(user_id, routes)
+        return routes, False
+
+    async def _upcoming_schedules(self, routes: List[RouteResponse]) -> Tuple[List[ScheduleResponse], bool]:
+        """Remaining departures today on the given routes; uncached routes are loaded in one in_() query"""
+        by_route: Dict[str, List[ScheduleResponse]] = {}
+        missing: List[str] = []
+        for route in routes:
+            cached = dashboard_schedules_cache.get(route.id)
+            if cached is None:
+                missing.append(route.id)
+            else:
+                by_route[route.id] = cached
+
+        if missing:
+            result = await run_query(
+                self.supabase.table("schedules")
+                .select(SCHEDULE_COLUMNS)
+                .in_("route_id", missing)
+                .eq("is_active", True)
+            )
+            loaded: Dict[str, List[ScheduleResponse]] = defaultdict(list)
+            for row in result.data:
+                loaded[row["route_id"]].append(ScheduleResponse(**row))
+            for route_id in missing:
+                by_route[route_id] = loaded.get(route_id, [])
+                dashboard_schedules_cache.set(route_id, by_route[route_id])  # empty lists too
+
+        now = datetime.now(ZoneInfo(settings.SERVICE_TIMEZONE))
+        weekday, now_time = now.isoweekday(), now.time().replace(tzinfo=None)
+        upcoming = sorted(
+            (
+                schedule for schedules in by_route.values() for schedule in schedules
+                if weekday in schedule.days_of_week and schedule.departure_time >= now_time
+            ),
+            key=lambda schedule: (schedule.departure_time, schedule.id)
+        )
+        return upcoming[:settings.DASHBOARD_SCHEDULE_LIMIT], not missing
+
+    async def _announcements(self, organization_id: Optional[str]) -> Tuple[List[AnnouncementResponse], bool]:
+        builds = announcement_feed_cache.builds
+        entry = await announcement_feed_cache.get(organization_id)
+        return entry.announcements[:settings.DASHBOARD_ANNOUNCEMENT_LIMIT], announcement_feed_cache.builds == builds
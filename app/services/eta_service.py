@@ -0,0 +1,248 @@
+import asyncio
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.schemas.tracking import StopEta
+from app.services.live_position_store import LivePosition, live_position_store
+from app.utils.geo import KM_PER_DEGREE, haversine_km
+
+# (from_stop_id, to_stop_id, departure epoch seconds) -> typical seconds to travel the segment, or None
+SegmentHistory = Callable[[str, str, float], Optional[float]]
+
+class RoutePath:
+    """A route's ordered stops compiled into arrays for fast projection and ETA sums.
+
+    Segment i runs from stop i to stop i + 1; cumulative[i] is the distance
+    along the route to stop i.
+    """
+    __slots__ = ("route_id", "stop_ids", "stop_names", "latitudes", "longitudes",
+                 "segment_km", "cumulative", "scheduled_seconds")
+
+    def __init__(self, route_id: str, stops: List[dict], estimated_duration_minutes: Optional[float]):
+        self.route_id = route_id
+        self.stop_ids = [stop["id"] for stop in stops]
+        self.stop_names = [stop["name"] for stop in stops]
+        self.latitudes = [stop["latitude"] for stop in stops]
+        self.longitudes = [stop["longitude"] for stop in stops]
+        self.segment_km = [
+            haversine_km(self.latitudes[i], self.longitudes[i], self.latitudes[i + 1], self.longitudes[i + 1])
+            for i in range(len(stops) - 1)
+        ]
+        self.cumulative = [0.0]
+        for length in self.segment_km:
+            self.cumulative.append(self.cumulative[-1] + length)
+
+        # Timetable fallback: spread the route's estimated duration by segment length
+        total_km = self.cumulative[-1]
+        total_seconds = (estimated_duration_minutes or 0) * 60
+        self.scheduled_seconds = [
+            total_seconds * length / total_km if total_km and total_seconds else length / 25.0 * 3600  # assume 25 km/h
+            for length in self.segment_km
+        ]
+
+    def project(self, latitude: float, longitude: float, first: int = 0, last: Optional[int] = None) -> Tuple[int, float, float]:
+        """Project a point onto segments first..last; returns (segment, km along route, km off route)"""
+        first = max(first, 0)
+        last = len(self.segment_km) - 1 if last is None else min(last, len(self.segment_km) - 1)
+        kx = math.cos(math.radians(latitude)) * KM_PER_DEGREE
+        best = (first, self.cumulative[first], math.inf)
+        for i in range(first, last + 1):
+            # Local equirectangular plane centered on the point
+            ax, ay = (self.longitudes[i] - longitude) * kx, (self.latitudes[i] - latitude) * KM_PER_DEGREE
+            bx, by = (self.longitudes[i + 1] - longitude) * kx, (self.latitudes[i + 1] - latitude) * KM_PER_DEGREE
+            dx, dy = bx - ax, by - ay
+            length_sq = dx * dx + dy * dy
+            t = 0.0 if length_sq == 0 else min(1.0, max(0.0, -(ax * dx + ay * dy) / length_sq))
+            off = math.hypot(ax + t * dx, ay + t * dy)
+            if off < best[2]:
+                best = (i, self.cumulative[i] + t * self.segment_km[i], off)
+        return best
+
+class TripEtaState:
+    """Per-trip progress along its route plus the last computed stop ETAs.
+
+    Segment and stop indices refer to `path`; once the route is recompiled
+    (its stops changed) the state is stale and rebuilt on the new path.
+    """
+    __slots__ = ("path", "route_id", "segment", "along_km", "speed_kmh", "timestamp", "etas")
+
+    def __init__(self, path: RoutePath):
+        self.path = path
+        self.route_id = path.route_id
+        self.segment: Optional[int] = None
+        self.along_km = 0.0
+        self.speed_kmh: Optional[float] = None
+        self.timestamp = 0.0
+        self.etas: List[Tuple[int, float]] = []  # (stop index, arrival epoch seconds)
+
+class EtaEngine:
+    """Keeps stop ETAs for every active trip up to date as positions arrive.
+
+    Registered as a live position listener: each ping projects the bus onto
+    its route (searching only near its previous segment), smooths its speed and
+    recomputes the ETAs of the stops still ahead. Requests read the stored
+    result. Segment times blend live speed, trusted most for the stretch right
+    ahead of the bus, with historical segment times (segment_history) or, when
+    there is no history, the route's estimated duration.
+    """
+
+    def __init__(self):
+        self._paths = TTLCache(maxsize=2000, ttl=settings.ETA_ROUTE_CACHE_TTL)
+        self._trips = TTLCache(maxsize=10000, ttl=settings.LIVE_POSITION_MAX_AGE)
+        self._stop_routes: Dict[str, Set[str]] = defaultdict(set)  # stop_id -> routes compiled with it
+        self._loading: Set[str] = set()
+        self.segment_history: Optional[SegmentHistory] = None
+        self.updates = 0
+
+    async def load_path(self, route_id: str) -> Optional[RoutePath]:
+        """Fetch a route and its ordered stops in one embedded select and compile them"""
+        path = self._paths.get(route_id)
+        if path is not None:
+            return path
+        result = await run_query(
+            get_supabase_client().table("routes")
+            .select("id,estimated_duration,route_stops(stop_order,stops(id,name,latitude,longitude))")
+            .eq("id", route_id)
+        )
+        if not result.data:
+            return None
+        route = result.data[0]
+        ordered = sorted(route.get("route_stops") or [], key=lambda rs: rs["stop_order"])
+        stops = [
+            rs["stops"] for rs in ordered
+            if rs.get("stops") and rs["stops"].get("latitude") is not None and rs["stops"].get("longitude") is not None
+        ]
+        if len(stops) < 2:
+            return None
+        path = RoutePath(route_id, stops, route.get("estimated_duration"))
+        for stop_id in path.stop_ids:
+            self._stop_routes[stop_id].add(route_id)
+        self._paths.set(route_id, path)
+        return path
+
+    def invalidate_route(self, route_id: str) -> None:
+        """Forget a compiled route after its stops change"""
+        self._paths.invalidate(route_id)
+
+    def invalidate_stop(self, stop_id: str) -> None:
+        """Forget every compiled route through a stop after the stop moves"""
+        for route_id in self._stop_routes.pop(stop_id, ()):
+            self.invalidate_route(route_id)
+
+    def _schedule_load(self, route_id: str) -> None:
+        if route_id in self._loading:
+            return
+        self._loading.add(route_id)
+
+        async def load():
+            try:
+                await self.load_path(route_id)
+            except Exception as e:
+                print(f"Warning: Failed to load route {route_id} for ETAs: {e}")
+            finally:
+                self._loading.discard(route_id)
+
+        asyncio.get_running_loop().create_task(load())
+
+    def on_positions(self, positions: List[LivePosition]) -> None:
+        """Live position listener: update the ETAs of the trips that moved"""
+        for position in positions:
+            if not position.route_id:
+                continue
+            path = self._paths.get(position.route_id)
+            if path is None:
+                self._schedule_load(position.route_id)
+                continue
+            self.update(position, path)
+
+    def update(self, position: LivePosition, path: RoutePath) -> TripEtaState:
+        """Advance one trip's state with a new position and recompute its upcoming stop ETAs"""
+        state = self._trips.get(position.trip_id)
+        if state is None or state.path is not path:
+            state = TripEtaState(path)
+        elif position.timestamp <= state.timestamp:
+            return state
+
+        # Buses move forward: look near the previous segment first, fall back to the whole route
+        if state.segment is not None:
+            segment, along, off = path.project(position.latitude, position.longitude, state.segment - 1, state.segment + 3)
+            if off > settings.ETA_OFF_ROUTE_KM:
+                segment, along, off = path.project(position.latitude, position.longitude)
+        else:
+            segment, along, off = path.project(position.latitude, position.longitude)
+
+        speed = position.speed
+        if speed is None and state.segment is not None and position.timestamp > state.timestamp:
+            speed = max(0.0, along - state.along_km) / (position.timestamp - state.timestamp) * 3600
+        if speed is not None:
+            alpha = settings.ETA_SPEED_SMOOTHING
+            state.speed_kmh = speed if state.speed_kmh is None else alpha * speed + (1 - alpha) * state.speed_kmh
+
+        state.segment, state.along_km, state.timestamp = segment, along, position.timestamp
+        state.etas = self._compute_etas(path, state)
+        self._trips.set(position.trip_id, state)
+        self.updates += 1
+        return state
+
+    def _segment_seconds(self, path: RoutePath, segment: int, at: float) -> float:
+        if self.segment_history is not None:
+            seconds = self.segment_history(path.stop_ids[segment], path.stop_ids[segment + 1], at)
+            if seconds is not None:
+                return seconds
+        return path.scheduled_seconds[segment]
+
+    def _compute_etas(self, path: RoutePath, state: TripEtaState) -> List[Tuple[int, float]]:
+        live_speed = state.speed_kmh if state.speed_kmh and state.speed_kmh >= settings.ETA_MIN_LIVE_SPEED_KMH else None
+        horizon = settings.ETA_LIVE_SPEED_HORIZON_KM
+        at = state.timestamp
+        etas = []
+        for stop in range(state.segment + 1, len(path.stop_ids)):
+            segment = stop - 1
+            start = max(state.along_km, path.cumulative[segment])
+            remaining_km = path.cumulative[stop] - start
+            fraction = remaining_km / path.segment_km[segment] if path.segment_km[segment] else 0.0
+            seconds = self._segment_seconds(path, segment, at) * fraction
+            if live_speed:
+                weight = math.exp(-(start - state.along_km) / horizon)
+                seconds = weight * remaining_km / live_speed * 3600 + (1 - weight) * seconds
+            at += seconds
+            etas.append((stop, at))
+        return etas
+
+    async def get_trip_etas(self, trip_id: str) -> Optional[List[StopEta]]:
+        """Upcoming stop ETAs for a trip; None if the trip has no recent position"""
+        state = self._trips.get(trip_id)
+        path = await self.load_path(state.route_id) if state is not None else None
+        if state is None or state.path is not path:
+            # Not computed yet, or computed on a route whose stops have changed since
+            position = live_position_store.get_trip(trip_id)
+            if position is None or not position.route_id:
+                return None
+            path = await self.load_path(position.route_id)
+            if path is None:
+                return None
+            state = self.update(position, path)
+
+        now = datetime.now(timezone.utc).timestamp()
+        return [
+            StopEta(
+                stop_id=path.stop_ids[stop],
+                name=path.stop_names[stop],
+                stop_index=stop,
+                distance_km=round(path.cumulative[stop] - state.along_km, 3),
+                eta=datetime.fromtimestamp(arrival, timezone.utc),
+                seconds=max(0, round(arrival - now))
+            )
+            for stop, arrival in state.etas
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {"routes": len(self._paths), "trips": len(self._trips), "updates": self.updates}
+
+# Process-wide ETA engine, fed by every live position change
+eta_engine = EtaEngine()
+live_position_store.add_listener(eta_engine.on_positions)
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+from postgrest.types import CountMethod
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.models.bus import BusStatus
+from app.models.trip import TripStatus
+from app.models.user import UserRole, UserStatus
+from app.schemas.admin import FleetStatsSnapshot
+from app.utils.helpers import offset
+
+PAGE_SIZE = 1000
+SNAPSHOT_NAME = "fleet"
+ACTIVE_TRIP_STATUSES = (TripStatus.IN_PROGRESS.value, TripStatus.DELAYED.value)
+
+# Grouped counts of (table, column, values), recounted with one count query per value
+COUNTED_GROUPS = {
+    "buses_by_status": ("buses", "status", [status.value for status in BusStatus]),
+    "trips_by_status": ("trips", "status", [status.value for status in TripStatus]),
+    "users_by_role": ("users", "role", [role.value for role in UserRole]),
+    "users_by_status": ("users", "status", [status.value for status in UserStatus]),
+}
+ACTIVE_TRIPS_GROUP = "active_trips_by_route"
+GROUPS = (*COUNTED_GROUPS, ACTIVE_TRIPS_GROUP)
+
+class FleetStats:
+    """Fleet dashboard counters kept in memory and served without touching the database.
+
+    Writes apply deltas as they happen: user creation and deletion, trip
+    status transitions and trip materialization. Writes whose previous value
+    is unknown (an admin changing a user's role or status) mark the group
+    stale instead; stale groups are recounted FLEET_STATS_RECOUNT_DELAY
+    seconds later, merging bursts of writes into one recount.
+
+    Every FLEET_STATS_RECONCILE_INTERVAL seconds all groups are recounted
+    (other workers' writes, and races between deltas and recounts, only show
+    up then) and the result is saved to stats_snapshots. On start the
+    snapshot is loaded, so a restart serves the last counts at once and only
+    recounts when the snapshot is due.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, Counter] = {group: Counter() for group in GROUPS}
+        self._stale: Set[str] = set()
+        self._payload: Optional[FleetStatsSnapshot] = None
+        self.reconciled_at: Optional[datetime] = None
+        self._reconciler: Optional[asyncio.Task] = None
+        self._recounter: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reconciles = 0
+        self.recounts = 0
+        self.failures = 0
+
+    # Deltas
+    def adjust(self, group: str, key: Optional[str], delta: int) -> None:
+        if key is None:
+            return
+        counts = self._counts[group]
+        counts[key] = max(counts[key] + delta, 0)
+        if not counts[key]:
+            del counts[key]
+        self._payload = None
+
+    def user_added(self, role: Optional[str], status: Optional[str]) -> None:
+        self.adjust("users_by_role", role, 1)
+        self.adjust("users_by_status", status, 1)
+
+    def user_removed(self, role: Optional[str], status: Optional[str]) -> None:
+        self.adjust("users_by_role", role, -1)
+        self.adjust("users_by_status", status, -1)
+
+    def trips_added(self, status: str, count: int = 1) -> None:
+        self.adjust("trips_by_status", status, count)
+
+    def trip_status_changed(self, old: str, new: str, route_id: Optional[str] = None, count: int = 1) -> None:
+        """Move trips between statuses, and in or out of their route's active trips"""
+        if old == new:
+            return
+        self.adjust("trips_by_status", old, -count)
+        self.adjust("trips_by_status", new, count)
+        was_active, is_active = old in ACTIVE_TRIP_STATUSES, new in ACTIVE_TRIP_STATUSES
+        if was_active != is_active:
+            self.adjust(ACTIVE_TRIPS_GROUP, route_id, count if is_active else -count)
+
+    def mark_stale(self, *groups: str) -> None:
+        """Recount these groups shortly, for changes whose previous value is unknown"""
+        self._stale.update(groups)
+        self._payload = None
+        if self._recounter is None or self._recounter.done() or self._recounter.get_loop() is not asyncio.get_running_loop():
+            self._recounter = asyncio.get_running_loop().create_task(self._recount_stale())
+
+    async def _recount_stale(self) -> None:
+        while self._stale:
+            await asyncio.sleep(settings.FLEET_STATS_RECOUNT_DELAY)
+            groups, self._stale = set(self._stale), set()
+            try:
+                await self.reconcile(groups)
+            except Exception as e:
+                self._stale |= groups  # left to the next full reconcile
+                self.failures += 1
+                print(f"Warning: Fleet stats recount failed: {e}")
+                return
+
+    # Reads
+    def snapshot(self) -> FleetStatsSnapshot:
+        """Current counts; rebuilt only after a change"""
+        if self._payload is None:
+            self._payload = FleetStatsSnapshot(
+                **{group: dict(counts) for group, counts in self._counts.items()},
+                reconciled_at=self.reconciled_at,
+                stale=sorted(self._stale),
+            )
+        return self._payload
+
+    # Reconciliation
+    async def reconcile(self, groups: Optional[Iterable[str]] = None) -> None:
+        """Recount groups (all of them when None) from the database"""
+        full = groups is None
+        groups = list(GROUPS if full else groups)
+        counts = await asyncio.gather(*(
+            self._count_active_trips() if group == ACTIVE_TRIPS_GROUP else self._count_group(*COUNTED_GROUPS[group])
+            for group in groups
+        ))
+        for group, counted in zip(groups, counts):
+            self._counts[group] = counted
+        self._stale.difference_update(groups)
+        self._payload = None
+        if full:
+            self.reconciled_at = datetime.now(timezone.utc)
+            self.reconciles += 1
+            await self.save_snapshot()
+        else:
+            self.recounts += 1
+
+    async def _count_group(self, table: str, column: str, values: List[str]) -> Counter:
+        supabase = get_supabase_client()
+        results = await asyncio.gather(*(
+            run_query(supabase.table(table).select("id", count=CountMethod.exact).eq(column, value).limit(0))
+            for value in values
+        ))
+        return Counter({value: result.count for value, result in zip(values, results) if result.count})
+
+    async def _count_active_trips(self) -> Counter:
+        counts: Counter = Counter()
+        start = 0
+        while True:
+            query = (
+                get_supabase_client().table("trips")
+                .select("id,schedules(route_id)")
+                .in_("status", list(ACTIVE_TRIP_STATUSES))
+                .order("id")
+                .limit(PAGE_SIZE)
+            )
+            rows = (await run_query(offset(query, start))).data
+            counts.update((row.get("schedules") or {}).get("route_id") for row in rows)
+            if len(rows) < PAGE_SIZE:
+                counts.pop(None, None)
+                return counts
+            start += PAGE_SIZE
+
+    # Snapshot
+    async def load_snapshot(self) -> bool:
+        """Restore the counts of the last full reconcile (by any worker)"""
+        try:
+            result = await run_query(
+                get_supabase_client().table("stats_snapshots")
+                .select("counts,reconciled_at")
+                .eq("name", SNAPSHOT_NAME)
+            )
+            if not result.data:
+                return False
+            row = result.data[0]
+            for group in GROUPS:
+                self._counts[group] = Counter(row["counts"].get(group) or {})
+            self.reconciled_at = datetime.fromisoformat(row["reconciled_at"])
+            self._payload = None
+            return True
+        except Exception as e:
+            print(f"Warning: Failed to load fleet stats snapshot: {e}")
+            return False
+
+    async def save_snapshot(self) -> None:
+        if self.reconciled_at is None:
+            return
+        try:
+            await run_query(
+                get_supabase_client().table("stats_snapshots").upsert({
+                    "name": SNAPSHOT_NAME,
+                    "counts": {group: dict(counts) for group, counts in self._counts.items()},
+                    "reconciled_at": self.reconciled_at.isoformat(),
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                })
+            )
+        except Exception as e:
+            print(f"Warning: Failed to save fleet stats snapshot: {e}")
+
+    # Lifecycle
+    async def start(self) -> None:
+        """Load the snapshot and start the periodic reconcile"""
+        loop = asyncio.get_running_loop()
+        if self._reconciler is None or self._loop is not loop or self._reconciler.done():
+            self._loop = loop
+            await self.load_snapshot()
+            self._reconciler = loop.create_task(self._reconcile_loop())
+
+    async def stop(self) -> None:
+        """Stop reconciling. The snapshot is only saved by full reconciles: the
+        counts here may be partial, and another worker may have saved newer ones."""
+        for task in (self._reconciler, self._recounter):
+            if task is not None and task.get_loop() is asyncio.get_running_loop():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reconciler = self._recounter = None
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            due = 0.0
+            if self.reconciled_at is not None:
+                due = self.reconciled_at.timestamp() + settings.FLEET_STATS_RECONCILE_INTERVAL - time.time()
+            if due > 0:
+                await asyncio.sleep(due)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                self.failures += 1
+                print(f"Warning: Fleet stats reconcile failed: {e}")
+                await asyncio.sleep(settings.FLEET_STATS_RECONCILE_INTERVAL)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+            "stale": len(self._stale),
+            "reconciles": self.reconciles,
+            "recounts": self.recounts,
+            "failures": self.failures,
+        }
+
+# Process-wide counters, fed by the services that write users and trips
+fleet_stats = FleetStats()
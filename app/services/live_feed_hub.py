@@ -0,0 +1,148 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from app.services.live_position_store import LivePosition, live_position_store
+
+Topic = Tuple[Optional[str], str, str]  # (organization_id, "route" | "bus", id)
+
+HEARTBEAT_MESSAGE = json.dumps({"type": "heartbeat"})
+
+class LiveFeedSubscription:
+    """One connected client; holds at most one undelivered update per bus or announcement (latest wins)"""
+
+    def __init__(self, organization_id: Optional[str], topics: List[Topic]):
+        self.organization_id = organization_id
+        self.topics = topics
+        self._pending: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+        self.coalesced = 0
+
+    def offer(self, key: str, message: str) -> None:
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = message
+        self._ready.set()
+
+    async def next_messages(self, timeout: float) -> List[str]:
+        """Wait for updates; an empty list means the heartbeat interval passed without any"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+class LiveFeedHub:
+    """Fans live position updates out to subscribers of a route or bus topic,
+    and organization-wide messages (urgent announcements) to every subscriber
+    of the organization.
+
+    Each update is JSON-encoded once and the same string is handed to every
+    subscriber of its topics. A slow subscriber never blocks the publisher: it
+    only keeps the newest undelivered update per bus.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Topic, Set[LiveFeedSubscription]] = defaultdict(set)
+        self._subscriptions: Set[LiveFeedSubscription] = set()
+        self._organizations: Dict[Optional[str], Set[LiveFeedSubscription]] = defaultdict(set)
+        self.published = 0
+        self.broadcasts = 0
+
+    @staticmethod
+    def encode(position: LivePosition) -> str:
+        return json.dumps({"type": "position", **position.to_dict()}, separators=(",", ":"))
+
+    def publish(self, positions: Iterable[LivePosition]) -> None:
+        """Deliver changed positions to the subscribers of their bus and route topics"""
+        for position in positions:
+            topics = [(position.organization_id, "bus", position.bus_id)]
+            if position.route_id:
+                topics.append((position.organization_id, "route", position.route_id))
+            # A subscriber following both the bus and its route gets the update once
+            subscribers = set().union(*(self._subscribers.get(topic, ()) for topic in topics))
+            if not subscribers:
+                continue
+            message = self.encode(position)
+            for subscriber in subscribers:
+                subscriber.offer(position.bus_id, message)
+            self.published += 1
+
+    def broadcast(self, organization_id: Optional[str], key: str, message: str) -> int:
+        """Deliver a message to every subscriber of an organization (of all organizations when None),
+        on this worker and, through the shared live state backend, on the others"""
+        live_position_store.share_broadcast(organization_id, key, message)
+        return self.deliver(organization_id, key, message)
+
+    def deliver(self, organization_id: Optional[str], key: str, message: str) -> int:
+        """Deliver a broadcast to this worker's subscribers only"""
+        if organization_id is None:
+            subscribers: Iterable[LiveFeedSubscription] = self._subscriptions
+        else:
+            subscribers = self._organizations.get(organization_id, ())
+        delivered = 0
+        for subscriber in subscribers:
+            subscriber.offer(key, message)
+            delivered += 1
+        self.broadcasts += 1
+        return delivered
+
+    def subscribe(self, organization_id: Optional[str], route_ids: List[str], bus_ids: List[str]) -> LiveFeedSubscription:
+        """Register a subscriber and queue the current positions as its first messages"""
+        topics = [(organization_id, "route", route_id) for route_id in route_ids]
+        topics += [(organization_id, "bus", bus_id) for bus_id in bus_ids]
+        subscription = LiveFeedSubscription(organization_id, topics)
+        self._subscriptions.add(subscription)
+        self._organizations[subscription.organization_id].add(subscription)
+        for topic in topics:
+            self._subscribers[topic].add(subscription)
+
+        current = {p.bus_id: p for route_id in route_ids for p in live_position_store.for_route(route_id)}
+        current.update((p.bus_id, p) for p in map(live_position_store.get_bus, bus_ids) if p is not None)
+        for position in current.values():
+            if position.organization_id == organization_id:
+                subscription.offer(position.bus_id, self.encode(position))
+        return subscription
+
+    def unsubscribe(self, subscription: LiveFeedSubscription) -> None:
+        self._subscriptions.discard(subscription)
+        organization = self._organizations.get(subscription.organization_id)
+        if organization is not None:
+            organization.discard(subscription)
+            if not organization:
+                del self._organizations[subscription.organization_id]
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    async def events(self, subscription: LiveFeedSubscription, heartbeat: float) -> AsyncIterator[str]:
+        """Server-Sent Events body for a subscription; unsubscribes when the client goes away"""
+        try:
+            while True:
+                messages = await subscription.next_messages(heartbeat)
+                if messages:
+                    yield "".join(f"data: {message}\n\n" for message in messages)
+                else:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "topics": len(self._subscribers),
+            "subscriptions": len(self._subscriptions),
+            "published": self.published,
+            "broadcasts": self.broadcasts,
+            "coalesced": sum(sub.coalesced for sub in self._subscriptions),
+        }
+
+# Process-wide hub, fed by every live position change (local ingestion and shared-backend sync)
+# and by broadcasts of other workers
+live_feed_hub = LiveFeedHub()
+live_position_store.add_listener(live_feed_hub.publish)
+live_position_store.add_broadcast_listener(live_feed_hub.deliver)
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from app.config.settings import settings
+from app.config.database import get_supabase_client, run_query
+from app.core.cache import TTLCache
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+class TripRef(NamedTuple):
+    """What ingestion needs to know about a trip: where it runs and who may report it"""
+    route_id: Optional[str]
+    bus_id: Optional[str]
+    driver_id: Optional[str]
+    organization_id: Optional[str]  # the driver's organization
+
+Broadcast = Tuple[Optional[str], str, str]  # (organization_id or None for all, key, message)
+
+class LivePosition:
+    """Latest known position of one bus, kept compact (slots, epoch-second timestamp)"""
+    __slots__ = ("id", "bus_id", "trip_id", "route_id", "organization_id",
+                 "latitude", "longitude", "speed", "heading", "timestamp")
+
+    def __init__(
+        self,
+        id: str,
+        bus_id: str,
+        trip_id: str,
+        route_id: Optional[str],
+        organization_id: Optional[str],
+        latitude: float,
+        longitude: float,
+        speed: Optional[float],
+        heading: Optional[float],
+        timestamp: float
+    ):
+        self.id = id
+        self.bus_id = bus_id
+        self.trip_id = trip_id
+        self.route_id = route_id
+        self.organization_id = organization_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.speed = speed
+        self.heading = heading
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], route_id: Optional[str], organization_id: Optional[str]) -> "LivePosition":
+        """Build from a bus_locations row as produced by the ingestion pipeline"""
+        return cls(
+            row["id"], row["bus_id"], row["trip_id"], route_id, organization_id,
+            row["latitude"], row["longitude"], row.get("speed"), row.get("heading"),
+            datetime.fromisoformat(row["timestamp"]).timestamp()
+        )
+
+    def encode(self) -> str:
+        """Serialize as a compact JSON array for the shared backend"""
+        return json.dumps([getattr(self, name) for name in self.__slots__], separators=(",", ":"))
+
+    @classmethod
+    def decode(cls, data: str) -> "LivePosition":
+        return cls(*json.loads(data))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """BusLocationResponse-shaped dict plus the route the trip runs on"""
+        return {
+            "id": self.id,
+            "bus_id": self.bus_id,
+            "trip_id": self.trip_id,
+            "route_id": self.route_id,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "speed": self.speed,
+            "heading": self.heading,
+            "timestamp": datetime.fromtimestamp(self.timestamp, timezone.utc).isoformat(),
+        }
+
+class LocalLiveStateBackend:
+    """Single-process backend: every worker only sees its own updates"""
+
+    async def publish(self, positions: List[LivePosition]) -> None:
+        pass
+
+    async def pull(self, since: float) -> List[LivePosition]:
+        return []
+
+    async def publish_broadcasts(self, broadcasts: List[Broadcast]) -> None:
+        pass
+
+    async def pull_broadcasts(self) -> List[Broadcast]:
+        return []
+
+class RedisLiveStateBackend:
+    """Shares latest positions between workers through a Redis hash plus an update-time index,
+    and organization-wide broadcasts through a capped Redis stream"""
+    POSITIONS_KEY = "live:positions"
+    UPDATED_KEY = "live:updated"
+    BROADCASTS_KEY = "live:broadcasts"
+    BROADCASTS_MAXLEN = 1000
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._origin = uuid.uuid4().hex  # skips this worker's own broadcasts, delivered locally already
+        self._broadcasts_read = f"{int(time.time() * 1000)}-0"  # stream id; only broadcasts from now on
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = aioredis.from_url(self.url, decode_responses=True)
+            self._loop = loop
+        return self._client
+
+    async def publish(self, positions: List[LivePosition]) -> None:
+        now = time.time()
+        pipe = self._get_client().pipeline(transaction=False)
+        pipe.hset(self.POSITIONS_KEY, mapping={p.bus_id: p.encode() for p in positions})
+        pipe.zadd(self.UPDATED_KEY, {p.bus_id: now for p in positions})
+        pipe.zremrangebyscore(self.UPDATED_KEY, "-inf", now - settings.LIVE_POSITION_MAX_AGE)
+        await pipe.execute()
+
+    async def pull(self, since: float) -> List[LivePosition]:
+        client = self._get_client()
+        bus_ids = await client.zrangebyscore(self.UPDATED_KEY, since, "+inf")
+        if not bus_ids:
+            return []
+        return [LivePosition.decode(value) for value in await client.hmget(self.POSITIONS_KEY, bus_ids) if value]
+
+    async def publish_broadcasts(self, broadcasts: List[Broadcast]) -> None:
+        pipe = self._get_client().pipeline(transaction=False)
+        for broadcast in broadcasts:
+            pipe.xadd(
+                self.BROADCASTS_KEY, {"data": json.dumps([self._origin, *broadcast])},
+                maxlen=self.BROADCASTS_MAXLEN, approximate=True
+            )
+        await pipe.execute()
+
+    async def pull_broadcasts(self) -> List[Broadcast]:
+        streams = await self._get_client().xread({self.BROADCASTS_KEY: self._broadcasts_read}, count=self.BROADCASTS_MAXLEN)
+        broadcasts: List[Broadcast] = []
+        for _, entries in streams:
+            for entry_id, fields in entries:
+                self._broadcasts_read = entry_id
+                origin, organization_id, key, message = json.loads(fields["data"])
+                if origin != self._origin:
+                    broadcasts.append((organization_id, key, message))
+        return broadcasts
+
+def _create_backend():
+    if settings.REDIS_URL and REDIS_AVAILABLE:
+        return RedisLiveStateBackend(settings.REDIS_URL)
+    if settings.REDIS_URL:
+        print("Warning: REDIS_URL is set but the redis package is not installed; live positions stay per worker")
+    return LocalLiveStateBackend()
+
+class LivePositionStore:
+    """Latest position per bus, indexed by trip, route and organization and served from memory.
+
+    The ingestion path calls record(); a background task publishes local
+    updates (and broadcasts handed to share_broadcast) to the shared backend
+    and pulls other workers' every LIVE_STATE_SYNC_INTERVAL seconds. Positions older than
+    LIVE_POSITION_MAX_AGE are treated as inactive.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or _create_backend()
+        self._by_bus: Dict[str, LivePosition] = {}
+        self._bus_by_trip: Dict[str, str] = {}
+        self._route_buses: Dict[str, Set[str]] = defaultdict(set)
+        self._org_buses: Dict[str, Set[str]] = defaultdict(set)
+        self._trips = TTLCache(maxsize=10000, ttl=settings.TRIP_ROUTE_CACHE_TTL)
+        self._pending: List[LivePosition] = []
+        self._pending_broadcasts: List[Broadcast] = []
+        self._listeners: List[Callable[[List[LivePosition]], None]] = []
+        self._broadcast_listeners: List[Callable[[Optional[str], str, str], Any]] = []
+        self._synced_at = 0.0
+        self._sync_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def apply(self, position: LivePosition) -> bool:
+        """Store a position if it is newer than what we hold for the bus (latest wins)"""
+        if position.timestamp > time.time() + settings.LOCATION_MAX_CLOCK_SKEW:
+            return False  # would hide every later ping of the bus
+        current = self._by_bus.get(position.bus_id)
+        if current is not None:
+            if current.timestamp > position.timestamp or current.id == position.id:
+                return False
+            if current.trip_id != position.trip_id:
+                self._bus_by_trip.pop(current.trip_id, None)
+            if current.route_id and current.route_id != position.route_id:
+                self._route_buses[current.route_id].discard(current.bus_id)
+            if current.organization_id and current.organization_id != position.organization_id:
+                self._org_buses[current.organization_id].discard(current.bus_id)
+
+        self._by_bus[position.bus_id] = position
+        self._bus_by_trip[position.trip_id] = position.bus_id
+        if position.route_id:
+            self._route_buses[position.route_id].add(position.bus_id)
+        if position.organization_id:
+            self._org_buses[position.organization_id].add(position.bus_id)
+        return True
+
+    def add_listener(self, listener: Callable[[List[LivePosition]], None]) -> None:
+        """Call listener with every batch of changed positions, local or pulled from the backend"""
+        self._listeners.append(listener)
+
+    def add_broadcast_listener(self, listener: Callable[[Optional[str], str, str], Any]) -> None:
+        """Call listener(organization_id, key, message) for every broadcast shared by another worker"""
+        self._broadcast_listeners.append(listener)
+
+    def share_broadcast(self, organization_id: Optional[str], key: str, message: str) -> None:
+        """Hand a broadcast already delivered on this worker to the other workers with the next sync"""
+        if isinstance(self.backend, LocalLiveStateBackend):
+            return
+        self._pending_broadcasts.append((organization_id, key, message))
+        self._ensure_syncing()
+
+    def _notify(self, changed: List[LivePosition]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(changed)
+            except Exception as e:
+                print(f"Warning: Live position listener failed: {e}")
+
+    def record(self, rows: Iterable[Dict[str, Any]], route_ids: Dict[str, Optional[str]], organization_id: Optional[str]) -> List[LivePosition]:
+        """Apply freshly ingested bus_locations rows; returns the positions that changed"""
+        changed = [
+            position for position in (
+                LivePosition.from_row(row, route_ids.get(row["trip_id"]), organization_id) for row in rows
+            ) if self.apply(position)
+        ]
+        if changed and not isinstance(self.backend, LocalLiveStateBackend):
+            self._pending.extend(changed)
+            self._ensure_syncing()
+        if changed:
+            self._notify(changed)
+        return changed
+
+    async def resolve_trips(self, trip_ids: Iterable[str], refresh: bool = False) -> Dict[str, Optional[TripRef]]:
+        """Look up trips (None when missing) with their route and driver's organization, cached for TRIP_ROUTE_CACHE_TTL.
+
+        refresh skips the cache, e.g. to recheck a trip whose driver may have
+        been reassigned. Lookup failures are raised: callers authorize with it.
+        """
+        trips: Dict[str, Optional[TripRef]] = {}
+        missing = []
+        for trip_id in set(trip_ids):
+            trip = False if refresh else self._trips.get(trip_id, False)
+            if trip is False:
+                missing.append(trip_id)
+            else:
+                trips[trip_id] = trip
+
+        if missing:
+            supabase = get_supabase_client()
+            result = await run_query(
+                supabase.table("trips").select("id,bus_id,driver_id,schedules(route_id)").in_("id", missing)
+            )
+            driver_ids = list({trip["driver_id"] for trip in result.data if trip.get("driver_id")})
+            organizations: Dict[str, Optional[str]] = {}
+            if driver_ids:
+                drivers = await run_query(supabase.table("users").select("id,organization_id").in_("id", driver_ids))
+                organizations = {driver["id"]: driver.get("organization_id") for driver in drivers.data}
+            found = {
+                trip["id"]: TripRef(
+                    (trip.get("schedules") or {}).get("route_id"),
+                    trip.get("bus_id"),
+                    trip.get("driver_id"),
+                    organizations.get(trip.get("driver_id")),
+                )
+                for trip in result.data
+            }
+            for trip_id in missing:
+                trips[trip_id] = found.get(trip_id)
+                self._trips.set(trip_id, trips[trip_id])
+        return trips
+
+    def _is_live(self, position: Optional[LivePosition], now: float) -> bool:
+        return position is not None and now - position.timestamp <= settings.LIVE_POSITION_MAX_AGE
+
+    def get_bus(self, bus_id: str) -> Optional[LivePosition]:
+        """Latest position of a bus, if it reported recently"""
+        self._ensure_syncing()
+        position = self._by_bus.get(bus_id)
+        return position if self._is_live(position, time.time()) else None
+
+    def get_trip(self, trip_id: str) -> Optional[LivePosition]:
+        """Latest position of the bus running a trip, if it reported recently"""
+        bus_id = self._bus_by_trip.get(trip_id)
+        position = self.get_bus(bus_id) if bus_id else None
+        return position if position is not None and position.trip_id == trip_id else None
+
+    def _live_positions(self, bus_ids: Iterable[str]) -> List[LivePosition]:
+        self._ensure_syncing()
+        now = time.time()
+        return [p for p in map(self._by_bus.get, list(bus_ids)) if self._is_live(p, now)]
+
+    def for_route(self, route_id: str) -> List[LivePosition]:
+        """Active buses on a route"""
+        return self._live_positions(self._route_buses.get(route_id, ()))
+
+    def for_organization(self, organization_id: str) -> List[LivePosition]:
+        """Active buses of an organization"""
+        return self._live_positions(self._org_buses.get(organization_id, ()))
+
+    def _ensure_syncing(self) -> None:
+        if isinstance(self.backend, LocalLiveStateBackend):
+            return
+        loop = asyncio.get_running_loop()
+        if self._sync_task is None or self._loop is not loop or self._sync_task.done():
+            self._loop = loop
+            self._sync_task = loop.create_task(self._sync_loop())
+
+    async def start(self) -> None:
+        """Start syncing with the shared backend (also started lazily on the first update)"""
+        if not isinstance(self.backend, LocalLiveStateBackend):
+            self._ensure_syncing()
+            await self.sync()
+
+    async def stop(self) -> None:
+        """Publish pending updates and stop syncing"""
+        if self._sync_task is not None and self._loop is asyncio.get_running_loop():
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+            await self.sync()
+
+    async def sync(self) -> None:
+        """Publish local updates and apply updates made by other workers"""
+        pending, self._pending = self._pending, []
+        if pending:
+            try:
+                await self.backend.publish(pending)
+            except Exception:
+                self._pending[:0] = pending
+                raise
+        broadcasts, self._pending_broadcasts = self._pending_broadcasts, []
+        if broadcasts:
+            try:
+                await self.backend.publish_broadcasts(broadcasts)
+            except Exception:
+                self._pending_broadcasts[:0] = broadcasts
+                raise
+        started = time.time()
+        pulled = await self.backend.pull(self._synced_at - 1.0)  # 1s overlap; apply() is idempotent
+        changed = [position for position in pulled if self.apply(position)]
+        self._synced_at = started
+        if changed:
+            self._notify(changed)
+        for broadcast in await self.backend.pull_broadcasts():
+            for listener in self._broadcast_listeners:
+                try:
+                    listener(*broadcast)
+                except Exception as e:
+                    print(f"Warning: Live broadcast listener failed: {e}")
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Warning: Live position sync failed: {e}")
+            await asyncio.sleep(settings.LIVE_STATE_SYNC_INTERVAL)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "buses": len(self._by_bus),
+            "routes": sum(1 for buses in self._route_buses.values() if buses),
+            "trip_cache": self._trips.stats(),
+        }
+
+# Process-wide live state
+live_position_store = LivePositionStore()
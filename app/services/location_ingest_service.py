@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from postgrest.types import ReturnMethod
+from app.config.settings import settings
+from app.config.database import get_supabase_client, run_query
+from app.schemas.tracking import LocationPing
+
+class LocationIngestService:
+    """Buffers GPS pings in a bounded in-process queue and writes them to bus_locations in batches.
+
+    Requests only validate and enqueue; a single background writer drains the
+    queue and flushes a multi-row insert when LOCATION_BATCH_SIZE rows are
+    buffered or LOCATION_FLUSH_INTERVAL has passed, whichever comes first.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        """Create the queue and writer task on the running event loop (lazily, so it also works without lifespan)"""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop or self._writer.done():
+            self._loop = loop
+            self._closing = False
+            self._queue = asyncio.Queue(maxsize=settings.LOCATION_QUEUE_SIZE)
+            self._writer = loop.create_task(self._run())
+        return self._queue
+
+    async def start(self) -> None:
+        """Start the background writer"""
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the writer"""
+        if self._writer is None or self._loop is not asyncio.get_running_loop():
+            return
+        self._closing = True
+        await self._writer
+        self._queue = None
+        self._writer = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def offer(self, pings: List[LocationPing]) -> Optional[List[Dict[str, Any]]]:
+        """Enqueue pings all-or-nothing and return their rows; None means the queue is full and the caller should back off"""
+        queue = self._ensure_started()
+        if queue.maxsize - queue.qsize() < len(pings) or self._closing:
+            self.rejected += len(pings)
+            return None
+
+        received_at = datetime.now(timezone.utc)
+        rows = [self._to_row(ping, received_at) for ping in pings]
+        for row in rows:
+            queue.put_nowait(row)
+        self.accepted += len(pings)
+        return rows
+
+    @staticmethod
+    def _to_row(ping: LocationPing, received_at: datetime) -> Dict[str, Any]:
+        """Shape a ping as a bus_locations row (id assigned here so live state can reference it before the insert)"""
+        row = ping.model_dump(mode="json", exclude={"timestamp"})
+        row["id"] = str(uuid.uuid4())
+        row["timestamp"] = LocationIngestService._device_time(ping.timestamp, received_at).isoformat()
+        return row
+
+    @staticmethod
+    def _device_time(timestamp: Optional[datetime], received_at: datetime) -> datetime:
+        """The ping's time in UTC: naive device times are taken as UTC, and times too far
+        ahead of the server (a fast device clock) are clamped to the receive time"""
+        if timestamp is None:
+            return received_at
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        if timestamp - received_at > timedelta(seconds=settings.LOCATION_MAX_CLOCK_SKEW):
+            return received_at
+        return timestamp.astimezone(timezone.utc)
+
+    async def _run(self) -> None:
+        """Writer loop: collect a batch until it is full or the flush interval passes, then insert it"""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while not (self._closing and queue.empty()):
+            rows: List[Dict[str, Any]] = []
+            deadline = loop.time() + settings.LOCATION_FLUSH_INTERVAL
+            while len(rows) < settings.LOCATION_BATCH_SIZE:
+                try:
+                    rows.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0 or self._closing:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if rows:
+                await self._flush(rows)
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert one batch, retrying once before dropping it"""
+        query = get_supabase_client().table("bus_locations").insert(rows, returning=ReturnMethod.minimal)
+        for attempt in range(2):
+            try:
+                await run_query(query)
+                self.written += len(rows)
+                self.batches += 1
+                return
+            except Exception as e:
+                if attempt == 0:
+                    await asyncio.sleep(0.5)
+                    continue
+                self.dropped += len(rows)
+                print(f"Warning: Dropped {len(rows)} bus locations after failed insert: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Queue and writer counters"""
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_size": settings.LOCATION_QUEUE_SIZE,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+# Process-wide ingestion pipeline
+location_ingest_service = LocationIngestService()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.models.route import RouteResponse, RouteStopResponse, ROUTE_COLUMNS, ROUTE_STOP_COLUMNS
+from app.models.schedule import ScheduleResponse, SCHEDULE_COLUMNS
+from app.models.stop import STOP_COLUMNS
+from app.models.trip import TripStatus, TripResponse, TRIP_COLUMNS
+from app.models.user import RouteDetails
+from app.utils.helpers import make_etag
+
+CURRENT_TRIP_STATUSES = (TripStatus.IN_PROGRESS.value, TripStatus.DELAYED.value)
+
+# Route, its ordered stops, its schedules and their running trips in one request
+ROUTE_DETAILS_SELECT = (
+    f"{ROUTE_COLUMNS},"
+    f"route_stops({ROUTE_STOP_COLUMNS},stop:stops({STOP_COLUMNS})),"
+    f"schedules({SCHEDULE_COLUMNS},trips({TRIP_COLUMNS}))"
+)
+
+class RouteDetailsEntry:
+    """A built RouteDetails payload, already JSON-shaped, with its ETag"""
+    __slots__ = ("version", "data", "etag", "built_at")
+
+    def __init__(self, version: int, data: Dict[str, Any]):
+        self.version = version
+        self.data = data
+        self.etag = make_etag(data)
+        self.built_at = time.time()
+
+class RouteDetailsCache:
+    """Read model for the route details screen: RouteDetails built in one embedded select, cached per route.
+
+    Every route has a version that is bumped whenever one of its schedules,
+    stops or running trips changes; an entry only serves while it carries the
+    current version, so a build that raced a change is never served. Entries
+    also expire after ROUTE_DETAILS_CACHE_TTL to pick up other workers'
+    changes. Concurrent misses for a route share one fetch.
+    """
+
+    def __init__(self):
+        self._entries = TTLCache(maxsize=settings.ROUTE_DETAILS_CACHE_SIZE, ttl=settings.ROUTE_DETAILS_CACHE_TTL)
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._stop_routes: Dict[str, Set[str]] = defaultdict(set)  # stop_id -> routes whose cached payload lists it
+        self._building: Dict[str, asyncio.Future] = {}
+        self.builds = 0
+
+    def bump(self, route_id: Optional[str]) -> None:
+        """Mark a route's details as changed"""
+        if route_id:
+            self._versions[route_id] += 1
+
+    def bump_stop(self, stop_id: str) -> None:
+        """Mark the details of every route serving a stop as changed"""
+        for route_id in self._stop_routes.get(stop_id, ()):
+            self.bump(route_id)
+
+    async def get(self, route_id: str) -> Optional[RouteDetailsEntry]:
+        """Current details of a route, built on a miss; None if the route does not exist"""
+        entry = self._entries.get(route_id)
+        if entry is not None and entry.version == self._versions[route_id]:
+            return entry
+
+        building = self._building.get(route_id)
+        if building is not None and building.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(building)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[route_id] = future
+        try:
+            entry = await self._build(route_id)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, waiters get it re-raised
+            raise
+        finally:
+            self._building.pop(route_id, None)
+
+    async def _build(self, route_id: str) -> Optional[RouteDetailsEntry]:
+        version = self._versions[route_id]
+        result = await run_query(
+            get_supabase_client().table("routes")
+            .select(ROUTE_DETAILS_SELECT)
+            .eq("id", route_id)
+            .in_("schedules.trips.status", list(CURRENT_TRIP_STATUSES))
+        )
+        if not result.data:
+            return None
+        row = result.data[0]
+        route_stops = sorted(row.pop("route_stops", None) or [], key=lambda rs: rs["stop_order"])
+        schedules = row.pop("schedules", None) or []
+        trips = [trip for schedule in schedules for trip in schedule.pop("trips", None) or []]
+        details = RouteDetails(
+            route=RouteResponse(**row),
+            stops=[RouteStopResponse(**route_stop) for route_stop in route_stops],
+            schedules=sorted(
+                (ScheduleResponse(**schedule) for schedule in schedules if schedule.get("is_active", True)),
+                key=lambda schedule: schedule.departure_time
+            ),
+            current_trips=sorted(
+                (TripResponse(**trip) for trip in trips),
+                key=lambda trip: (trip.scheduled_departure is None, trip.scheduled_departure, trip.id)
+            ),
+        )
+
+        for route_stop in route_stops:
+            self._stop_routes[route_stop["stop_id"]].add(route_id)
+        entry = RouteDetailsEntry(version, details.model_dump(mode="json"))
+        self._entries.set(route_id, entry)
+        self.builds += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._entries.stats(), "builds": self.builds}
+
+# Process-wide route details read model
+route_details_cache = RouteDetailsCache()
@@ -0,0 +1,353 @@
+import asyncio
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone, time as dt_time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.models.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse, ScheduleDeparture, SCHEDULE_COLUMNS
+from app.schemas.common import APIResponse
+from app.services.dashboard_service import dashboard_schedules_cache
+from app.services.route_service import route_details_cache
+from app.utils.helpers import offset, order_by, returning
+
+SCHEDULE_PAGE_SIZE = 1000  # PostgREST's default max rows per response
+MINUTES_PER_DAY = 24 * 60
+
+def weekday_mask(days_of_week: Iterable[int]) -> int:
+    """Bitmask with bit (day - 1) set for each weekday, 1=Monday ... 7=Sunday"""
+    mask = 0
+    for day in days_of_week:
+        mask |= 1 << (day - 1)
+    return mask
+
+def minute_of_day(value: Any) -> int:
+    """Minutes since midnight of a time or an 'HH:MM[:SS]' string (seconds are ignored)"""
+    if isinstance(value, str):
+        value = dt_time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+def service_times(service_date: date, departure_minute: int, arrival_minute: int, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+    """Departure and arrival instants of a schedule on a service date; an earlier arrival is after midnight"""
+    midnight = datetime.combine(service_date, dt_time(), tz)
+    if arrival_minute < departure_minute:
+        arrival_minute += MINUTES_PER_DAY
+    return midnight + timedelta(minutes=departure_minute), midnight + timedelta(minutes=arrival_minute)
+
+class TimetableEntry:
+    """An active schedule reduced to what the timetable needs"""
+    __slots__ = ("route_id", "bus_id", "departure_minute", "arrival_minute", "days_mask")
+
+    def __init__(self, schedule: Dict[str, Any]):
+        self.route_id = schedule["route_id"]
+        self.bus_id = schedule["bus_id"]
+        self.departure_minute = minute_of_day(schedule["departure_time"])
+        self.arrival_minute = minute_of_day(schedule["arrival_time"])
+        self.days_mask = weekday_mask(schedule["days_of_week"])
+
+class RouteDay:
+    """Departures of one route on one weekday: minutes since midnight in sorted order, with their schedule ids"""
+    __slots__ = ("minutes", "schedule_ids")
+
+    def __init__(self):
+        self.minutes = array("H")
+        self.schedule_ids: List[str] = []
+
+    def _position(self, minute: int, schedule_id: str) -> int:
+        # Ordered by (minute, schedule id), the same order a full build produces
+        low = bisect_left(self.minutes, minute)
+        high = bisect_right(self.minutes, minute, low)
+        return bisect_left(self.schedule_ids, schedule_id, low, high)
+
+    def insert(self, minute: int, schedule_id: str) -> None:
+        i = self._position(minute, schedule_id)
+        self.minutes.insert(i, minute)
+        self.schedule_ids.insert(i, schedule_id)
+
+    def remove(self, minute: int, schedule_id: str) -> None:
+        i = self._position(minute, schedule_id)
+        if i < len(self.minutes) and self.minutes[i] == minute and self.schedule_ids[i] == schedule_id:
+            del self.minutes[i]
+            del self.schedule_ids[i]
+
+class TimetableIndex:
+    """Active schedules compiled into per-route, per-weekday sorted departure arrays.
+
+    "Next departures after T" is a bisect into the route's array for T's
+    weekday, continuing into the following days when that day runs out. The
+    index is loaded lazily, patched in place by this worker's schedule writes
+    (only the route-days a schedule runs on are touched) and rebuilt every
+    TIMETABLE_REFRESH_INTERVAL seconds to pick up other workers' changes.
+    Times are wall-clock times in SERVICE_TIMEZONE.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, TimetableEntry] = {}
+        self._days: Dict[Tuple[str, int], RouteDay] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < settings.TIMETABLE_REFRESH_INTERVAL
+
+    async def ensure_loaded(self) -> None:
+        """Build the index on first use and rebuild it once it is older than the refresh interval"""
+        if self._is_fresh():
+            return
+        async with self._get_lock():
+            if not self._is_fresh():
+                await self.reload()
+
+    async def reload(self) -> None:
+        """Page through the active schedules and swap in a freshly compiled index"""
+        supabase = get_supabase_client()
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = (
+                supabase.table("schedules")
+                .select("id,route_id,bus_id,departure_time,arrival_time,days_of_week")
+                .eq("is_active", True)
+                .order("id")
+                .limit(SCHEDULE_PAGE_SIZE)
+            )
+            page = (await run_query(offset(query, start))).data
+            rows.extend(page)
+            if len(page) < SCHEDULE_PAGE_SIZE:
+                break
+            start += SCHEDULE_PAGE_SIZE
+        self.build(rows)
+
+    def build(self, schedules: List[Dict[str, Any]]) -> None:
+        """Compile schedule rows into a new index in one pass (sort once instead of inserting one by one)"""
+        entries: Dict[str, TimetableEntry] = {}
+        departures: Dict[Tuple[str, int], List[Tuple[int, str]]] = {}
+        for schedule in schedules:
+            entry = TimetableEntry(schedule)
+            entries[schedule["id"]] = entry
+            for day in range(1, 8):
+                if entry.days_mask & (1 << (day - 1)):
+                    departures.setdefault((entry.route_id, day), []).append((entry.departure_minute, schedule["id"]))
+
+        days: Dict[Tuple[str, int], RouteDay] = {}
+        for key, items in departures.items():
+            items.sort()
+            route_day = days[key] = RouteDay()
+            route_day.minutes = array("H", (minute for minute, _ in items))
+            route_day.schedule_ids = [schedule_id for _, schedule_id in items]
+        self._entries, self._days = entries, days
+        self._loaded_at = time.monotonic()
+
+    def _add(self, schedule_id: str, entry: TimetableEntry) -> None:
+        self._entries[schedule_id] = entry
+        for day in range(1, 8):
+            if entry.days_mask & (1 << (day - 1)):
+                route_day = self._days.get((entry.route_id, day))
+                if route_day is None:
+                    route_day = self._days[(entry.route_id, day)] = RouteDay()
+                route_day.insert(entry.departure_minute, schedule_id)
+
+    def remove(self, schedule_id: str) -> None:
+        """Drop a schedule from the route-days it ran on"""
+        entry = self._entries.pop(schedule_id, None)
+        if entry is None:
+            return
+        for day in range(1, 8):
+            if entry.days_mask & (1 << (day - 1)):
+                key = (entry.route_id, day)
+                route_day = self._days.get(key)
+                if route_day is not None:
+                    route_day.remove(entry.departure_minute, schedule_id)
+                    if not route_day.schedule_ids:
+                        del self._days[key]
+
+    def put(self, schedule: Dict[str, Any]) -> None:
+        """Apply a written schedule; inactive schedules drop out"""
+        if self._loaded_at is None:
+            return  # not built yet, the first query will load it
+        self.remove(schedule["id"])
+        if schedule.get("is_active", True):
+            self._add(schedule["id"], TimetableEntry(schedule))
+
+    def route_of(self, schedule_id: str) -> Optional[str]:
+        """Route of an indexed schedule, if the index has it"""
+        entry = self._entries.get(schedule_id)
+        return entry.route_id if entry is not None else None
+
+    def next_departures(self, route_id: str, after: datetime, limit: int) -> List[ScheduleDeparture]:
+        """The next `limit` departures of a route at or after `after`, looking up to a week ahead"""
+        tz = ZoneInfo(settings.SERVICE_TIMEZONE)
+        local = after.astimezone(tz)
+        minute = local.hour * 60 + local.minute + (1 if local.second or local.microsecond else 0)
+        departures: List[ScheduleDeparture] = []
+        # Eight days so that today's earlier departures are reached again a week later
+        for days_ahead in range(8):
+            service_date = local.date() + timedelta(days=days_ahead)
+            route_day = self._days.get((route_id, service_date.isoweekday()))
+            if route_day is None:
+                continue
+            start = bisect_left(route_day.minutes, minute) if days_ahead == 0 else 0
+            for i in range(start, min(len(route_day.minutes), start + limit - len(departures))):
+                departures.append(self._departure(route_day.schedule_ids[i], service_date, tz))
+            if len(departures) >= limit:
+                break
+        return departures
+
+    def _departure(self, schedule_id: str, service_date: date, tz: ZoneInfo) -> ScheduleDeparture:
+        entry = self._entries[schedule_id]
+        departure, arrival = service_times(service_date, entry.departure_minute, entry.arrival_minute, tz)
+        return ScheduleDeparture(
+            schedule_id=schedule_id,
+            route_id=entry.route_id,
+            bus_id=entry.bus_id,
+            departure=departure,
+            arrival=arrival
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "schedules": len(self._entries),
+            "route_days": len(self._days),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+        }
+
+# Process-wide timetable
+timetable_index = TimetableIndex()
+
+class ScheduleService:
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def list_schedules(self, route_id: Optional[str], limit: int, start: int) -> APIResponse:
+        """Schedules, optionally of one route, ordered by departure time"""
+        try:
+            query = self.supabase.table("schedules").select(SCHEDULE_COLUMNS)
+            if route_id:
+                query = query.eq("route_id", route_id)
+            query = order_by(query.limit(limit), "departure_time.asc", "id.asc")
+            result = await run_query(offset(query, start))
+            return APIResponse(
+                success=True,
+                message=f"Found {len(result.data)} schedules",
+                data=[ScheduleResponse(**schedule) for schedule in result.data]
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to load schedules",
+                errors=[str(e)]
+            )
+
+    async def create_schedule(self, schedule_data: ScheduleCreate) -> APIResponse:
+        """Create a schedule (admin only)"""
+        try:
+            result = await run_query(returning(
+                self.supabase.table("schedules").insert(schedule_data.model_dump(mode="json")), SCHEDULE_COLUMNS
+            ))
+            schedule = result.data[0]
+            timetable_index.put(schedule)
+            self._routes_changed(schedule["route_id"])
+            return APIResponse(
+                success=True,
+                message="Schedule created successfully",
+                data=ScheduleResponse(**schedule)
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to create schedule",
+                errors=[str(e)]
+            )
+
+    async def update_schedule(self, schedule_id: str, schedule_data: ScheduleUpdate) -> APIResponse:
+        """Update a schedule (admin only)"""
+        try:
+            update_data = schedule_data.model_dump(mode="json", exclude_unset=True)
+            update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+            result = await run_query(returning(
+                self.supabase.table("schedules").update(update_data).eq("id", schedule_id), SCHEDULE_COLUMNS
+            ))
+
+            if not result.data:
+                return APIResponse(
+                    success=False,
+                    message="Schedule not found",
+                    errors=["Schedule with this ID does not exist"]
+                )
+
+            schedule = result.data[0]
+            self._routes_changed(timetable_index.route_of(schedule_id), schedule["route_id"])
+            timetable_index.put(schedule)
+            return APIResponse(
+                success=True,
+                message="Schedule updated successfully",
+                data=ScheduleResponse(**schedule)
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to update schedule",
+                errors=[str(e)]
+            )
+
+    async def delete_schedule(self, schedule_id: str) -> APIResponse:
+        """Delete a schedule (admin only)"""
+        try:
+            result = await run_query(returning(
+                self.supabase.table("schedules").delete().eq("id", schedule_id), "id", "route_id"
+            ))
+
+            if not result.data:
+                return APIResponse(
+                    success=False,
+                    message="Schedule not found",
+                    errors=["Schedule with this ID does not exist"]
+                )
+
+            timetable_index.remove(schedule_id)
+            self._routes_changed(result.data[0]["route_id"])
+            return APIResponse(
+                success=True,
+                message="Schedule deleted successfully"
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to delete schedule",
+                errors=[str(e)]
+            )
+
+    async def get_next_departures(self, route_id: str, after: datetime, limit: int) -> APIResponse:
+        """Upcoming departures of a route from the compiled timetable"""
+        try:
+            await timetable_index.ensure_loaded()
+            departures = timetable_index.next_departures(route_id, after, limit)
+            return APIResponse(
+                success=True,
+                message=f"Found {len(departures)} departures",
+                data=departures
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to load departures",
+                errors=[str(e)]
+            )
+
+    @staticmethod
+    def _routes_changed(*route_ids: Optional[str]):
+        """Drop cached data derived from these routes' schedules after a change"""
+        for route_id in route_ids:
+            if route_id:
+                route_details_cache.bump(route_id)
+                dashboard_schedules_cache.invalidate(route_id)
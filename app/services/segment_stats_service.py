@@ -0,0 +1,198 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.models.trip import TripStatus
+from app.services.eta_service import RoutePath, eta_engine
+from app.services.trajectory_service import fetch_trip_pings
+from app.utils.helpers import offset, order_by
+
+SegmentKey = Tuple[str, str, int, int]  # (from_stop_id, to_stop_id, weekday 1-7, time-of-day bucket)
+
+STATS_COLUMNS = "from_stop_id,to_stop_id,weekday,bucket,samples,mean_seconds,variance"
+PAGE_SIZE = 1000
+MIN_SEGMENT_KMH, MAX_SEGMENT_KMH = 2.0, 120.0  # travel times implying other speeds are GPS noise
+
+def service_bucket(epoch: float) -> Tuple[int, int]:
+    """Weekday (1=Monday, as in ScheduleBase.days_of_week) and time-of-day bucket in the service timezone"""
+    local = datetime.fromtimestamp(epoch, ZoneInfo(settings.SERVICE_TIMEZONE))
+    return local.isoweekday(), (local.hour * 60 + local.minute) // settings.SEGMENT_STATS_BUCKET_MINUTES
+
+class SegmentStatsCache:
+    """Typical stop-to-stop travel times by weekday and time of day, loaded from segment_travel_stats.
+
+    Holds only the mean of buckets with enough samples, keyed by tuple, and
+    reloads itself in the background once older than SEGMENT_STATS_CACHE_TTL.
+    """
+
+    def __init__(self):
+        self._means: Dict[SegmentKey, float] = {}
+        self._loaded_at: Optional[float] = None
+        self._loading = False
+
+    def load_rows(self, stats: Dict[SegmentKey, List[float]]) -> None:
+        """Replace the cached means from {key: [samples, mean_seconds, variance]}"""
+        self._means = {
+            key: mean for key, (samples, mean, _) in stats.items() if samples >= settings.SEGMENT_STATS_MIN_SAMPLES
+        }
+        self._loaded_at = time.monotonic()
+
+    async def reload(self) -> None:
+        self.load_rows(await load_segment_stats())
+
+    def _reload_in_background(self) -> None:
+        if self._loading:
+            return
+        self._loading = True
+
+        async def reload():
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"Warning: Failed to load segment travel stats: {e}")
+                self._loaded_at = time.monotonic()  # retry after the next TTL instead of on every ping
+            finally:
+                self._loading = False
+
+        asyncio.get_running_loop().create_task(reload())
+
+    def segment_seconds(self, from_stop_id: str, to_stop_id: str, at: float) -> Optional[float]:
+        """Typical travel time for a segment started at epoch `at`, or None without enough history"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.SEGMENT_STATS_CACHE_TTL:
+            self._reload_in_background()
+        weekday, bucket = service_bucket(at)
+        return self._means.get((from_stop_id, to_stop_id, weekday, bucket))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segments": len(self._means),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+        }
+
+async def load_segment_stats() -> Dict[SegmentKey, List[float]]:
+    """Read the whole (compact) statistics table"""
+    supabase = get_supabase_client()
+    stats: Dict[SegmentKey, List[float]] = {}
+    start = 0
+    while True:
+        query = order_by(supabase.table("segment_travel_stats").select(STATS_COLUMNS).limit(PAGE_SIZE),
+                         "from_stop_id", "to_stop_id", "weekday", "bucket")
+        rows = (await run_query(offset(query, start))).data
+        for row in rows:
+            key = (row["from_stop_id"], row["to_stop_id"], row["weekday"], row["bucket"])
+            stats[key] = [row["samples"], row["mean_seconds"], row["variance"]]
+        if len(rows) < PAGE_SIZE:
+            return stats
+        start += PAGE_SIZE
+
+# Process-wide cache; the ETA engine reads historical segment times from it
+segment_stats_cache = SegmentStatsCache()
+eta_engine.segment_history = segment_stats_cache.segment_seconds
+
+def stop_crossings(path: RoutePath, pings: List[Tuple[float, float, float]]) -> List[Optional[float]]:
+    """Map-match (timestamp, latitude, longitude) pings to the time the bus reached each stop.
+
+    Pings are projected onto the route (progress never moves backwards) and
+    the crossing of each stop is interpolated between the two pings around
+    it. The first stop counts as reached when the bus leaves it.
+    """
+    crossings: List[Optional[float]] = [None] * len(path.stop_ids)
+    thresholds = [0.05] + path.cumulative[1:]  # departing the first stop, arriving at the others
+    previous: Optional[Tuple[float, float]] = None  # (timestamp, km along)
+    segment: Optional[int] = None
+    next_stop = 0
+    for timestamp, latitude, longitude in pings:
+        if segment is None:
+            segment, along, _ = path.project(latitude, longitude)
+        else:
+            segment, along, off = path.project(latitude, longitude, segment - 1, segment + 3)
+            if off > settings.ETA_OFF_ROUTE_KM:
+                segment, along, _ = path.project(latitude, longitude)
+            along = max(along, previous[1])
+        while next_stop < len(thresholds) and along >= thresholds[next_stop]:
+            if previous is not None and previous[1] < thresholds[next_stop] and along > previous[1]:
+                ratio = (thresholds[next_stop] - previous[1]) / (along - previous[1])
+                crossings[next_stop] = previous[0] + ratio * (timestamp - previous[0])
+            next_stop += 1
+        previous = (timestamp, along)
+    return crossings
+
+class SegmentStatsAggregator:
+    """Incrementally folds completed trips into segment_travel_stats.
+
+    Completed trips not yet marked with segment_stats_aggregated_at are read in
+    (actual_arrival_time, id) batches, so a trip completed late is still picked
+    up. Each batch goes to the fold_segment_samples function, which in one
+    transaction marks the trips that are still unmarked and folds only their
+    samples into the statistics rows, reading each row under its lock. A failed
+    call changes nothing and the batch is retried by the next run; overlapping
+    runs never count a trip twice or overwrite each other's samples.
+    """
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def run(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        summary = {"trips": 0, "segments": 0, "batches": 0}
+
+        while max_batches is None or summary["batches"] < max_batches:
+            trips = await self._unaggregated_trips()
+            if not trips:
+                break
+
+            samples: List[Dict[str, Any]] = []
+            for trip in trips:
+                for (from_stop_id, to_stop_id, weekday, bucket), seconds in await self._trip_segment_times(trip):
+                    samples.append({
+                        "trip_id": trip["id"], "from_stop_id": from_stop_id, "to_stop_id": to_stop_id,
+                        "weekday": weekday, "bucket": bucket, "seconds": round(seconds, 1),
+                    })
+
+            # Marks every trip of the batch (trips another run claimed meanwhile are skipped)
+            result = await run_query(self.supabase.rpc("fold_segment_samples", {
+                "trip_ids": [trip["id"] for trip in trips],
+                "samples": samples,
+                "decay": settings.SEGMENT_STATS_DECAY,
+            }))
+            folded = result.data[0]
+            summary["trips"] += folded["claimed_trips"]
+            summary["segments"] += folded["folded_samples"]
+            summary["batches"] += 1
+
+        if summary["batches"]:
+            await segment_stats_cache.reload()  # what was committed, including other runs' samples
+        return summary
+
+    async def _unaggregated_trips(self) -> List[Dict[str, Any]]:
+        query = (
+            self.supabase.table("trips")
+            .select("id,actual_arrival_time,schedules(route_id)")
+            .eq("status", TripStatus.COMPLETED.value)
+            .is_("segment_stats_aggregated_at", "null")
+            .not_.is_("actual_arrival_time", "null")
+            .limit(settings.SEGMENT_STATS_TRIP_BATCH)
+        )
+        return (await run_query(order_by(query, "actual_arrival_time.asc", "id.asc"))).data
+
+    async def _trip_segment_times(self, trip: Dict[str, Any]) -> List[Tuple[SegmentKey, float]]:
+        route_id = (trip.get("schedules") or {}).get("route_id")
+        path = await eta_engine.load_path(route_id) if route_id else None
+        if path is None:
+            return []
+
+        pings = await fetch_trip_pings(trip["id"])
+        crossings = stop_crossings(path, pings)
+        times = []
+        for segment, length_km in enumerate(path.segment_km):
+            entered, reached = crossings[segment], crossings[segment + 1]
+            if entered is None or reached is None or reached <= entered:
+                continue
+            seconds = reached - entered
+            if not MIN_SEGMENT_KMH <= length_km / seconds * 3600 <= MAX_SEGMENT_KMH:
+                continue
+            weekday, bucket = service_bucket(entered)
+            times.append(((path.stop_ids[segment], path.stop_ids[segment + 1], weekday, bucket), seconds))
+        return times
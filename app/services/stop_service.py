@@ -0,0 +1,197 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.models.stop import StopCreate, StopUpdate, StopResponse, NearbyStop, STOP_COLUMNS
+from app.schemas.common import APIResponse
+from app.services.eta_service import eta_engine
+from app.services.route_service import route_details_cache
+from app.utils.geo import GridIndex
+from app.utils.helpers import offset, returning
+
+STOP_PAGE_SIZE = 1000  # PostgREST's default max rows per response
+
+class StopIndex:
+    """In-memory spatial index over all stops that have coordinates.
+
+    Loaded lazily on the first query, kept current by this worker's stop
+    writes, and rebuilt every STOP_INDEX_REFRESH_INTERVAL seconds to pick up
+    changes made by other workers.
+    """
+
+    def __init__(self):
+        self._grid: GridIndex[str] = GridIndex(settings.STOP_INDEX_CELL_DEGREES)
+        self._stops: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < settings.STOP_INDEX_REFRESH_INTERVAL
+
+    async def ensure_loaded(self) -> None:
+        """Build the index on first use and rebuild it once it is older than the refresh interval"""
+        if self._is_fresh():
+            return
+        async with self._get_lock():
+            if not self._is_fresh():
+                await self.reload()
+
+    async def reload(self) -> None:
+        """Page through the stops table and swap in a freshly built index"""
+        supabase = get_supabase_client()
+        grid: GridIndex[str] = GridIndex(settings.STOP_INDEX_CELL_DEGREES)
+        stops: Dict[str, Dict[str, Any]] = {}
+        start = 0
+        while True:
+            query = supabase.table("stops").select(STOP_COLUMNS).order("id").limit(STOP_PAGE_SIZE)
+            rows = (await run_query(offset(query, start))).data
+            for stop in rows:
+                if stop.get("latitude") is not None and stop.get("longitude") is not None:
+                    stops[stop["id"]] = stop
+                    grid.insert(stop["id"], stop["latitude"], stop["longitude"])
+            if len(rows) < STOP_PAGE_SIZE:
+                break
+            start += STOP_PAGE_SIZE
+        self._grid, self._stops = grid, stops
+        self._loaded_at = time.monotonic()
+
+    def put(self, stop: Dict[str, Any]) -> None:
+        """Add or move a stop after it was written; stops without coordinates drop out"""
+        if self._loaded_at is None:
+            return  # not built yet, the first query will load it
+        if stop.get("latitude") is None or stop.get("longitude") is None:
+            self.remove(stop["id"])
+            return
+        self._stops[stop["id"]] = stop
+        self._grid.insert(stop["id"], stop["latitude"], stop["longitude"])
+
+    def remove(self, stop_id: str) -> None:
+        self._stops.pop(stop_id, None)
+        self._grid.remove(stop_id)
+
+    def _with_distance(self, distance_km: float, stop_id: str) -> NearbyStop:
+        return NearbyStop(**self._stops[stop_id], distance_km=round(distance_km, 4))
+
+    def nearest(self, latitude: float, longitude: float, limit: int, radius_km: Optional[float] = None) -> List[NearbyStop]:
+        return [self._with_distance(*hit) for hit in self._grid.nearest(latitude, longitude, limit, radius_km)]
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, limit: int) -> List[StopResponse]:
+        return [StopResponse(**self._stops[stop_id]) for stop_id in self._grid.within_bbox(min_lat, min_lon, max_lat, max_lon)[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stops": len(self._grid),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+        }
+
+# Process-wide stop index
+stop_index = StopIndex()
+
+class StopService:
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def create_stop(self, stop_data: StopCreate) -> APIResponse:
+        """Create a stop (admin only)"""
+        try:
+            result = await run_query(returning(self.supabase.table("stops").insert(stop_data.model_dump()), STOP_COLUMNS))
+            stop = result.data[0]
+            stop_index.put(stop)
+            return APIResponse(
+                success=True,
+                message="Stop created successfully",
+                data=StopResponse(**stop)
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to create stop",
+                errors=[str(e)]
+            )
+
+    async def update_stop(self, stop_id: str, stop_data: StopUpdate) -> APIResponse:
+        """Update a stop (admin only)"""
+        try:
+            update_data = stop_data.model_dump(exclude_unset=True)
+            update_data["updated_at"] = datetime.utcnow().isoformat()
+            result = await run_query(returning(self.supabase.table("stops").update(update_data).eq("id", stop_id), STOP_COLUMNS))
+
+            if not result.data:
+                return APIResponse(
+                    success=False,
+                    message="Stop not found",
+                    errors=["Stop with this ID does not exist"]
+                )
+
+            stop = result.data[0]
+            stop_index.put(stop)
+            route_details_cache.bump_stop(stop_id)
+            eta_engine.invalidate_stop(stop_id)
+            return APIResponse(
+                success=True,
+                message="Stop updated successfully",
+                data=StopResponse(**stop)
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to update stop",
+                errors=[str(e)]
+            )
+
+    async def get_nearby_stops(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: int,
+        radius_km: Optional[float] = None
+    ) -> APIResponse:
+        """Stops closest to a point, optionally limited to a radius"""
+        try:
+            await stop_index.ensure_loaded()
+            stops = stop_index.nearest(latitude, longitude, limit, radius_km)
+            return APIResponse(
+                success=True,
+                message=f"Found {len(stops)} nearby stops",
+                data=stops
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to find nearby stops",
+                errors=[str(e)]
+            )
+
+    async def get_stops_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        limit: int
+    ) -> APIResponse:
+        """Stops inside a map viewport"""
+        try:
+            await stop_index.ensure_loaded()
+            stops = stop_index.within_bbox(min_lat, min_lon, max_lat, max_lon, limit)
+            return APIResponse(
+                success=True,
+                message=f"Found {len(stops)} stops",
+                data=stops
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to load stops",
+                errors=[str(e)]
+            )
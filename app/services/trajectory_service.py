@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+from postgrest.types import CountMethod, ReturnMethod
+from app.config.database import get_supabase_client, run_count, run_query
+from app.config.settings import settings
+from app.models.trip import TripStatus
+from app.schemas.common import APIResponse
+from app.schemas.tracking import TripPath
+from app.utils.geo import encode_polyline, simplify_path
+from app.utils.helpers import offset, order_by, returning
+
+PAGE_SIZE = 1000
+TRIP_PATH_COLUMNS = "path_polyline,path_times,path_started_at,path_points,path_raw_points"
+
+async def fetch_trip_pings(trip_id: str) -> List[Tuple[float, float, float]]:
+    """All recorded (epoch seconds, latitude, longitude) of a trip in time order, paged"""
+    supabase = get_supabase_client()
+    pings: List[Tuple[float, float, float]] = []
+    start = 0
+    while True:
+        query = (
+            supabase.table("bus_locations")
+            .select("latitude,longitude,timestamp")
+            .eq("trip_id", trip_id)
+            .limit(PAGE_SIZE)
+        )
+        rows = (await run_query(offset(order_by(query, "timestamp.asc", "id.asc"), start))).data
+        pings.extend(
+            (datetime.fromisoformat(row["timestamp"]).timestamp(), row["latitude"], row["longitude"]) for row in rows
+        )
+        if len(rows) < PAGE_SIZE:
+            return pings
+        start += PAGE_SIZE
+
+def compress_trajectory(pings: List[Tuple[float, float, float]]) -> Dict[str, Any]:
+    """Douglas-Peucker simplify a trip's pings and encode them as polylines.
+
+    path_polyline is a standard encoded polyline of the kept points;
+    path_times encodes their seconds since the first ping the same way, so
+    replays keep their timing.
+    """
+    if not pings:
+        return {"path_polyline": "", "path_times": "", "path_started_at": None, "path_points": 0, "path_raw_points": 0}
+    kept = simplify_path([(lat, lon) for _, lat, lon in pings], settings.TRAJECTORY_TOLERANCE_M)
+    started = pings[0][0]
+    return {
+        "path_polyline": encode_polyline([(pings[i][1], pings[i][2]) for i in kept]),
+        "path_times": encode_polyline([(round(pings[i][0] - started),) for i in kept], precision=0),
+        "path_started_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        "path_points": len(kept),
+        "path_raw_points": len(pings),
+    }
+
+class TrajectoryService:
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def get_trip_path(self, trip_id: str) -> APIResponse:
+        """Compressed path of a trip: stored once the trip is compacted, computed from raw pings before that"""
+        try:
+            result = await run_query(
+                self.supabase.table("trips").select(TRIP_PATH_COLUMNS).eq("id", trip_id)
+            )
+            if not result.data:
+                return APIResponse(
+                    success=False,
+                    message="Trip not found",
+                    errors=["Trip with this ID does not exist"]
+                )
+
+            trip = result.data[0]
+            path = trip if trip.get("path_polyline") is not None else compress_trajectory(await fetch_trip_pings(trip_id))
+            return APIResponse(
+                success=True,
+                message="Trip path retrieved",
+                data=TripPath(
+                    trip_id=trip_id,
+                    polyline=path["path_polyline"],
+                    times=path["path_times"],
+                    started_at=path["path_started_at"],
+                    points=path["path_points"],
+                    raw_points=path["path_raw_points"],
+                )
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to load trip path",
+                errors=[str(e)]
+            )
+
+    async def compact_trips(self, limit: int) -> Dict[str, int]:
+        """Store compressed paths for completed trips that do not have one yet"""
+        result = await run_query(
+            self.supabase.table("trips")
+            .select("id")
+            .eq("status", TripStatus.COMPLETED.value)
+            .is_("path_polyline", "null")
+            .order("actual_arrival_time")
+            .limit(limit)
+        )
+        summary = {"trips": 0, "raw_points": 0, "points": 0}
+        for trip in result.data:
+            path = compress_trajectory(await fetch_trip_pings(trip["id"]))
+            await run_query(returning(self.supabase.table("trips").update(path).eq("id", trip["id"]), "id"))
+            summary["trips"] += 1
+            summary["raw_points"] += path["path_raw_points"]
+            summary["points"] += path["path_points"]
+        return summary
+
+    async def prune_locations(self, max_batches: int) -> int:
+        """Delete the raw bus_locations of trips that ended more than LOCATION_RETENTION_DAYS ago.
+
+        Only trips whose path is stored and whose segment times were aggregated
+        are pruned, LOCATION_PRUNE_TRIPS trips per batch; the raw pings of
+        every other trip are still needed and kept.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=settings.LOCATION_RETENTION_DAYS)).isoformat()
+        deleted = 0
+        for _ in range(max_batches):
+            result = await run_query(
+                self.supabase.table("trips")
+                .select("id")
+                .not_.is_("path_polyline", "null")
+                .not_.is_("segment_stats_aggregated_at", "null")
+                .is_("locations_pruned_at", "null")
+                .lt("actual_arrival_time", cutoff)
+                .order("actual_arrival_time")
+                .limit(settings.LOCATION_PRUNE_TRIPS)
+            )
+            trip_ids = [trip["id"] for trip in result.data]
+            if not trip_ids:
+                break
+            deleted += await run_count(
+                self.supabase.table("bus_locations")
+                .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+                .in_("trip_id", trip_ids)
+            )
+            await run_query(
+                self.supabase.table("trips")
+                .update({"locations_pruned_at": datetime.now(timezone.utc).isoformat()}, returning=ReturnMethod.minimal)
+                .in_("id", trip_ids)
+            )
+        return deleted
+
+    async def run_retention(self, compact_limit: int, prune_batches: int) -> APIResponse:
+        """Compact finished trips first, then prune raw rows past the retention window"""
+        try:
+            compacted = await self.compact_trips(compact_limit)
+            deleted = await self.prune_locations(prune_batches)
+            return APIResponse(
+                success=True,
+                message=f"Compacted {compacted['trips']} trips, pruned {deleted} locations",
+                data={"compacted": compacted, "pruned_locations": deleted}
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Trajectory retention failed",
+                errors=[str(e)]
+            )
@@ -0,0 +1,243 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+from postgrest.types import CountMethod, ReturnMethod
+from app.config.database import get_supabase_client, run_count, run_query
+from app.config.settings import settings
+from app.models.trip import TripStatus, TripResponse, TRIP_COLUMNS
+from app.schemas.common import APIResponse
+from app.services.fleet_stats_service import fleet_stats
+from app.services.schedule_service import minute_of_day, service_times, weekday_mask
+from app.utils.helpers import offset, order_by, returning
+
+PAGE_SIZE = 1000
+ID_CHUNK_SIZE = 100  # ids per in.(...) filter, keeps the URL short
+TRIP_KEY_COLUMNS = "schedule_id,service_date"
+PLANNED_COLUMNS = ("bus_id", "driver_id", "scheduled_departure", "scheduled_arrival")
+DIFF_SAMPLE_SIZE = 50
+UPDATE_CONCURRENCY = 10  # guarded single-trip PATCHes in flight
+
+TripKey = Tuple[str, str]  # (schedule_id, service_date ISO)
+
+class TripMaterializer:
+    """Pre-builds SCHEDULED trips for the coming days from the active schedules.
+
+    The wanted trips (one per schedule and running day) are diffed against
+    the trips already in the window on (schedule_id, service_date): missing
+    trips are inserted, still-scheduled trips whose bus, driver or times
+    changed are updated, and still-scheduled trips whose schedule no longer
+    runs that day are cancelled. Cancelled trips that are wanted again (the
+    schedule was reactivated or the day re-added) are restored to SCHEDULED
+    with the wanted bus, driver and times. Trips that have started are left
+    alone: updates and cancels only apply while the trip is still scheduled,
+    restores while it is still cancelled.
+    Inserts ignore rows that already exist, so reruns and overlapping runs
+    are idempotent.
+    """
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def run(self, days: int, dry_run: bool = False, start: Optional[date] = None) -> Dict[str, Any]:
+        tz = ZoneInfo(settings.SERVICE_TIMEZONE)
+        first = start or datetime.now(tz).date()
+        last = first + timedelta(days=days - 1)
+
+        wanted, unassigned = self._plan(await self._active_schedules(), first, last, tz)
+        existing = await self._existing_trips(first, last)
+
+        create: List[Dict[str, Any]] = []
+        update: List[Dict[str, Any]] = []
+        restore: List[Dict[str, Any]] = []
+        unchanged = 0
+        for key, trip in wanted.items():
+            current = existing.pop(key, None)
+            if current is None:
+                create.append(trip)
+            elif current["status"] == TripStatus.SCHEDULED.value and self._changed(current, trip):
+                update.append({**trip, "id": current["id"]})
+            elif current["status"] == TripStatus.CANCELLED.value:
+                restore.append({**trip, "id": current["id"]})
+            else:
+                unchanged += 1
+        cancel = [
+            trip for key, trip in existing.items()
+            if trip["status"] == TripStatus.SCHEDULED.value and key not in unassigned
+        ]
+
+        summary = {
+            "start_date": first.isoformat(),
+            "end_date": last.isoformat(),
+            "dry_run": dry_run,
+            "create": len(create),
+            "update": len(update),
+            "restore": len(restore),
+            "cancel": len(cancel),
+            "unchanged": unchanged,
+            "unassigned": len(unassigned),
+            "changes": (
+                [{"action": "create", "schedule_id": t["schedule_id"], "service_date": t["service_date"]} for t in create]
+                + [{"action": "update", "schedule_id": t["schedule_id"], "service_date": t["service_date"]} for t in update]
+                + [{"action": "restore", "schedule_id": t["schedule_id"], "service_date": t["service_date"]} for t in restore]
+                + [{"action": "cancel", "schedule_id": t["schedule_id"], "service_date": t["service_date"]} for t in cancel]
+            )[:DIFF_SAMPLE_SIZE],
+        }
+        if not dry_run:
+            await self._write(create, update, restore, cancel)
+        return summary
+
+    def _plan(
+        self,
+        schedules: List[Dict[str, Any]],
+        first: date,
+        last: date,
+        tz: ZoneInfo
+    ) -> Tuple[Dict[TripKey, Dict[str, Any]], Set[TripKey]]:
+        """Wanted trip rows by key, plus the keys skipped because the schedule's bus has no driver"""
+        wanted: Dict[TripKey, Dict[str, Any]] = {}
+        unassigned: Set[TripKey] = set()
+        service_dates = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        for schedule in schedules:
+            days_mask = weekday_mask(schedule["days_of_week"])
+            departure_minute = minute_of_day(schedule["departure_time"])
+            arrival_minute = minute_of_day(schedule["arrival_time"])
+            driver_id = (schedule.get("buses") or {}).get("driver_id")
+            for service_date in service_dates:
+                if not days_mask & (1 << (service_date.isoweekday() - 1)):
+                    continue
+                key = (schedule["id"], service_date.isoformat())
+                if driver_id is None:
+                    unassigned.add(key)
+                    continue
+                departure, arrival = service_times(service_date, departure_minute, arrival_minute, tz)
+                wanted[key] = {
+                    "schedule_id": schedule["id"],
+                    "service_date": key[1],
+                    "bus_id": schedule["bus_id"],
+                    "driver_id": driver_id,
+                    "status": TripStatus.SCHEDULED.value,
+                    "scheduled_departure": departure.isoformat(),
+                    "scheduled_arrival": arrival.isoformat(),
+                }
+        return wanted, unassigned
+
+    @staticmethod
+    def _changed(current: Dict[str, Any], wanted: Dict[str, Any]) -> bool:
+        for column in PLANNED_COLUMNS:
+            old, new = current.get(column), wanted[column]
+            if column.startswith("scheduled_") and old is not None:
+                if datetime.fromisoformat(old) != datetime.fromisoformat(new):
+                    return True
+            elif old != new:
+                return True
+        return False
+
+    async def _active_schedules(self) -> List[Dict[str, Any]]:
+        schedules: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = (
+                self.supabase.table("schedules")
+                .select("id,bus_id,departure_time,arrival_time,days_of_week,buses(driver_id)")
+                .eq("is_active", True)
+                .order("id")
+                .limit(PAGE_SIZE)
+            )
+            rows = (await run_query(offset(query, start))).data
+            schedules.extend(rows)
+            if len(rows) < PAGE_SIZE:
+                return schedules
+            start += PAGE_SIZE
+
+    async def _existing_trips(self, first: date, last: date) -> Dict[TripKey, Dict[str, Any]]:
+        trips: Dict[TripKey, Dict[str, Any]] = {}
+        start = 0
+        while True:
+            query = (
+                self.supabase.table("trips")
+                .select("id,schedule_id,service_date,status," + ",".join(PLANNED_COLUMNS))
+                .gte("service_date", first.isoformat())
+                .lte("service_date", last.isoformat())
+                .order("id")
+                .limit(PAGE_SIZE)
+            )
+            rows = (await run_query(offset(query, start))).data
+            for trip in rows:
+                trips[(trip["schedule_id"], trip["service_date"])] = trip
+            if len(rows) < PAGE_SIZE:
+                return trips
+            start += PAGE_SIZE
+
+    async def _write(
+        self,
+        create: List[Dict[str, Any]],
+        update: List[Dict[str, Any]],
+        restore: List[Dict[str, Any]],
+        cancel: List[Dict[str, Any]]
+    ) -> None:
+        chunk = settings.TRIP_MATERIALIZE_CHUNK
+        for i in range(0, len(create), chunk):
+            result = await run_query(returning(self.supabase.table("trips").upsert(
+                create[i:i + chunk], ignore_duplicates=True, on_conflict=TRIP_KEY_COLUMNS
+            ), "id"))
+            fleet_stats.trips_added(TripStatus.SCHEDULED.value, len(result.data))  # rows that already existed are not returned
+
+        now = datetime.now(timezone.utc).isoformat()
+        for i in range(0, len(update), UPDATE_CONCURRENCY):
+            await asyncio.gather(*(self._update_planned(trip, now) for trip in update[i:i + UPDATE_CONCURRENCY]))
+        for i in range(0, len(restore), UPDATE_CONCURRENCY):
+            restored = await asyncio.gather(*(
+                self._update_planned(trip, now, TripStatus.CANCELLED) for trip in restore[i:i + UPDATE_CONCURRENCY]
+            ))
+            fleet_stats.trip_status_changed(TripStatus.CANCELLED.value, TripStatus.SCHEDULED.value, count=sum(restored))
+
+        ids = [trip["id"] for trip in cancel]
+        for i in range(0, len(ids), ID_CHUNK_SIZE):
+            result = await run_query(returning(
+                self.supabase.table("trips").update({"status": TripStatus.CANCELLED.value, "updated_at": now})
+                .in_("id", ids[i:i + ID_CHUNK_SIZE])
+                .eq("status", TripStatus.SCHEDULED.value),  # a trip that started meanwhile keeps running
+                "id"
+            ))
+            fleet_stats.trip_status_changed(TripStatus.SCHEDULED.value, TripStatus.CANCELLED.value, count=len(result.data))
+
+    async def _update_planned(self, trip: Dict[str, Any], now: str, status: TripStatus = TripStatus.SCHEDULED) -> int:
+        """Rewrite a trip's bus, driver and times as a SCHEDULED trip, unless its status changed
+        since it was read; returns the number of trips written (0 or 1)"""
+        row = {**{column: trip[column] for column in PLANNED_COLUMNS}, "status": TripStatus.SCHEDULED.value, "updated_at": now}
+        return await run_count(
+            self.supabase.table("trips")
+            .update(row, count=CountMethod.exact, returning=ReturnMethod.minimal)
+            .eq("id", trip["id"])
+            .eq("status", status.value)
+        )
+
+class TripService:
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def get_driver_trips(self, driver_id: str, days: int) -> APIResponse:
+        """A driver's pre-built trips from today on, in departure order"""
+        try:
+            today = datetime.now(ZoneInfo(settings.SERVICE_TIMEZONE)).date()
+            query = (
+                self.supabase.table("trips")
+                .select(TRIP_COLUMNS)
+                .eq("driver_id", driver_id)
+                .gte("service_date", today.isoformat())
+                .lte("service_date", (today + timedelta(days=days - 1)).isoformat())
+                .neq("status", TripStatus.CANCELLED.value)
+            )
+            result = await run_query(order_by(query, "scheduled_departure.asc", "id.asc"))
+            return APIResponse(
+                success=True,
+                message=f"Found {len(result.data)} trips",
+                data=[TripResponse(**trip) for trip in result.data]
+            )
+        except Exception as e:
+            return APIResponse(
+                success=False,
+                message="Failed to load trips",
+                errors=[str(e)]
+            )
@@ -0,0 +1,243 @@
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+from zoneinfo import ZoneInfo
+from app.config.database import get_supabase_client, run_query
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.models.trip import TripStatus
+from app.services.eta_service import RoutePath, eta_engine
+from app.services.fleet_stats_service import fleet_stats
+from app.services.live_position_store import LivePosition, live_position_store
+from app.services.route_service import route_details_cache
+from app.services.schedule_service import minute_of_day, service_times
+from app.utils.geo import Geofence
+from app.utils.helpers import returning
+
+# Statuses a trip may have in the database for a transition to apply
+TRANSITION_FROM = {
+    TripStatus.DELAYED: (TripStatus.SCHEDULED,),
+    TripStatus.IN_PROGRESS: (TripStatus.SCHEDULED, TripStatus.DELAYED),
+    TripStatus.COMPLETED: (TripStatus.SCHEDULED, TripStatus.DELAYED, TripStatus.IN_PROGRESS),
+}
+FINAL_STATUSES = (TripStatus.COMPLETED, TripStatus.CANCELLED)
+
+class TripFenceState:
+    """A trip's status plus the fences and flags needed to move it along without reading the database"""
+    __slots__ = ("status", "path", "origin", "destination", "scheduled_departure",
+                 "seen_at_origin", "left_destination", "timestamp")
+
+    def __init__(self, status: TripStatus, path: Optional[RoutePath], scheduled_departure: Optional[float]):
+        self.status = status
+        self.path = path
+        radius_km = settings.TRIP_GEOFENCE_RADIUS_M / 1000
+        self.origin = Geofence(path.latitudes[0], path.longitudes[0], radius_km) if path else None
+        self.destination = Geofence(path.latitudes[-1], path.longitudes[-1], radius_km) if path else None
+        self.scheduled_departure = scheduled_departure  # epoch seconds
+        self.seen_at_origin = False
+        self.left_destination = False  # route loops start inside their destination fence
+        self.timestamp = 0.0
+
+class TripStatusTracker:
+    """Moves trips through SCHEDULED -> DELAYED -> IN_PROGRESS -> COMPLETED from their live positions.
+
+    Registered as a live position listener. Each trip's status, scheduled
+    departure and route are loaded once (in the background, on its first
+    ping); after that every ping is only checked against circles around the
+    route's first and last stop:
+
+    - departure: outside the origin fence after being inside it, or already
+      along the route, no earlier than TRIP_EARLY_DEPARTURE_MINUTES before
+      the scheduled departure
+    - delay: still not departed TRIP_DELAY_THRESHOLD_MINUTES after it
+    - arrival: inside the destination fence after having been outside it
+
+    Transitions are queued per trip, merged, and written every
+    TRIP_STATUS_FLUSH_INTERVAL seconds. Each write only applies if the row is
+    still in a status the transition may come from, so duplicates from other
+    workers and manual changes are never overridden by older information.
+    """
+
+    def __init__(self):
+        self._trips = TTLCache(maxsize=10000, ttl=settings.LIVE_POSITION_MAX_AGE)
+        self._loading: Set[str] = set()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_from: Dict[str, TripStatus] = {}  # status before the pending transitions
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.transitions = 0
+        self.writes = 0
+        self.failed_writes = 0
+
+    def _ensure_flushing(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._loop is not loop or self._flusher.done():
+            self._loop = loop
+            self._flusher = loop.create_task(self._flush_loop())
+
+    async def start(self) -> None:
+        """Start the status writer (also started lazily on the first transition)"""
+        self._ensure_flushing()
+
+    async def stop(self) -> None:
+        """Write pending transitions and stop the writer"""
+        if self._flusher is not None and self._loop is asyncio.get_running_loop():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+            await self.flush()
+
+    async def load_trip(self, trip_id: str, route_id: Optional[str]) -> TripFenceState:
+        """Read a trip's status, scheduled departure and route once"""
+        result = await run_query(
+            get_supabase_client().table("trips")
+            .select("status,scheduled_departure,service_date,schedules(route_id,departure_time)")
+            .eq("id", trip_id)
+        )
+        if not result.data:
+            state = TripFenceState(TripStatus.CANCELLED, None, None)  # unknown trip: nothing to track
+        else:
+            trip = result.data[0]
+            schedule = trip.get("schedules") or {}
+            route_id = route_id or schedule.get("route_id")
+            path = await eta_engine.load_path(route_id) if route_id else None
+            state = TripFenceState(TripStatus(trip["status"]), path, self._scheduled_departure(trip, schedule))
+        self._trips.set(trip_id, state)
+        return state
+
+    @staticmethod
+    def _scheduled_departure(trip: Dict[str, Any], schedule: Dict[str, Any]) -> Optional[float]:
+        if trip.get("scheduled_departure"):
+            return datetime.fromisoformat(trip["scheduled_departure"]).timestamp()
+        if trip.get("service_date") and schedule.get("departure_time"):
+            minute = minute_of_day(schedule["departure_time"])
+            departure, _ = service_times(date.fromisoformat(trip["service_date"]), minute, minute,
+                                         ZoneInfo(settings.SERVICE_TIMEZONE))
+            return departure.timestamp()
+        return None
+
+    def _schedule_load(self, position: LivePosition) -> None:
+        trip_id = position.trip_id
+        if trip_id in self._loading:
+            return
+        self._loading.add(trip_id)
+
+        async def load():
+            try:
+                state = await self.load_trip(trip_id, position.route_id)
+                self.evaluate(position, state)
+            except Exception as e:
+                print(f"Warning: Failed to load trip {trip_id} for status tracking: {e}")
+            finally:
+                self._loading.discard(trip_id)
+
+        asyncio.get_running_loop().create_task(load())
+
+    def on_positions(self, positions: List[LivePosition]) -> None:
+        """Live position listener: evaluate the fences of the trips that moved"""
+        for position in positions:
+            state = self._trips.get(position.trip_id)
+            if state is None:
+                self._schedule_load(position)
+                continue
+            self.evaluate(position, state)
+            self._trips.set(position.trip_id, state)  # keep active trips cached
+
+    def evaluate(self, position: LivePosition, state: TripFenceState) -> Optional[TripStatus]:
+        """Apply one ping to a trip's state; returns the new status when it changed"""
+        if state.path is None or state.status in FINAL_STATUSES or position.timestamp <= state.timestamp:
+            return None
+        state.timestamp = now = position.timestamp
+        at_origin = state.origin.contains(position.latitude, position.longitude)
+        at_destination = state.destination.contains(position.latitude, position.longitude)
+        scheduled = state.scheduled_departure
+
+        if state.status in (TripStatus.SCHEDULED, TripStatus.DELAYED):
+            if at_origin:
+                state.seen_at_origin = True
+            elif scheduled is None or now >= scheduled - settings.TRIP_EARLY_DEPARTURE_MINUTES * 60:
+                if state.seen_at_origin or self._along_route(position, state):
+                    state.left_destination = not at_destination
+                    return self._transition(position, state, TripStatus.IN_PROGRESS, "actual_departure_time")
+            if (state.status == TripStatus.SCHEDULED and scheduled is not None
+                    and now > scheduled + settings.TRIP_DELAY_THRESHOLD_MINUTES * 60):
+                return self._transition(position, state, TripStatus.DELAYED)
+        elif state.status == TripStatus.IN_PROGRESS:
+            if not at_destination:
+                state.left_destination = True
+            elif state.left_destination:
+                return self._transition(position, state, TripStatus.COMPLETED, "actual_arrival_time")
+        return None
+
+    @staticmethod
+    def _along_route(position: LivePosition, state: TripFenceState) -> bool:
+        """Past the origin fence and on the route, i.e. left the first stop before its first ping (not driving to it)"""
+        _, along_km, off_km = state.path.project(position.latitude, position.longitude)
+        return along_km > state.origin.radius_km and off_km <= settings.ETA_OFF_ROUTE_KM
+
+    def _transition(self, position: LivePosition, state: TripFenceState, status: TripStatus,
+                    time_column: Optional[str] = None) -> TripStatus:
+        self._pending_from.setdefault(position.trip_id, state.status)
+        state.status = status
+        patch = self._pending.setdefault(position.trip_id, {})
+        patch["status"] = status.value
+        if time_column:
+            patch[time_column] = datetime.fromtimestamp(position.timestamp, timezone.utc).isoformat()
+        self.transitions += 1
+        self._ensure_flushing()
+        return status
+
+    async def flush(self) -> None:
+        """Write the latest merged transition of every trip that changed"""
+        pending, self._pending = self._pending, {}
+        pending_from, self._pending_from = self._pending_from, {}
+        supabase = get_supabase_client()
+        for trip_id, patch in pending.items():
+            allowed = [status.value for status in TRANSITION_FROM[TripStatus(patch["status"])]]
+            try:
+                result = await run_query(returning(
+                    supabase.table("trips")
+                    .update({**patch, "updated_at": datetime.now(timezone.utc).isoformat()})
+                    .eq("id", trip_id)
+                    .in_("status", allowed),
+                    "id"
+                ))
+                self.writes += 1
+                previous = pending_from.get(trip_id)
+                state = self._trips.get(trip_id)
+                route_id = state.path.route_id if state is not None and state.path is not None else None
+                if route_id:
+                    route_details_cache.bump(route_id)  # its current trips changed
+                if result.data and previous is not None:
+                    fleet_stats.trip_status_changed(previous.value, patch["status"], route_id)
+            except Exception as e:
+                self.failed_writes += 1
+                # Retry with the next flush; a newer transition of the same trip wins field by field
+                self._pending[trip_id] = {**patch, **self._pending.get(trip_id, {})}
+                if trip_id in pending_from:
+                    self._pending_from[trip_id] = pending_from[trip_id]
+                print(f"Warning: Failed to write status of trip {trip_id}: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TRIP_STATUS_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Warning: Trip status flush failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "trips": len(self._trips),
+            "pending": len(self._pending),
+            "transitions": self.transitions,
+            "writes": self.writes,
+            "failed_writes": self.failed_writes,
+        }
+
+# Process-wide tracker, fed by every live position change
+trip_status_tracker = TripStatusTracker()
+live_position_store.add_listener(trip_status_tracker.on_positions)
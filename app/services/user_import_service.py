@@ -0,0 +1,221 @@
+import asyncio
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from fastapi import Depends
+from pydantic import ValidationError
+from app.config.database import run_query
+from app.config.settings import settings
+from app.core.loader import Loaders, get_loaders
+from app.models.user import UserCreate
+from app.schemas.admin import ImportFormat, UserImportProgress, UserImportRowError
+from app.services.fleet_stats_service import fleet_stats
+from app.services.user_service import UserService
+from app.utils.helpers import returning
+
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]  # (row number, fields, parse error)
+Line = Tuple[str, bool]  # (text, whether it was valid UTF-8)
+INVALID_ENCODING = "Row is not valid UTF-8; save the file as UTF-8 and retry this row"
+
+async def _iter_lines(body: AsyncIterator[bytes]) -> AsyncIterator[Line]:
+    """Split a streamed request body into decoded lines without buffering it whole.
+
+    Lines are decoded one by one, so a line that is not UTF-8 (e.g. a cp1252
+    export) only fails its own row; it is yielded with replacement characters
+    and flagged invalid.
+    """
+    buffer = b""
+    first = True
+
+    def decode(raw: bytes) -> Line:
+        nonlocal first
+        if first and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        first = False
+        raw = raw.rstrip(b"\r")
+        try:
+            return raw.decode("utf-8"), True
+        except UnicodeDecodeError:
+            return raw.decode("utf-8", errors="replace"), False
+
+    async for chunk in body:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield decode(line)
+    if buffer:
+        yield decode(buffer)
+
+async def _iter_csv_rows(lines: AsyncIterator[Line]) -> AsyncIterator[ParsedRow]:
+    """Parse CSV lines (first line is the header) into dicts"""
+    header: Optional[List[str]] = None
+    pending = ""
+    valid = True
+    row_no = 0
+    async for line, line_valid in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        valid = valid and line_valid
+        if pending.count('"') % 2:
+            continue  # a quoted field continues on the next line
+        if not pending.strip():
+            pending, valid = "", True
+            continue
+        record, error = None, None
+        if not valid:
+            error = INVALID_ENCODING
+        else:
+            try:
+                record = next(csv.reader([pending]))
+            except csv.Error as e:
+                error = f"Invalid CSV: {e}"
+        pending, valid = "", True
+        if header is None:
+            if error:
+                raise ValueError(f"Unreadable CSV header: {'the file is not UTF-8' if error == INVALID_ENCODING else error}")
+            header = [column.strip() for column in record]
+            continue
+        row_no += 1
+        if record is not None and len(record) != len(header):
+            record, error = None, f"Row has {len(record)} columns, the header has {len(header)}"
+        yield row_no, dict(zip(header, record)) if record is not None else None, error
+    if pending:
+        yield row_no + 1, None, "Unterminated quoted field at the end of the file"
+
+async def _iter_jsonl_rows(lines: AsyncIterator[Line]) -> AsyncIterator[ParsedRow]:
+    """Parse JSON Lines into dicts"""
+    row_no = 0
+    async for line, valid in lines:
+        if not line.strip():
+            continue
+        row_no += 1
+        if not valid:
+            yield row_no, None, INVALID_ENCODING
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if isinstance(row, dict):
+            yield row_no, row, None
+        else:
+            yield row_no, None, "Each line must be a JSON object"
+
+class UserImportService:
+    """Bulk user import: streamed parsing, concurrent Auth0 creation and chunked Supabase inserts"""
+
+    def __init__(self, loaders: Loaders = Depends(get_loaders)):
+        self.user_service = UserService(loaders)
+        self.supabase = self.user_service.supabase
+
+    async def import_users(
+        self,
+        body: AsyncIterator[bytes],
+        import_format: ImportFormat,
+        admin_id: str
+    ) -> AsyncIterator[Union[UserImportRowError, UserImportProgress]]:
+        """Import users from a streamed upload, yielding row errors, per-chunk progress and a final summary"""
+        lines = _iter_lines(body)
+        rows = _iter_csv_rows(lines) if import_format == ImportFormat.CSV else _iter_jsonl_rows(lines)
+        progress = UserImportProgress()
+        chunk: List[Tuple[int, UserCreate]] = []
+
+        try:
+            async for row_no, fields, parse_error in rows:
+                progress.processed += 1
+                user, errors = self._validate_row(fields, parse_error)
+                if errors:
+                    progress.failed += 1
+                    yield UserImportRowError(
+                        row=row_no,
+                        email=(fields or {}).get("email"),
+                        stage="validation",
+                        errors=errors
+                    )
+                    continue
+
+                chunk.append((row_no, user))
+                if len(chunk) >= settings.BULK_IMPORT_CHUNK_SIZE:
+                    for error in await self._import_chunk(chunk, admin_id, progress):
+                        yield error
+                    chunk = []
+                    yield progress.model_copy()
+        except Exception as e:
+            # Rows already validated are still imported; the summary says why the rest was not read
+            progress.error = str(e)
+
+        if chunk:
+            for error in await self._import_chunk(chunk, admin_id, progress):
+                yield error
+
+        UserService._invalidate_user_caches()
+        yield progress.model_copy(update={"type": "summary"})
+
+    @staticmethod
+    def _validate_row(fields: Optional[Dict[str, Any]], parse_error: Optional[str]) -> Tuple[Optional[UserCreate], List[str]]:
+        """Validate one parsed row with UserCreate; empty cells fall back to model defaults"""
+        if parse_error:
+            return None, [parse_error]
+        try:
+            values = {key.strip(): value for key, value in fields.items() if key and value not in ("", None)}
+            return UserCreate(**values), []
+        except ValidationError as e:
+            return None, [f"{error['loc'][-1]}: {error['msg']}" for error in e.errors()]
+
+    async def _import_chunk(
+        self,
+        chunk: List[Tuple[int, UserCreate]],
+        admin_id: str,
+        progress: UserImportProgress
+    ) -> List[UserImportRowError]:
+        """Create a chunk of users in Auth0 (bounded concurrency), then insert them in one request"""
+        errors: List[UserImportRowError] = []
+        semaphore = asyncio.Semaphore(settings.BULK_IMPORT_AUTH0_CONCURRENCY)
+
+        async def create_auth0_user(user: UserCreate) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+            async with semaphore:
+                try:
+                    return await self.user_service._create_auth0_user(user), None
+                except Exception as e:
+                    return None, str(e)
+
+        auth0_results = await asyncio.gather(*(create_auth0_user(user) for _, user in chunk))
+
+        # Like create_user, a failed Auth0 creation still saves the local user
+        records = []
+        for (row_no, user), (auth0_user, auth0_error) in zip(chunk, auth0_results):
+            if auth0_error:
+                progress.auth0_failed += 1
+                errors.append(UserImportRowError(row=row_no, email=user.email, stage="auth0", errors=[auth0_error]))
+            auth0_id = auth0_user["user_id"] if auth0_user else None
+            records.append(self.user_service._build_user_record(user, auth0_id, admin_id))
+
+        try:
+            result = await run_query(returning(self.supabase.table("users").insert(records), "id"))
+            progress.created += len(result.data)
+            for record in records:
+                fleet_stats.user_added(record["role"], record["status"])
+        except Exception:
+            # One bad row (e.g. duplicate email) fails the batch; retry row by row to isolate it
+            for (row_no, user), record in zip(chunk, records):
+                try:
+                    await run_query(returning(self.supabase.table("users").insert(record), "id"))
+                    progress.created += 1
+                    fleet_stats.user_added(record["role"], record["status"])
+                except Exception as e:
+                    progress.failed += 1
+                    row_errors = [str(e)]
+                    if record["auth0_id"]:
+                        row_errors.append(await self._discard_auth0_user(record["auth0_id"]))
+                    errors.append(UserImportRowError(row=row_no, email=user.email, stage="database", errors=row_errors))
+
+        return errors
+
+    async def _discard_auth0_user(self, auth0_id: str) -> str:
+        """Delete the Auth0 account of a row that could not be saved; the message names it if that fails too"""
+        try:
+            await self.user_service._delete_auth0_user(auth0_id)
+            return f"Auth0 user {auth0_id} was deleted again"
+        except Exception as e:
+            return f"Auth0 user {auth0_id} was created but could not be deleted, remove it manually: {e}"
@@ -1,22 +1,42 @@
 from typing import List, Optional, Dict, Any
-from app.config.database import get_supabase_client
-from app.models.user import UserCreate, UserUpdate, UserResponse, UserListResponse, UserFilter, UserRole, UserStatus
+from fastapi import Depends
+from app.config.database import get_supabase_client, run_query
+from app.models.user import UserCreate, UserUpdate, UserResponse, UserListItem, UserListResponse, UserFilter, UserRole, UserStatus, CountMode, USER_RESPONSE_COLUMNS
 from app.schemas.common import APIResponse
-from app.core.auth import get_auth0_user
+from app.core.auth import get_auth0_user, invalidate_principal
 from app.config.settings import settings
-import requests
+from app.config.http_client import get_http_client
+from app.services.auth0_token_service import auth0_token_service
+from app.core.cache import TTLCache
+from app.core.loader import Loaders, get_loaders
+from app.services.dashboard_service import dashboard_user_cache
+from app.services.fleet_stats_service import fleet_stats
+from app.utils.helpers import or_filter, order_by, offset, quote_value, encode_cursor, decode_cursor, clean_search_term, returning
 import json
+import httpx
 from datetime import datetime
 import secrets
 import hashlib
 
+# Short-lived cache for admin search / type-ahead results, cleared on any user change
+user_search_cache = TTLCache(maxsize=settings.USER_SEARCH_CACHE_SIZE, ttl=settings.USER_SEARCH_CACHE_TTL)
+
+# Columns loaded to show who created a user
+CREATOR_COLUMNS = "id,name"
+
 class UserService:
-    def __init__(self):
+    def __init__(self, loaders: Loaders = Depends(get_loaders)):
         self.supabase = get_supabase_client()
+        self.loaders = loaders
         self.auth0_domain = "dev-f8dpug1be6jfleua.us.auth0.com"
         self.auth0_client_id = "HXAaWuTHXusGxNL2rgvJvmEdiYPxUWEm"
         self.auth0_client_secret = settings.AUTH0_CLIENT_SECRET  # Use settings instead of hardcoded value
 
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared async HTTP client (resolved lazily, needs a running event loop)"""
+        return get_http_client()
+
     async def create_user(self, user_data: UserCreate, admin_id: str) -> APIResponse:
         """Create a new user (admin only)"""
         try:
@@ -35,6 +55,10 @@ class UserService:
             auth0_id = auth0_user["user_id"] if auth0_user else None
             supabase_user = await self._save_user_to_supabase(user_data, auth0_id, admin_id)
             
+            self._invalidate_user_caches()
+            if supabase_user:
+                fleet_stats.user_added(supabase_user["role"], supabase_user["status"])
+            
             if not supabase_user:
                 return APIResponse(
                     success=False,
@@ -62,46 +86,47 @@ class UserService:
     async def get_users(self, filters: UserFilter) -> APIResponse:
         """Get users with filtering and pagination (admin only)"""
         try:
-            query = self.supabase.table("users").select("*")
-            
-            # Apply filters
-            if filters.role:
-                query = query.eq("role", filters.role.value)
-            if filters.status:
-                query = query.eq("status", filters.status.value)
-            if filters.search:
-                query = query.or_(f"name.ilike.%{filters.search}%,email.ilike.%{filters.search}%")
-            
-            # Apply pagination
-            start = (filters.page - 1) * filters.per_page
-            end = start + filters.per_page - 1
-            query = query.range(start, end)
-            
-            # Get total count
-            count_query = self.supabase.table("users").select("id", count="exact")
-            if filters.role:
-                count_query = count_query.eq("role", filters.role.value)
-            if filters.status:
-                count_query = count_query.eq("status", filters.status.value)
-            if filters.search:
-                count_query = count_query.or_(f"name.ilike.%{filters.search}%,email.ilike.%{filters.search}%")
-            
-            count_result = count_query.execute()
-            total = count_result.count if hasattr(count_result, 'count') else 0
-            
-            # Get users
-            result = query.execute()
-            users = [UserResponse(**user) for user in result.data]
+            search = clean_search_term(filters.search) if filters.search else None
+            
+            # Admin type-ahead repeats the same searches; serve them from memory
+            cache_key = None
+            if search:
+                cache_key = (search.lower(), filters.role, filters.status, filters.page,
+                             filters.per_page, filters.cursor, filters.count)
+                cached = user_search_cache.get(cache_key)
+                if cached is not None:
+                    return APIResponse(
+                        success=True,
+                        message="Users retrieved successfully",
+                        data=cached
+                    )
+            
+            if search and "@" not in search:
+                if filters.cursor:
+                    # Ranked results have no (created_at, id) order to resume from
+                    return APIResponse(
+                        success=False,
+                        message="Cursor pagination is not supported for name search",
+                        errors=["Page through name search results with page instead of cursor"]
+                    )
+                user_list = await self._search_users_by_name(search, filters)
+            else:
+                user_list = await self._list_users(filters, email_term=search)
+            
+            if user_list is None:
+                return APIResponse(
+                    success=False,
+                    message="Invalid cursor",
+                    errors=["Pass a next_cursor returned by a previous page"]
+                )
+            
+            if cache_key:
+                user_search_cache.set(cache_key, user_list)
             
             return APIResponse(
                 success=True,
                 message="Users retrieved successfully",
-                data=UserListResponse(
-                    users=users,
-                    total=total,
-                    page=filters.page,
-                    per_page=filters.per_page
-                )
+                data=user_list
             )
         except Exception as e:
             return APIResponse(
@@ -110,10 +135,88 @@ class UserService:
                 errors=[str(e)]
             )
 
+    async def _list_users(self, filters: UserFilter, email_term: Optional[str] = None) -> Optional[UserListResponse]:
+        """List users with offset or keyset pagination; None if the cursor is invalid"""
+        keyset = None
+        if filters.cursor:
+            keyset = decode_cursor(filters.cursor)
+            if keyset is None:
+                return None
+        
+        # Count and page come back from a single request (Content-Range header).
+        # Cursor pages skip counting; the total is known from the first page.
+        count = None if keyset or filters.count == CountMode.NONE else filters.count.value
+        query = self.supabase.table("users").select(USER_RESPONSE_COLUMNS, count=count)
+        
+        # Apply filters
+        if filters.role:
+            query = query.eq("role", filters.role.value)
+        if filters.status:
+            query = query.eq("status", filters.status.value)
+        if email_term:
+            # Substring match, served by the users_email_trgm_idx index
+            query = query.ilike("email", f"*{email_term}*")
+        
+        # Stable order on (created_at, id), newest first
+        query = order_by(query, "created_at.desc", "id.desc")
+        if keyset:
+            created_at, last_id = quote_value(keyset[0].isoformat()), quote_value(str(keyset[1]))
+            query = or_filter(query, f"created_at.lt.{created_at}", f"and(created_at.eq.{created_at},id.lt.{last_id})")
+        else:
+            query = offset(query, (filters.page - 1) * filters.per_page)
+        
+        # Fetch one extra row to know whether another page exists
+        result = await run_query(query.limit(filters.per_page + 1))
+        rows = result.data[:filters.per_page]
+        
+        next_cursor = None
+        if len(result.data) > filters.per_page:
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        
+        return UserListResponse(
+            users=await self._with_creator_names(rows),
+            total=result.count,
+            page=filters.page,
+            per_page=filters.per_page,
+            next_cursor=next_cursor
+        )
+
+    async def _search_users_by_name(self, search: str, filters: UserFilter) -> UserListResponse:
+        """Ranked trigram search on name, plus email substring matches, through the search_users RPC.
+
+        Paged by page only: the ranking has no keyset to resume from, so there
+        is no next_cursor, and no total is counted.
+        """
+        query = self.supabase.rpc("search_users", {
+            "search_term": search,
+            "role_filter": filters.role.value if filters.role else None,
+            "status_filter": filters.status.value if filters.status else None,
+            "result_limit": filters.per_page,
+            "result_offset": (filters.page - 1) * filters.per_page
+        })
+        result = await run_query(returning(query, USER_RESPONSE_COLUMNS))
+        
+        return UserListResponse(
+            users=await self._with_creator_names(result.data or []),
+            page=filters.page,
+            per_page=filters.per_page
+        )
+
+    async def _with_creator_names(self, rows: List[Dict[str, Any]]) -> List[UserListItem]:
+        """Resolve created_by to names; creators not on the page are loaded in one batch"""
+        creators = self.loaders.get("users", CREATOR_COLUMNS)
+        for row in rows:
+            creators.prime(row["id"], {"id": row["id"], "name": row["name"]})
+        names = await creators.load_many(row.get("created_by") for row in rows)
+        return [
+            UserListItem(**row, created_by_name=creator["name"] if creator else None)
+            for row, creator in zip(rows, names)
+        ]
+
     async def get_user(self, user_id: str) -> APIResponse:
         """Get a specific user by ID (admin only)"""
         try:
-            result = self.supabase.table("users").select("*").eq("id", user_id).execute()
+            result = await run_query(self.supabase.table("users").select(USER_RESPONSE_COLUMNS).eq("id", user_id))
             
             if not result.data:
                 return APIResponse(
@@ -138,34 +241,28 @@ class UserService:
     async def update_user(self, user_id: str, user_data: UserUpdate) -> APIResponse:
         """Update a user (admin only)"""
         try:
-            # Check if user exists
-            existing_user = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            if not existing_user.data:
-                return APIResponse(
-                    success=False,
-                    message="User not found",
-                    errors=["User with this ID does not exist"]
-                )
-            
-            # Update in Supabase
+            # Update in Supabase; no rows back means no such user
             update_data = user_data.dict(exclude_unset=True)
             update_data["updated_at"] = datetime.utcnow().isoformat()
             
-            result = self.supabase.table("users").update(update_data).eq("id", user_id).execute()
+            result = await run_query(returning(self.supabase.table("users").update(update_data).eq("id", user_id), USER_RESPONSE_COLUMNS))
             
-            if result.data:
-                updated_user = UserResponse(**result.data[0])
-                return APIResponse(
-                    success=True,
-                    message="User updated successfully",
-                    data=updated_user
-                )
-            else:
+            if not result.data:
                 return APIResponse(
                     success=False,
-                    message="Failed to update user",
-                    errors=["Database update failed"]
+                    message="User not found",
+                    errors=["User with this ID does not exist"]
                 )
+            
+            self._invalidate_user_caches(user_id)
+            fleet_stats.mark_stale(*(f"users_by_{column}" for column in ("role", "status") if column in update_data))
+            
+            updated_user = UserResponse(**result.data[0])
+            return APIResponse(
+                success=True,
+                message="User updated successfully",
+                data=updated_user
+            )
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -176,32 +273,27 @@ class UserService:
     async def delete_user(self, user_id: str) -> APIResponse:
         """Delete a user (admin only)"""
         try:
-            # Check if user exists
-            existing_user = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            if not existing_user.data:
+            # Soft delete by setting status to inactive; no rows back means no such user
+            query = self.supabase.table("users").update({
+                "status": UserStatus.INACTIVE.value,
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", user_id)
+            result = await run_query(returning(query, "id"))
+            
+            if not result.data:
                 return APIResponse(
                     success=False,
                     message="User not found",
                     errors=["User with this ID does not exist"]
                 )
             
-            # Soft delete by setting status to inactive
-            result = self.supabase.table("users").update({
-                "status": UserStatus.INACTIVE.value,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", user_id).execute()
+            self._invalidate_user_caches(user_id)
+            fleet_stats.mark_stale("users_by_status")
             
-            if result.data:
-                return APIResponse(
-                    success=True,
-                    message="User deleted successfully"
-                )
-            else:
-                return APIResponse(
-                    success=False,
-                    message="Failed to delete user",
-                    errors=["Database update failed"]
-                )
+            return APIResponse(
+                success=True,
+                message="User deleted successfully"
+            )
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -212,34 +304,29 @@ class UserService:
     async def assign_role(self, user_id: str, role: UserRole) -> APIResponse:
         """Assign a role to a user (admin only)"""
         try:
-            # Check if user exists
-            existing_user = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            if not existing_user.data:
+            # Update role; no rows back means no such user
+            query = self.supabase.table("users").update({
+                "role": role.value,
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", user_id)
+            result = await run_query(returning(query, USER_RESPONSE_COLUMNS))
+            
+            if not result.data:
                 return APIResponse(
                     success=False,
                     message="User not found",
                     errors=["User with this ID does not exist"]
                 )
             
-            # Update role
-            result = self.supabase.table("users").update({
-                "role": role.value,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", user_id).execute()
+            self._invalidate_user_caches(user_id)
+            fleet_stats.mark_stale("users_by_role")
             
-            if result.data:
-                updated_user = UserResponse(**result.data[0])
-                return APIResponse(
-                    success=True,
-                    message=f"Role {role.value} assigned successfully",
-                    data=updated_user
-                )
-            else:
-                return APIResponse(
-                    success=False,
-                    message="Failed to assign role",
-                    errors=["Database update failed"]
-                )
+            updated_user = UserResponse(**result.data[0])
+            return APIResponse(
+                success=True,
+                message=f"Role {role.value} assigned successfully",
+                data=updated_user
+            )
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -251,7 +338,7 @@ class UserService:
     async def get_my_profile(self, user_id: str) -> APIResponse:
         """Get current user's profile"""
         try:
-            result = self.supabase.table("users").select("*").eq("id", user_id).execute()
+            result = await run_query(self.supabase.table("users").select(USER_RESPONSE_COLUMNS).eq("id", user_id))
             
             if not result.data:
                 return APIResponse(
@@ -278,15 +365,6 @@ class UserService:
     async def update_my_profile(self, user_id: str, user_data: UserUpdate) -> APIResponse:
         """Update current user's profile"""
         try:
-            # Check if user exists
-            existing_user = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            if not existing_user.data:
-                return APIResponse(
-                    success=False,
-                    message="User not found",
-                    errors=["User with this ID does not exist"]
-                )
-            
             # Prepare update data (only allow certain fields to be updated by user)
             update_data = {
                 "updated_at": datetime.utcnow().isoformat()
@@ -299,22 +377,24 @@ class UserService:
             if user_data.location is not None:
                 update_data["location"] = user_data.location
             
-            # Update user in Supabase
-            result = self.supabase.table("users").update(update_data).eq("id", user_id).execute()
+            # Update user in Supabase; no rows back means no such user
+            result = await run_query(returning(self.supabase.table("users").update(update_data).eq("id", user_id), USER_RESPONSE_COLUMNS))
             
-            if result.data:
-                updated_user = UserResponse(**result.data[0])
-                return APIResponse(
-                    success=True,
-                    message="Profile updated successfully",
-                    data=updated_user
-                )
-            else:
+            if not result.data:
                 return APIResponse(
                     success=False,
-                    message="Failed to update profile",
-                    errors=["Database update failed"]
+                    message="User not found",
+                    errors=["User with this ID does not exist"]
                 )
+            
+            self._invalidate_user_caches(user_id)
+            
+            updated_user = UserResponse(**result.data[0])
+            return APIResponse(
+                success=True,
+                message="Profile updated successfully",
+                data=updated_user
+            )
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -325,41 +405,34 @@ class UserService:
     async def delete_my_account(self, user_id: str) -> APIResponse:
         """Delete current user's account"""
         try:
-            # Check if user exists
-            existing_user = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            if not existing_user.data:
+            # Delete from Supabase, returning the Auth0 ID in the same round-trip
+            query = self.supabase.table("users").delete().eq("id", user_id)
+            result = await run_query(returning(query, "id", "auth0_id", "role", "status"))
+            
+            if not result.data:
                 return APIResponse(
                     success=False,
                     message="User not found",
                     errors=["User with this ID does not exist"]
                 )
             
-            # Get Auth0 user ID
-            auth0_id = existing_user.data[0].get("auth0_id")
+            self._invalidate_user_caches(user_id)
+            fleet_stats.user_removed(result.data[0]["role"], result.data[0]["status"])
             
             # Delete from Auth0 if auth0_id exists
+            auth0_id = result.data[0].get("auth0_id")
             if auth0_id:
                 try:
                     await self._delete_auth0_user(auth0_id)
                 except Exception as e:
-                    # Log error but continue with Supabase deletion
+                    # Log error; the Supabase account is already gone
                     print(f"Failed to delete Auth0 user: {e}")
             
-            # Delete from Supabase
-            result = self.supabase.table("users").delete().eq("id", user_id).execute()
-            
-            if result.data:
-                return APIResponse(
-                    success=True,
-                    message="Account deleted successfully",
-                    data={"deleted_user_id": user_id}
-                )
-            else:
-                return APIResponse(
-                    success=False,
-                    message="Failed to delete account",
-                    errors=["Database deletion failed"]
-                )
+            return APIResponse(
+                success=True,
+                message="Account deleted successfully",
+                data={"deleted_user_id": user_id}
+            )
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -367,12 +440,11 @@ class UserService:
                 errors=[str(e)]
             )
 
-    # Password management operations
     async def change_password(self, user_id: str, old_password: str, new_password: str) -> APIResponse:
         """Change password (requires old password)"""
         try:
             # Get user from Supabase
-            result = self.supabase.table("users").select("*").eq("id", user_id).execute()
+            result = await run_query(self.supabase.table("users").select("id,auth0_id,email").eq("id", user_id))
             if not result.data:
                 return APIResponse(
                     success=False,
@@ -435,7 +507,7 @@ class UserService:
             # Don't use API_AUDIENCE for password verification as it's set to Management API
             # The password realm doesn't need an audience parameter
             
-            response = requests.post(auth_url, json=auth_payload)
+            response = await self.http.post(auth_url, json=auth_payload)
             
             print(f"Auth0 verification response status: {response.status_code}")
             print(f"Auth0 verification response: {response.text}")
@@ -470,7 +542,7 @@ class UserService:
             print(f"   Making PATCH request to: https://{self.auth0_domain}/api/v2/users/{auth0_id}")
             print(f"   Payload: {payload}")
             
-            response = requests.patch(
+            response = await self.http.patch(
                 f"https://{self.auth0_domain}/api/v2/users/{auth0_id}",
                 json=payload,
                 headers=headers
@@ -495,7 +567,7 @@ class UserService:
         """Send password reset email"""
         try:
             # Check if user exists
-            result = self.supabase.table("users").select("*").eq("email", email).execute()
+            result = await run_query(self.supabase.table("users").select("id,auth0_id").eq("email", email))
             if not result.data:
                 # Don't reveal if email exists or not for security
                 return APIResponse(
@@ -581,26 +653,8 @@ class UserService:
         try:
             print(f"🔑 Creating Auth0 user for: {user_data.email}")
             
-            # Get Auth0 management token
-            token_url = f"https://{self.auth0_domain}/oauth/token"
-            token_payload = {
-                "client_id": self.auth0_client_id,
-                "client_secret": self.auth0_client_secret,
-                "audience": f"https://{self.auth0_domain}/api/v2/",
-                "grant_type": "client_credentials"
-            }
-            
-            print(f"   Getting management token...")
-            token_response = requests.post(token_url, json=token_payload)
-            
-            print(f"   Token response status: {token_response.status_code}")
-            if token_response.status_code != 200:
-                error_data = token_response.json() if token_response.content else {}
-                print(f"   ❌ Token error: {error_data}")
-                raise Exception(f"Failed to get management token: {token_response.status_code} - {error_data}")
-            
-            access_token = token_response.json()["access_token"]
-            print(f"   ✅ Management token obtained")
+            # Get Auth0 management token (cached across requests)
+            access_token = await self._get_auth0_management_token()
             
             # Create Auth0 user
             user_url = f"https://{self.auth0_domain}/api/v2/users"
@@ -615,10 +669,12 @@ class UserService:
             headers = {"Authorization": f"Bearer {access_token}"}
             print(f"   Creating user in Auth0...")
             
-            user_response = requests.post(user_url, json=user_payload, headers=headers)
+            user_response = await self.http.post(user_url, json=user_payload, headers=headers)
             
             print(f"   User creation response status: {user_response.status_code}")
             if user_response.status_code != 201:
+                if user_response.status_code == 401:
+                    auth0_token_service.invalidate(self.auth0_domain, self.auth0_client_id)
                 error_data = user_response.json() if user_response.content else {}
                 print(f"   ❌ User creation error: {error_data}")
                 raise Exception(f"Failed to create Auth0 user: {user_response.status_code} - {error_data}")
@@ -633,7 +689,14 @@ class UserService:
 
     async def _save_user_to_supabase(self, user_data: UserCreate, auth0_id: str, admin_id: str) -> Dict[str, Any]:
         """Save user to Supabase"""
-        user_dict = {
+        user_dict = self._build_user_record(user_data, auth0_id, admin_id)
+        result = await run_query(returning(self.supabase.table("users").insert(user_dict), USER_RESPONSE_COLUMNS))
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    def _build_user_record(user_data: UserCreate, auth0_id: Optional[str], admin_id: str) -> Dict[str, Any]:
+        """Build the users table row for a new user"""
+        return {
             "auth0_id": auth0_id,
             "email": user_data.email,
             "name": user_data.name,
@@ -646,9 +709,14 @@ class UserService:
             "created_at": datetime.utcnow().isoformat(),
             "updated_at": datetime.utcnow().isoformat()
         }
-        
-        result = self.supabase.table("users").insert(user_dict).execute()
-        return result.data[0] if result.data else None 
+
+    @staticmethod
+    def _invalidate_user_caches(user_id: Optional[str] = None):
+        """Drop cached data derived from the users table after a change"""
+        if user_id:
+            invalidate_principal(user_id)
+            dashboard_user_cache.invalidate(user_id)
+        user_search_cache.clear()
 
     # Helper methods for Auth0 integration
     async def _delete_auth0_user(self, auth0_id: str):
@@ -656,10 +724,12 @@ class UserService:
         token = await self._get_auth0_management_token()
         headers = {"Authorization": f"Bearer {token}"}
         
-        response = requests.delete(
+        response = await self.http.delete(
             f"https://{self.auth0_domain}/api/v2/users/{auth0_id}",
             headers=headers
         )
+        if response.status_code == 401:
+            auth0_token_service.invalidate(self.auth0_domain, self.auth0_client_id)
         response.raise_for_status()
 
     async def _send_auth0_password_reset(self, email: str):
@@ -669,40 +739,11 @@ class UserService:
         pass
 
     async def _get_auth0_management_token(self) -> str:
-        """Get Auth0 management API token"""
+        """Get Auth0 management API token (cached until shortly before expiry)"""
         try:
-            token_url = f"https://{self.auth0_domain}/oauth/token"
-            token_payload = {
-                "client_id": self.auth0_client_id,
-                "client_secret": self.auth0_client_secret,
-                "audience": f"https://{self.auth0_domain}/api/v2/",
-                "grant_type": "client_credentials"
-            }
-            
-            print(f"🔑 Getting Auth0 Management Token")
-            print(f"   Domain: {self.auth0_domain}")
-            print(f"   Client ID: {self.auth0_client_id}")
-            print(f"   Client Secret: {'***' if self.auth0_client_secret else 'NOT SET'}")
-            
-            response = requests.post(token_url, json=token_payload)
-            
-            print(f"   Response Status: {response.status_code}")
-            print(f"   Response: {response.text}")
-            
-            if response.status_code != 200:
-                error_data = response.json() if response.content else {}
-                print(f"   ❌ Management token error: {error_data}")
-                raise Exception(f"Failed to get management token: {response.status_code} - {error_data}")
-            
-            token_data = response.json()
-            access_token = token_data.get("access_token")
-            
-            if not access_token:
-                raise Exception("No access token in response")
-            
-            print(f"   ✅ Management token obtained successfully")
-            return access_token
-            
+            return await auth0_token_service.get_management_token(
+                self.auth0_domain, self.auth0_client_id, self.auth0_client_secret
+            )
         except Exception as e:
             print(f"   ❌ Management token exception: {str(e)}")
-            raise Exception(f"Failed to get Auth0 management token: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to get Auth0 management token: {str(e)}")
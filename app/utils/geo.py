@@ -0,0 +1,229 @@
+# Geospatial helpers
+import heapq
+import math
+from collections import defaultdict
+from typing import Dict, Generic, Hashable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+K = TypeVar("K", bound=Hashable)
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class Geofence:
+    """Circle around a point; containment uses a local flat-earth approximation, exact enough for fences of a few km"""
+    __slots__ = ("latitude", "longitude", "radius_km", "_kx", "_radius_sq")
+
+    def __init__(self, latitude: float, longitude: float, radius_km: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_km = radius_km
+        self._kx = math.cos(math.radians(latitude)) * KM_PER_DEGREE
+        self._radius_sq = radius_km * radius_km
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        dx = (longitude - self.longitude) * self._kx
+        dy = (latitude - self.latitude) * KM_PER_DEGREE
+        return dx * dx + dy * dy <= self._radius_sq
+
+class GridIndex(Generic[K]):
+    """Uniform lat/lon grid over points for k-nearest, radius and bounding-box queries.
+
+    Points are bucketed into square cells of cell_degrees; queries only look at
+    the cells that can contain an answer instead of scanning every point.
+    """
+
+    def __init__(self, cell_degrees: float = 0.01):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Set[K]] = defaultdict(set)
+        self._points: Dict[K, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._points
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def insert(self, key: K, latitude: float, longitude: float) -> None:
+        """Add a point, moving it if the key is already indexed"""
+        self.remove(key)
+        self._points[key] = (latitude, longitude)
+        self._cells[self._cell(latitude, longitude)].add(key)
+
+    def remove(self, key: K) -> None:
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        self._cells[cell].discard(key)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> Iterator[Tuple[int, int]]:
+        """Cells at exactly Chebyshev distance radius from center"""
+        cy, cx = center
+        if radius == 0:
+            yield center
+            return
+        for dx in range(-radius, radius + 1):
+            yield cy - radius, cx + dx
+            yield cy + radius, cx + dx
+        for dy in range(-radius + 1, radius):
+            yield cy + dy, cx - radius
+            yield cy + dy, cx + radius
+
+    def nearest(self, latitude: float, longitude: float, k: int, max_km: Optional[float] = None) -> List[Tuple[float, K]]:
+        """The k closest points as (distance_km, key), nearest first"""
+        if not self._points or k <= 0:
+            return []
+        best: List[Tuple[float, K]] = []  # max-heap of (-distance, key)
+
+        def consider(key: K) -> None:
+            distance = haversine_km(latitude, longitude, *self._points[key])
+            if max_km is not None and distance > max_km:
+                return
+            if len(best) < k:
+                heapq.heappush(best, (-distance, key))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, key))
+
+        center = self._cell(latitude, longitude)
+        seen = 0
+        radius = 0
+        while seen < len(self._points):
+            if 8 * radius > len(self._cells):
+                # Sparse data far away: rings would visit mostly empty cells, scan the rest directly
+                for cell, keys in self._cells.items():
+                    if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) >= radius:
+                        for key in keys:
+                            consider(key)
+                break
+            for cell in self._ring(center, radius):
+                for key in self._cells.get(cell, ()):
+                    seen += 1
+                    consider(key)
+
+            # Anything outside the searched rings is at least `radius` whole cells away
+            cos_lat = math.cos(math.radians(min(89.9, abs(latitude) + (radius + 1) * self.cell_degrees)))
+            bound_km = radius * self.cell_degrees * KM_PER_DEGREE * cos_lat
+            if (len(best) == k and bound_km >= -best[0][0]) or (max_km is not None and bound_km > max_km):
+                break
+            radius += 1
+        return sorted((-negative, key) for negative, key in best)
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[float, K]]:
+        """All points within radius_km as (distance_km, key), nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(min(89.9, abs(latitude) + lat_span))), 1e-6)
+        lon_span = min(180.0, lat_span / cos_lat)
+        candidates = self._keys_in_bbox(latitude - lat_span, longitude - lon_span, latitude + lat_span, longitude + lon_span)
+        hits = []
+        for key in candidates:
+            distance = haversine_km(latitude, longitude, *self._points[key])
+            if distance <= radius_km:
+                hits.append((distance, key))
+        hits.sort()
+        return hits
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[K]:
+        """All points inside a bounding box"""
+        return list(self._keys_in_bbox(min_lat, min_lon, max_lat, max_lon))
+
+    def _keys_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Iterator[K]:
+        (y0, x0), (y1, x1) = self._cell(min_lat, min_lon), self._cell(max_lat, max_lon)
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > len(self._cells):
+            cells = [cell for cell in self._cells if y0 <= cell[0] <= y1 and x0 <= cell[1] <= x1]
+        else:
+            cells = [(y, x) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+        for cell in cells:
+            for key in self._cells.get(cell, ()):
+                lat, lon = self._points[key]
+                if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+                    yield key
+
+def simplify_path(points: List[Tuple[float, float]], tolerance_m: float) -> List[int]:
+    """Douglas-Peucker: indices of the points to keep so no dropped point is further than tolerance_m from the path"""
+    if len(points) < 3:
+        return list(range(len(points)))
+    lat0 = points[0][0]
+    kx = math.cos(math.radians(lat0)) * KM_PER_DEGREE * 1000
+    ky = KM_PER_DEGREE * 1000
+    xy = [((lon - points[0][1]) * kx, (lat - lat0) * ky) for lat, lon in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (ax, ay), (bx, by) = xy[first], xy[last]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        farthest, max_distance = 0, tolerance_m
+        for i in range(first + 1, last):
+            px, py = xy[i]
+            t = 0.0 if length_sq == 0 else min(1.0, max(0.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+            distance = math.hypot(px - ax - t * dx, py - ay - t * dy)
+            if distance > max_distance:
+                farthest, max_distance = i, distance
+        if farthest:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [i for i, kept in enumerate(keep) if kept]
+
+def _encode_number(value: int, out: List[str]) -> None:
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+def encode_polyline(rows: List[Tuple[float, ...]], precision: int = 5) -> str:
+    """Google encoded polyline format, generalized to any number of values per row (delta + varint coded)"""
+    factor = 10 ** precision
+    out: List[str] = []
+    previous = [0] * (len(rows[0]) if rows else 0)
+    for row in rows:
+        for i, value in enumerate(row):
+            scaled = round(value * factor)
+            _encode_number(scaled - previous[i], out)
+            previous[i] = scaled
+    return "".join(out)
+
+def decode_polyline(encoded: str, dimensions: int = 2, precision: int = 5) -> List[Tuple[float, ...]]:
+    """Inverse of encode_polyline"""
+    factor = 10 ** precision
+    values: List[int] = []
+    index = 0
+    while index < len(encoded):
+        shift = result = 0
+        while True:
+            byte = ord(encoded[index]) - 63
+            index += 1
+            result |= (byte & 0x1f) << shift
+            shift += 5
+            if byte < 0x20:
+                break
+        values.append(~(result >> 1) if result & 1 else result >> 1)
+
+    rows = []
+    current = [0] * dimensions
+    for start in range(0, len(values) - dimensions + 1, dimensions):
+        for i in range(dimensions):
+            current[i] += values[start + i]
+        rows.append(tuple(value / factor for value in current))
+    return rows
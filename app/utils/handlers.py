@@ -24,5 +24,6 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "message": exc.detail,
             "errors": [str(exc.detail)],
             "timestamp": "2025-08-02T12:00:00Z"
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
@@ -1 +1,94 @@
 # Helper functions
+import base64
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional, Tuple, Type
+from pydantic import BaseModel
+from postgrest.utils import sanitize_param
+
+def model_columns(model: Type[BaseModel], exclude: Iterable[str] = ()) -> str:
+    """Build a select projection from a model's fields so the two cannot drift apart"""
+    excluded = set(exclude)
+    return ",".join(name for name in model.model_fields if name not in excluded)
+
+# PostgREST query helpers (postgrest-py 0.11 has no or_() and its range() end is exclusive)
+def or_filter(query: Any, *conditions: str) -> Any:
+    """Add a PostgREST or=(...) filter; repeated calls are ANDed together"""
+    query.params = query.params.add("or", f"({','.join(conditions)})")
+    return query
+
+def order_by(query: Any, *columns: str) -> Any:
+    """Order by several columns, e.g. order_by(q, "created_at.desc", "id.desc")"""
+    query.params = query.params.set("order", ",".join(columns))
+    return query
+
+def offset(query: Any, start: int) -> Any:
+    """Skip the first rows of the result"""
+    if start:
+        query.params = query.params.set("offset", start)
+    return query
+
+def returning(query: Any, *columns: str) -> Any:
+    """Limit the columns returned by an insert/update/delete"""
+    query.params = query.params.set("select", ",".join(columns))
+    return query
+
+def quote_value(value: Any) -> str:
+    """Quote a value for use inside a PostgREST logical filter"""
+    return sanitize_param(value)
+
+def clean_search_term(term: str, max_length: int = 100) -> str:
+    """Strip wildcard and quoting characters from user-supplied search text"""
+    return "".join(ch for ch in term if ch not in '*%"\\').strip()[:max_length]
+
+# Keyset pagination cursors
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort-key values of the last row into an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, uuid.UUID]]:
+    """Decode a (timestamp, uuid) cursor produced by encode_cursor; None if it is malformed.
+
+    Cursors come from clients and their values end up in filters, so both are
+    parsed and only their canonical forms are used.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != 2 or not all(isinstance(value, str) for value in values):
+            return None
+        return datetime.fromisoformat(values[0]), uuid.UUID(values[1])
+    except (ValueError, TypeError):
+        return None
+
+# HTTP conditional requests
+def make_etag(data: Any) -> str:
+    """Strong ETag from the JSON content, so every worker derives the same tag for the same data"""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha1(payload.encode()).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the current ETag (weak comparison, as GET requires)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+def http_date(value: datetime) -> str:
+    """Format a timestamp for Last-Modified"""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    """Whether an If-Modified-Since header is at or after last_modified (HTTP dates have whole seconds)"""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
@@ -0,0 +1,22 @@
+import os
+import pytest
+
+# Settings are read from the environment at import time; the tests never reach these services
+# (database tests swap the PostgREST transport for a mock)
+os.environ.setdefault("AUTH0_DOMAIN", "tests.auth0.com")
+os.environ.setdefault("SUPABASE_URL", "https://tests.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "tests.service.role")  # shaped like the JWT the client expects
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="also run the wall-clock benchmarks")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing comparison, only run with --benchmark")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="timing benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
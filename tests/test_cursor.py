@@ -0,0 +1,29 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+import pytest
+from app.utils.helpers import decode_cursor, encode_cursor
+
+USER_ID = "7b0e4f5c-2f3a-4a6e-9c1d-8e2b3f4a5d6c"
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def test_round_trip():
+    created_at = "2025-03-05T10:00:00.123456+00:00"
+    assert decode_cursor(encode_cursor(created_at, USER_ID)) == (
+        datetime(2025, 3, 5, 10, 0, 0, 123456, tzinfo=timezone.utc), uuid.UUID(USER_ID)
+    )
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 json",
+    raw_cursor({"created_at": "2025-03-05T10:00:00+00:00"}),
+    raw_cursor(["2025-03-05T10:00:00+00:00"]),
+    raw_cursor(["2025-03-05T10:00:00+00:00", USER_ID, "extra"]),
+    raw_cursor(["2025-03-05T10:00:00+00:00", 42]),
+    raw_cursor(['2025-03-05",id.gt.0,created_at.eq."x', USER_ID]),
+    raw_cursor(["2025-03-05T10:00:00+00:00", f'{USER_ID}"),or(id.gt.0']),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    assert decode_cursor(cursor) is None
@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+import pytest
+from types import SimpleNamespace
+from app.services import eta_service
+from app.services.eta_service import EtaEngine, RoutePath
+from app.services.live_position_store import LivePosition
+
+FLEET_BUSES = 400
+PING_INTERVAL = 3  # seconds between pings of one bus
+
+def route_stops(route: int, count: int) -> list:
+    # Stops about 1 km apart, running north-east
+    return [
+        {"id": f"r{route}s{i}", "name": f"Stop {i}", "latitude": 33.5 + route * 0.01 + i * 0.009, "longitude": 73.0 + i * 0.002}
+        for i in range(count)
+    ]
+
+def position(trip_id: str, path: RoutePath, progress: float, timestamp: float, speed=None) -> LivePosition:
+    """A position `progress` stops along the path (2.5 is halfway between stops 2 and 3)"""
+    i = min(int(progress), len(path.stop_ids) - 2)
+    fraction = progress - i
+    latitude = path.latitudes[i] + (path.latitudes[i + 1] - path.latitudes[i]) * fraction
+    longitude = path.longitudes[i] + (path.longitudes[i + 1] - path.longitudes[i]) * fraction
+    return LivePosition("ping", f"bus-{trip_id}", trip_id, path.route_id, None, latitude, longitude, speed, None, timestamp)
+
+def test_etas_follow_the_bus():
+    path = RoutePath("r0", route_stops(0, 10), 30)
+    engine = EtaEngine()
+    engine._paths.set("r0", path)
+
+    state = engine.update(position("t1", path, 2.5, 1000.0, speed=30.0), path)
+    assert state.segment == 2
+    assert [stop for stop, _ in state.etas] == list(range(3, 10))
+    arrivals = [arrival for _, arrival in state.etas]
+    assert arrivals == sorted(arrivals) and arrivals[0] > 1000.0
+
+    # Older pings are ignored, newer ones move the bus on
+    assert engine.update(position("t1", path, 6.0, 900.0), path).segment == 2
+    state = engine.update(position("t1", path, 4.2, 1060.0), path)
+    assert state.segment == 4
+    assert state.etas[0][0] == 5
+
+def test_invalidate_stop_drops_routes_through_it(monkeypatch):
+    routes = {
+        f"r{n}": {"id": f"r{n}", "estimated_duration": 30, "route_stops": [
+            {"stop_order": i, "stops": stop} for i, stop in enumerate(route_stops(n, 5))
+        ]}
+        for n in range(2)
+    }
+    routes["r1"]["route_stops"][0]["stops"] = routes["r0"]["route_stops"][4]["stops"]  # shared stop
+    loads = []
+
+    async def run_query(query):
+        loads.append(query.route_id)
+        return SimpleNamespace(data=[routes[query.route_id]])
+
+    class Table:
+        def select(self, columns):
+            return self
+
+        def eq(self, column, value):
+            return SimpleNamespace(route_id=value)
+
+    monkeypatch.setattr(eta_service, "run_query", run_query)
+    monkeypatch.setattr(eta_service, "get_supabase_client", lambda: SimpleNamespace(table=lambda name: Table()))
+    engine = EtaEngine()
+
+    async def load_all():
+        return [await engine.load_path(route_id) for route_id in routes]
+
+    asyncio.run(load_all())
+    asyncio.run(load_all())
+    assert loads == ["r0", "r1"]
+
+    engine.invalidate_stop("r0s4")
+    asyncio.run(load_all())
+    assert loads == ["r0", "r1", "r0", "r1"]
+
+    engine.invalidate_stop("r0s1")
+    asyncio.run(load_all())
+    assert loads[4:] == ["r0"]
+
+def test_etas_follow_recompiled_route(monkeypatch):
+    route = {"id": "r0", "estimated_duration": 30, "route_stops": [
+        {"stop_order": i, "stops": stop} for i, stop in enumerate(route_stops(0, 10))
+    ]}
+
+    async def run_query(query):
+        return SimpleNamespace(data=[route])
+
+    table = SimpleNamespace(select=lambda columns: SimpleNamespace(eq=lambda column, value: None))
+    monkeypatch.setattr(eta_service, "run_query", run_query)
+    monkeypatch.setattr(eta_service, "get_supabase_client", lambda: SimpleNamespace(table=lambda name: table))
+    engine = EtaEngine()
+    path = asyncio.run(engine.load_path("r0"))
+    ping = position("t1", path, 6.5, time.time())
+    monkeypatch.setattr(eta_service, "live_position_store", SimpleNamespace(get_trip=lambda trip_id: ping))
+    engine.update(ping, path)
+
+    # Stops 7-9 are dropped: the old state's stop indices no longer exist on the route
+    route["route_stops"] = route["route_stops"][:7] + route["route_stops"][9:]
+    engine.invalidate_stop("r0s8")
+    etas = asyncio.run(engine.get_trip_etas("t1"))
+    assert [eta.stop_id for eta in etas] == ["r0s9"]
+
+def run_fleet(pings: int) -> tuple:
+    """Feed FLEET_BUSES buses moving along 20 routes through the engine, `pings` rounds of pings"""
+    rng = random.Random(15)
+    paths = [RoutePath(f"r{n}", route_stops(n, 40), 90) for n in range(20)]
+    engine = EtaEngine()
+    for path in paths:
+        engine._paths.set(path.route_id, path)
+
+    progress = [0.0] * FLEET_BUSES
+    timestamp = time.time()
+    for _ in range(pings):
+        timestamp += PING_INTERVAL
+        batch = []
+        for bus in range(FLEET_BUSES):
+            path = paths[bus % len(paths)]
+            progress[bus] = min(progress[bus] + rng.uniform(0.0, 0.05), len(path.stop_ids) - 1.01)
+            batch.append(position(f"t{bus}", path, progress[bus], timestamp, speed=rng.uniform(15, 40)))
+        engine.on_positions(batch)
+    return engine, paths, progress
+
+def test_fleet_updates_match_full_projection():
+    engine, paths, progress = run_fleet(25)
+    assert engine.updates == FLEET_BUSES * 25
+    # The incremental search around the previous segment lands where a full projection does
+    for bus in range(0, FLEET_BUSES, 37):
+        path = paths[bus % len(paths)]
+        last = position(f"t{bus}", path, progress[bus], 0)
+        assert engine._trips.get(f"t{bus}").segment == path.project(last.latitude, last.longitude)[0]
+
+@pytest.mark.benchmark
+def test_benchmark_fleet_updates():
+    pings = 25
+    started = time.perf_counter()
+    run_fleet(pings)
+    rate = FLEET_BUSES * pings / (time.perf_counter() - started)
+    needed = FLEET_BUSES / PING_INTERVAL
+    assert rate > 10 * needed, f"{rate:.0f} ETA updates/s, the fleet needs {needed:.0f}/s"
@@ -0,0 +1,16 @@
+import time
+from app.services import live_feed_hub as hub_module
+from app.services.live_feed_hub import LiveFeedHub
+from app.services.live_position_store import LivePosition
+
+def test_bus_and_route_subscriber_gets_each_position_once(monkeypatch):
+    position = LivePosition("p1", "b1", "t1", "r1", "o1", 33.6, 73.0, 30.0, None, time.time())
+    monkeypatch.setattr(hub_module.live_position_store, "for_route", lambda route_id: [position])
+    monkeypatch.setattr(hub_module.live_position_store, "get_bus", lambda bus_id: position)
+    hub = LiveFeedHub()
+    subscription = hub.subscribe("o1", ["r1"], ["b1"])
+    assert len(subscription._pending) == 1 and subscription.coalesced == 0
+
+    hub.publish([position])
+    assert len(subscription._pending) == 1
+    assert subscription.coalesced == 1  # replaced the initial position, not offered twice
@@ -0,0 +1,49 @@
+import asyncio
+from types import SimpleNamespace
+from fastapi.security import HTTPAuthorizationCredentials
+from app.core import auth
+from app.core.cache import TTLCache
+
+def user_row(n: int) -> dict:
+    return {
+        "id": f"user-{n}", "email": f"user{n}@example.com", "name": f"User {n}",
+        "phone": None, "location": None, "role": "user", "organization_id": None,
+    }
+
+def test_invalidate_after_cache_fills(monkeypatch):
+    size = 8
+    monkeypatch.setattr(auth, "principal_cache", TTLCache(maxsize=size, ttl=60))
+    monkeypatch.setattr(auth, "_principal_subs", TTLCache(maxsize=size, ttl=60))
+    lookups = []
+
+    async def verify(token):
+        return {"sub": token}
+
+    async def run_query(query):
+        lookups.append(query)
+        return SimpleNamespace(data=[user_row(int(query.sub.split("|")[1]))])
+
+    class Table:
+        def select(self, columns):
+            return self
+
+        def eq(self, column, value):
+            return SimpleNamespace(sub=value)
+
+    monkeypatch.setattr(auth, "verify_auth0_token", verify)
+    monkeypatch.setattr(auth, "run_query", run_query)
+    monkeypatch.setattr(auth, "get_supabase_client", lambda: SimpleNamespace(table=lambda name: Table()))
+
+    def login(n: int) -> auth.Auth0User:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=f"auth0|{n}")
+        return asyncio.run(auth.get_auth0_user(credentials))
+
+    login(0)
+    for n in range(1, size * 3):
+        login(n)
+        login(0)  # user 0 stays the most recently used principal
+    assert len(lookups) == size * 3
+
+    auth.invalidate_principal("user-0")
+    login(0)
+    assert len(lookups) == size * 3 + 1
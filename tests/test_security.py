@@ -0,0 +1,94 @@
+import asyncio
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwk, jwt
+from app.config.settings import settings
+from app.core import security
+from app.core.security import JWKSCache
+
+def rsa_key(kid: str):
+    """A private key in PEM and its public JWK"""
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(
+        private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode(),
+        "RS256"
+    ).to_dict()
+    return pem, {**public, "kid": kid}
+
+PEM, PUBLIC = rsa_key("key-1")
+OTHER_PEM, OTHER_PUBLIC = rsa_key("key-2")
+
+def token(pem: str = PEM, kid: str = "key-1", expires_in: int = 3600, issuer: str = None, **claims) -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": "auth0|1",
+            "iss": issuer or f"https://{settings.AUTH0_DOMAIN}/",
+            "iat": now,
+            "exp": now + expires_in,
+            **claims,
+        },
+        pem,
+        algorithm="RS256",
+        headers={"kid": kid}
+    )
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """A JWKS cache loaded with PUBLIC that counts its (mocked) downloads"""
+    cache = JWKSCache()
+    cache.load({"keys": [PUBLIC]})
+    cache.fetches = 0
+
+    async def fetch_jwks():
+        cache.fetches += 1
+        return {"keys": [PUBLIC]}
+
+    monkeypatch.setattr(cache, "fetch_jwks", fetch_jwks)
+    monkeypatch.setattr(security, "jwks_cache", cache)
+    monkeypatch.setattr(settings, "API_AUDIENCE", "")
+    return cache
+
+def verify(value: str, **kwargs):
+    return asyncio.run(security.verify_auth0_token(value, **kwargs))
+
+def test_valid_token_verified_locally(jwks):
+    assert verify(token())["sub"] == "auth0|1"
+    assert verify(token(aud="api"), audience="api")["aud"] == "api"
+    assert jwks.fetches == 0
+
+@pytest.mark.parametrize("value,audience", [
+    (token(expires_in=-60), None),
+    (token(issuer="https://attacker.example.com/"), None),
+    (token(pem=OTHER_PEM), None),  # signed by another key under our kid
+    (token(aud="other"), "api"),
+    (jwt.encode({"sub": "auth0|1"}, "secret", algorithm="HS256", headers={"kid": "key-1"}), None),
+])
+def test_invalid_token_rejected(jwks, value, audience):
+    with pytest.raises(JWTError):
+        verify(value, audience=audience)
+
+def test_unknown_kid_refresh_is_rate_limited(jwks):
+    with pytest.raises(JWTError):
+        verify(token(pem=OTHER_PEM, kid="key-2"))
+    with pytest.raises(JWTError):
+        verify(token(pem=OTHER_PEM, kid="key-2"))
+    # Both came too soon after load() to refresh
+    assert jwks.fetches == 0
+
+    async def rotated():
+        jwks.fetches += 1
+        return {"keys": [PUBLIC, OTHER_PUBLIC]}
+
+    jwks.fetch_jwks = rotated
+    jwks._fetched_at -= settings.JWKS_MIN_REFRESH_INTERVAL
+    assert verify(token(pem=OTHER_PEM, kid="key-2"))["sub"] == "auth0|1"
+    assert verify(token(pem=OTHER_PEM, kid="key-2"))["sub"] == "auth0|1"
+    assert jwks.fetches == 1
@@ -0,0 +1,139 @@
+import random
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from app.config.settings import settings
+from app.services.schedule_service import TimetableIndex, minute_of_day
+
+AFTER = [
+    datetime(2025, 3, 5, 22, 30, 15, tzinfo=timezone.utc),
+    datetime(2025, 3, 9, 0, 0, tzinfo=timezone.utc),
+    datetime(2025, 3, 10, 12, 7, 0, 1, tzinfo=timezone.utc),
+]
+
+def clock(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}:00"
+
+def random_schedule(rng: random.Random, schedule_id: str, routes: list) -> dict:
+    departure = rng.randrange(24 * 60)
+    return {
+        "id": schedule_id,
+        "route_id": rng.choice(routes),
+        "bus_id": f"bus-{rng.randrange(50)}",
+        "departure_time": clock(departure),
+        "arrival_time": clock((departure + rng.randint(10, 120)) % (24 * 60)),
+        "days_of_week": sorted(rng.sample(range(1, 8), rng.randint(1, 7))),
+        "is_active": rng.random() > 0.1,
+    }
+
+def naive_departures(schedules: dict, route_id: str, after: datetime, limit: int) -> list:
+    """The next departures by scanning every schedule, day by day"""
+    local = after.astimezone(ZoneInfo(settings.SERVICE_TIMEZONE))
+    first = local.hour * 60 + local.minute + (1 if local.second or local.microsecond else 0)
+    found = []
+    for days_ahead in range(8):
+        service_date = local.date() + timedelta(days=days_ahead)
+        found += sorted(
+            (service_date, minute_of_day(schedule["departure_time"]), schedule["id"])
+            for schedule in schedules.values()
+            if schedule["route_id"] == route_id and schedule["is_active"]
+            and service_date.isoweekday() in schedule["days_of_week"]
+            and (days_ahead or minute_of_day(schedule["departure_time"]) >= first)
+        )
+        if len(found) >= limit:
+            break
+    return [(service_date, schedule_id) for service_date, _, schedule_id in found[:limit]]
+
+def indexed_departures(index: TimetableIndex, route_id: str, after: datetime, limit: int) -> list:
+    local_tz = ZoneInfo(settings.SERVICE_TIMEZONE)
+    return [
+        (departure.departure.astimezone(local_tz).date(), departure.schedule_id)
+        for departure in index.next_departures(route_id, after, limit)
+    ]
+
+def build(schedules: dict) -> TimetableIndex:
+    index = TimetableIndex()
+    index.build([schedule for schedule in schedules.values() if schedule["is_active"]])
+    return index
+
+def test_incremental_updates_match_naive_scan():
+    rng = random.Random(18)
+    routes = [f"route-{n}" for n in range(100)]
+    schedules = {f"s{n:04d}": random_schedule(rng, f"s{n:04d}", routes) for n in range(2000)}
+    index = build(schedules)
+
+    for n in range(1000):
+        schedule_id = rng.choice(list(schedules))
+        action = rng.random()
+        if action < 0.1:
+            index.remove(schedule_id)
+            del schedules[schedule_id]
+        elif action < 0.2:
+            schedule_id = f"new{n:04d}"
+            schedules[schedule_id] = random_schedule(rng, schedule_id, routes)
+            index.put(schedules[schedule_id])
+        else:
+            # Moves between routes, times and days, and toggles is_active
+            schedules[schedule_id] = random_schedule(rng, schedule_id, routes)
+            index.put(schedules[schedule_id])
+        if n % 100 == 99:
+            for route_id in routes:
+                after = rng.choice(AFTER)
+                assert indexed_departures(index, route_id, after, 5) == naive_departures(schedules, route_id, after, 5)
+
+    rebuilt = build(schedules)
+    assert index.stats()["schedules"] == rebuilt.stats()["schedules"]
+    assert index.stats()["route_days"] == rebuilt.stats()["route_days"]
+    for route_id in routes:
+        for after in AFTER:
+            assert indexed_departures(index, route_id, after, 20) == indexed_departures(rebuilt, route_id, after, 20)
+
+def test_tz_and_overnight(monkeypatch):
+    monkeypatch.setattr(settings, "SERVICE_TIMEZONE", "Asia/Karachi")
+    schedules = {
+        "late": {"id": "late", "route_id": "r", "bus_id": "b", "departure_time": "23:30:00",
+                 "arrival_time": "00:20:00", "days_of_week": [3], "is_active": True},
+    }
+    index = build(schedules)
+    # 18:45 UTC on Wednesday is 23:45 in Karachi: the next run is a week later
+    after = datetime(2025, 3, 5, 18, 45, tzinfo=timezone.utc)
+    [departure] = index.next_departures("r", after, 1)
+    assert indexed_departures(index, "r", after, 1) == naive_departures(schedules, "r", after, 1)
+    assert departure.departure == datetime(2025, 3, 12, 23, 30, tzinfo=ZoneInfo("Asia/Karachi"))
+    assert departure.arrival - departure.departure == timedelta(minutes=50)
+
+def schedules_50k() -> tuple:
+    rng = random.Random(50)
+    routes = [f"route-{n}" for n in range(500)]
+    return routes, {f"s{n:05d}": random_schedule(rng, f"s{n:05d}", routes) for n in range(50000)}
+
+def test_50k_schedules_match_naive_scan():
+    routes, schedules = schedules_50k()
+    index = build(schedules)
+    for route_id in routes[:10]:
+        for after in AFTER:
+            assert indexed_departures(index, route_id, after, 5) == naive_departures(schedules, route_id, after, 5)
+
+@pytest.mark.benchmark
+def test_benchmark_50k_schedules():
+    routes, schedules = schedules_50k()
+
+    started = time.perf_counter()
+    index = build(schedules)
+    build_seconds = time.perf_counter() - started
+
+    queries = 2000
+    started = time.perf_counter()
+    for n in range(queries):
+        index.next_departures(routes[n % len(routes)], AFTER[n % len(AFTER)], 5)
+    indexed = (time.perf_counter() - started) / queries
+
+    scans = 10
+    started = time.perf_counter()
+    for n in range(scans):
+        naive_departures(schedules, routes[n], AFTER[0], 5)
+    naive = (time.perf_counter() - started) / scans
+
+    assert build_seconds < 5, f"build took {build_seconds:.2f}s"
+    assert indexed * 50 < naive, f"lookup {indexed * 1e6:.1f}us, naive scan {naive * 1e6:.0f}us"
@@ -0,0 +1,29 @@
+import asyncio
+import httpx
+from postgrest.utils import SyncClient
+from app.config.database import get_supabase_client
+from app.config.settings import settings
+from app.services.trajectory_service import TrajectoryService
+
+def test_prune_counts_deleted_rows_without_returning_them(monkeypatch):
+    batches = [[{"id": "t1"}, {"id": "t2"}], [{"id": "t3"}], []]
+    deletes = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/bus_locations"):
+            deletes.append(request.headers["prefer"])
+            return httpx.Response(204, headers={"content-range": f"*/{1000 * len(deletes)}"})
+        if request.method == "GET":
+            return httpx.Response(200, json=batches.pop(0))
+        return httpx.Response(204)
+
+    postgrest = get_supabase_client().postgrest
+    session = postgrest.session
+    monkeypatch.setattr(postgrest, "session", SyncClient(
+        base_url=session.base_url, headers=session.headers, transport=httpx.MockTransport(handle)
+    ))
+    monkeypatch.setattr(settings, "LOCATION_PRUNE_TRIPS", 2)
+
+    deleted = asyncio.run(TrajectoryService().prune_locations(10))
+    assert deleted == 1000 + 2000
+    assert all("return=minimal" in prefer and "count=exact" in prefer for prefer in deletes)
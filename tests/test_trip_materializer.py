@@ -0,0 +1,56 @@
+import asyncio
+import json
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+import httpx
+from postgrest.utils import SyncClient
+from app.config.database import get_supabase_client
+from app.services import trip_service
+from app.services.fleet_stats_service import FleetStats
+from app.services.trip_service import TripMaterializer
+
+MONDAY = date(2025, 3, 3)
+
+def test_cancelled_trip_wanted_again_is_restored(monkeypatch):
+    schedules = [{
+        "id": "s1", "bus_id": "b1", "departure_time": "08:00:00", "arrival_time": "09:00:00",
+        "days_of_week": [1], "buses": {"driver_id": "d1"},
+    }]
+    trips = {"t1": {
+        "id": "t1", "schedule_id": "s1", "service_date": MONDAY.isoformat(), "status": "cancelled",
+        "bus_id": "b0", "driver_id": "d0", "scheduled_departure": None, "scheduled_arrival": None,
+    }}
+    patches = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        params = {key: values[0] for key, values in parse_qs(urlsplit(str(request.url)).query).items()}
+        if request.url.path.endswith("/schedules"):
+            return httpx.Response(200, json=schedules)
+        if request.method == "GET":
+            return httpx.Response(200, json=list(trips.values()))
+        if request.method == "PATCH":
+            patches.append(params)
+            trip = trips[params["id"][len("eq."):]]
+            if params["status"] != f"eq.{trip['status']}":
+                return httpx.Response(204, headers={"content-range": "*/0"})
+            trip.update(json.loads(request.content))
+            return httpx.Response(204, headers={"content-range": "0-0/1"})
+        return httpx.Response(201, json=[])
+
+    postgrest = get_supabase_client().postgrest
+    session = postgrest.session
+    monkeypatch.setattr(postgrest, "session", SyncClient(
+        base_url=session.base_url, headers=session.headers, transport=httpx.MockTransport(handle)
+    ))
+    stats = FleetStats()
+    stats.trips_added("cancelled")
+    monkeypatch.setattr(trip_service, "fleet_stats", stats)
+
+    summary = asyncio.run(TripMaterializer().run(1, start=MONDAY))
+    assert (summary["create"], summary["restore"], summary["unchanged"]) == (0, 1, 0)
+    assert patches == [{"id": "eq.t1", "status": "eq.cancelled"}]
+    assert trips["t1"]["status"] == "scheduled" and trips["t1"]["driver_id"] == "d1"
+    assert stats.snapshot().trips_by_status == {"scheduled": 1}
+
+    summary = asyncio.run(TripMaterializer().run(1, start=MONDAY))
+    assert (summary["restore"], summary["unchanged"]) == (0, 1)
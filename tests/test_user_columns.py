@@ -0,0 +1,32 @@
+import re
+from pathlib import Path
+import pytest
+from app.core.auth import AUTH0_USER_COLUMNS
+from app.models.user import UserResponse, USER_RESPONSE_COLUMNS
+from app.schemas.auth import UserResponse as LoginUserResponse, LOGIN_USER_COLUMNS
+
+README = Path(__file__).resolve().parent.parent / "README.md"
+
+def users_table_columns() -> set:
+    """Columns of the users table as documented by the README SQL"""
+    sql = README.read_text(encoding="utf-8")
+    body = re.search(r"CREATE TABLE users \((.*?)\n\);", sql, re.S).group(1)
+    columns = {line.split()[0] for line in body.splitlines() if re.match(r"\s+[a-z0-9_]+ [A-Z]", line)}
+    for statement in re.findall(r"ALTER TABLE users\b([^;]*);", sql):
+        columns.update(re.findall(r"ADD COLUMN (?:IF NOT EXISTS )?([a-z0-9_]+)", statement))
+    return columns
+
+def test_readme_users_table_parses():
+    assert {"id", "auth0_id", "email", "name", "role", "status", "created_at"} <= users_table_columns()
+
+@pytest.mark.parametrize("projection, fields, not_columns", [
+    (USER_RESPONSE_COLUMNS, UserResponse.model_fields, {"is_active"}),
+    (LOGIN_USER_COLUMNS, LoginUserResponse.model_fields, set()),
+    # Spelled out: the projection is derived from Auth0User's constructor, so deriving it again would always agree
+    (AUTH0_USER_COLUMNS, {"id", "email", "name", "phone", "location", "role", "organization_id"}, set()),
+], ids=["USER_RESPONSE_COLUMNS", "LOGIN_USER_COLUMNS", "AUTH0_USER_COLUMNS"])
+def test_projection_matches_model_and_table(projection, fields, not_columns):
+    columns = projection.split(",")
+    assert len(columns) == len(set(columns)), "duplicate columns"
+    assert set(columns) == set(fields) - not_columns
+    assert set(columns) <= users_table_columns()
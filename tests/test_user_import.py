@@ -0,0 +1,26 @@
+import asyncio
+from app.services.user_import_service import _iter_csv_rows, _iter_lines
+
+def parse_csv(text: str) -> list:
+    async def body():
+        yield text.encode()
+
+    async def collect():
+        return [row async for row in _iter_csv_rows(_iter_lines(body()))]
+
+    return asyncio.run(collect())
+
+def test_csv_rows_must_match_the_header():
+    rows = parse_csv(
+        "email,name,role\n"
+        "a@example.com,Ann,student\n"
+        "b@example.com,Bob\n"
+        "c@example.com,Cy,student,extra\n"
+        '"d@example.com","Dee, Jr.",driver\n'
+    )
+    assert rows == [
+        (1, {"email": "a@example.com", "name": "Ann", "role": "student"}, None),
+        (2, None, "Row has 2 columns, the header has 3"),
+        (3, None, "Row has 4 columns, the header has 3"),
+        (4, {"email": "d@example.com", "name": "Dee, Jr.", "role": "driver"}, None),
+    ]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+import httpx
+import pytest
+from postgrest.utils import SyncClient
+from app.config.database import get_supabase_client
+from app.core.loader import Loaders
+from app.models.user import UserRole, UserUpdate, USER_RESPONSE_COLUMNS
+from app.services import user_service
+from app.services.fleet_stats_service import FleetStats
+from app.services.user_service import UserService
+
+LATENCY = 0.002  # seconds per simulated database round-trip
+
+def user_row(user_id: str) -> dict:
+    return {
+        "id": user_id, "auth0_id": None, "email": f"{user_id}@example.com", "name": "Someone",
+        "phone": None, "location": None, "role": "student", "status": "active", "organization_id": None,
+        "created_by": None, "created_at": "2025-01-01T00:00:00+00:00", "updated_at": "2025-01-01T00:00:00+00:00",
+    }
+
+@pytest.fixture
+def database(monkeypatch):
+    """PostgREST requests against an in-memory users table, each recorded as (method, params)"""
+    users = {"u1": user_row("u1"), "u2": user_row("u2")}
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        time.sleep(LATENCY)
+        params = {key: values[0] for key, values in parse_qs(urlsplit(str(request.url)).query).items()}
+        requests.append((request.method, params))
+        user = users.get(params.get("id", "")[len("eq."):])
+        if user is None:
+            return httpx.Response(200, json=[])
+        if request.method == "PATCH":
+            user.update(json.loads(request.content))
+        elif request.method == "DELETE":
+            del users[user["id"]]
+        columns = params["select"].split(",")
+        return httpx.Response(200, json=[{column: user[column] for column in columns}])
+
+    postgrest = get_supabase_client().postgrest
+    session = postgrest.session
+    monkeypatch.setattr(postgrest, "session", SyncClient(
+        base_url=session.base_url, headers=session.headers, transport=httpx.MockTransport(handle)
+    ))
+    monkeypatch.setattr(user_service, "fleet_stats", FleetStats())
+    return requests
+
+MUTATIONS = {
+    "update_user": lambda service, user_id: service.update_user(user_id, UserUpdate(name="Renamed")),
+    "delete_user": lambda service, user_id: service.delete_user(user_id),
+    "assign_role": lambda service, user_id: service.assign_role(user_id, UserRole.DRIVER),
+    "update_my_profile": lambda service, user_id: service.update_my_profile(user_id, UserUpdate(phone="123")),
+    "delete_my_account": lambda service, user_id: service.delete_my_account(user_id),
+}
+
+def mutate(name: str, user_id: str):
+    return asyncio.run(MUTATIONS[name](UserService(Loaders()), user_id))
+
+@pytest.mark.parametrize("name", MUTATIONS)
+def test_mutation_is_one_round_trip(database, name):
+    result = mutate(name, "u1")
+    assert result.success, result.errors
+    [(method, params)] = database
+    assert method in ("PATCH", "DELETE")
+    if name in ("update_user", "assign_role", "update_my_profile"):
+        assert params["select"] == USER_RESPONSE_COLUMNS
+    else:
+        assert params["select"] != "*"
+
+@pytest.mark.parametrize("name", MUTATIONS)
+def test_missing_user_is_not_found(database, name):
+    result = mutate(name, "missing")
+    assert not result.success
+    assert result.message == "User not found"
+    assert len(database) == 1
+
+def bulk_edits(edits: int) -> None:
+    async def bulk():
+        service = UserService(Loaders())
+        for n in range(edits):
+            result = await service.update_user("u2", UserUpdate(name=f"Name {n}"))
+            assert result.success
+
+    asyncio.run(bulk())
+
+def test_bulk_edits_take_one_round_trip_each(database):
+    bulk_edits(50)
+    # A read before each write would make this 2 * edits
+    assert len(database) == 50
+
+@pytest.mark.benchmark
+def test_benchmark_bulk_edits(database):
+    edits = 50
+    started = time.perf_counter()
+    bulk_edits(edits)
+    elapsed = time.perf_counter() - started
+    # Read-then-write spends at least two round-trips of latency per edit
+    assert elapsed < 2 * edits * LATENCY, f"{edits} edits took {elapsed * 1000:.0f}ms"